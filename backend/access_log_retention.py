@@ -0,0 +1,47 @@
+"""
+Access log retention, for cron: adds the upcoming monthly partitions of
+access_logs and drops the ones older than ACCESS_LOG_RETENTION_MONTHS
+(src/services/access_log_service.py). On an unpartitioned table expired
+rows are deleted in batches instead.
+
+Usage (from backend/):
+    python access_log_retention.py [--retention-months 24] [--months-ahead 3] [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+# Add src to the system path to allow imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from src.database.connection import SessionLocal
+from src.services import access_log_service
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--retention-months", type=int, default=access_log_service.ACCESS_LOG_RETENTION_MONTHS)
+    parser.add_argument("--months-ahead", type=int, default=access_log_service.ACCESS_LOG_PARTITIONS_AHEAD)
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        partitions = access_log_service.list_partitions(db)
+        for partition in partitions:
+            print(f"{partition['name']:<8} rows~{partition['rows']}")
+        if args.dry_run:
+            return
+        if partitions:
+            added = access_log_service.extend_partitions(db, args.months_ahead)
+            dropped = access_log_service.drop_expired_partitions(db, args.retention_months)
+            print(f"added={added} dropped={dropped}")
+        else:
+            deleted = access_log_service.delete_expired_rows(db, args.retention_months)
+            print(f"access_logs is not partitioned; deleted {deleted} expired rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Access log write cost: one INSERT and commit per event (what logging inline
+in each request would do) against the buffered AccessLogWriter, fed from
+several threads like request handlers would. Reports events/s, INSERT
+statements issued and flush latency, then checks that stop() leaves every
+recorded event in the table (after replaying anything spilled). Exits 1 if
+any event is missing.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/access_log_pipeline.py --events 20000 --threads 8
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/access_log_pipeline.py --overflow spill --queue-size 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, func, insert, select
+
+from src.database import connection
+from src.database.base import Base
+from src.database.models import AccessLog
+from src.utils.access_log_writer import AccessLogWriter
+
+statement_count = 0
+
+
+def count_statement(*_args, **_kwargs):
+    global statement_count
+    statement_count += 1
+
+
+def run_threads(threads, events, target):
+    per_thread = events // threads
+    workers = [threading.Thread(target=target, args=(i, per_thread)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def count_rows(run_id):
+    with connection.engine.connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(AccessLog).where(AccessLog.user_agent == run_id)
+        ).scalar_one()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--overflow", choices=["block", "drop", "spill"], default="spill")
+    parser.add_argument("--skip-inline", action="store_true", help="Only measure the buffered writer")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=connection.engine)
+    event.listen(connection.engine, "before_cursor_execute", count_statement)
+    global statement_count
+
+    if not args.skip_inline:
+        run_id = f"inline-{uuid.uuid4().hex[:8]}"
+
+        def inline(i, count):
+            for n in range(count):
+                with connection.engine.begin() as conn:
+                    conn.execute(insert(AccessLog).values(
+                        log_id=str(uuid.uuid4()), user_id=f"user-{i}", action_type="view_asset",
+                        user_agent=run_id, status="success", timestamp=datetime.utcnow(), details={"n": n},
+                    ))
+
+        statement_count = 0
+        wall = run_threads(args.threads, args.events, inline)
+        print(f"{'inline':<9} events/s={args.events / wall:9.1f} statements={statement_count}")
+
+    run_id = f"buffered-{uuid.uuid4().hex[:8]}"
+    spill_path = os.path.join(tempfile.mkdtemp(), "access_log_spill.jsonl")
+    writer = AccessLogWriter(
+        queue_size=args.queue_size, batch_size=args.batch_size, overflow=args.overflow,
+        spill_path=spill_path, enabled=True,
+    )
+
+    class Request:
+        client = None
+        headers = {"user-agent": run_id}
+
+    def buffered(i, count):
+        for n in range(count):
+            writer.record("view_asset", request=Request, user_id=f"user-{i}", details={"n": n})
+
+    writer.start()
+    statement_count = 0
+    record_wall = run_threads(args.threads, args.events, buffered)
+    writer.stop()
+    stop_wall = time.perf_counter()
+    # A spilled backlog is written by the next start(); do that now to check for loss
+    writer.start()
+    while writer.snapshot()["spill_pending"]:
+        time.sleep(0.05)
+    writer.stop()
+    replay_wall = time.perf_counter() - stop_wall
+
+    snapshot = writer.snapshot()
+    recorded = args.events // args.threads * args.threads
+    stored = count_rows(run_id)
+    print(
+        f"{'buffered':<9} events/s={recorded / record_wall:9.1f} statements={statement_count} "
+        f"flushes={snapshot['flushes']} avg_flush={snapshot['avg_flush_seconds'] * 1000:.1f}ms "
+        f"max_flush={snapshot['max_flush_seconds'] * 1000:.1f}ms max_depth={snapshot['max_depth']} "
+        f"replay={replay_wall:.2f}s"
+    )
+    print(
+        f"recorded={recorded} stored={stored} spilled={snapshot['spilled']} "
+        f"replayed={snapshot['replayed']} dropped={snapshot['dropped']}"
+    )
+    if stored + snapshot["dropped"] != recorded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares query latency of the sync threadpool path (connection.SessionLocal run
+through Starlette's threadpool) against the async path (connection.AsyncSessionLocal)
+under concurrent load.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/async_db_latency.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from src.database import connection
+from src.database.base import Base
+from src.database.models import User
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples, wall):
+    print(
+        f"{label:<18} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms "
+        f"throughput={len(samples) / wall:9.1f} req/s"
+    )
+
+
+def sync_query(email):
+    db = connection.SessionLocal()
+    try:
+        return db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()
+
+
+async def async_query(email):
+    async with connection.AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+
+async def run(label, call, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(f"bench-{i % 100}@everaccess.test")
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    report(label, samples, time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=connection.engine)
+
+    await run("sync+threadpool", lambda email: run_in_threadpool(sync_query, email), args.requests, args.concurrency)
+    await run("async", async_query, args.requests, args.concurrency)
+
+    await connection.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Compares importing assets one by one through POST /assets/ with a single
+POST /assets/bulk request.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/bulk_asset_import.py --items 10000 --single-items 200
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.database import connection
+from src.main import app
+
+statement_count = 0
+
+
+def count_statement(*_args, **_kwargs):
+    global statement_count
+    statement_count += 1
+
+
+def make_items(count, beneficiary_ids):
+    return [
+        {
+            "asset_type": "login_credential",
+            "asset_name": f"Vault entry {i}",
+            "platform_name": "example.com",
+            "username": f"user{i}",
+            "beneficiary_ids": beneficiary_ids[: 1 + i % len(beneficiary_ids)],
+        }
+        for i in range(count)
+    ]
+
+
+def report(label, items, wall, statements):
+    print(
+        f"{label:<8} items={items:<6} wall={wall:8.2f}s "
+        f"items/s={items / wall:9.1f} statements={statements}"
+    )
+
+
+def main():
+    global statement_count
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--single-items", type=int, default=200)
+    args = parser.parse_args()
+
+    event.listen(connection.engine, "before_cursor_execute", count_statement)
+
+    with TestClient(app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        token = client.post(
+            "/auth/register",
+            json={"email": email, "password": "benchmark", "first_name": "Bench", "last_name": "User"},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        beneficiary_ids = [
+            client.post("/beneficiaries/", json={"email": f"heir{i}@example.com"}, headers=headers).json()["beneficiary_id"]
+            for i in range(3)
+        ]
+
+        items = make_items(args.single_items, beneficiary_ids)
+        statement_count = 0
+        start = time.perf_counter()
+        for item in items:
+            client.post("/assets/", json=item, headers=headers)
+        report("single", len(items), time.perf_counter() - start, statement_count)
+
+        items = make_items(args.items, beneficiary_ids)
+        statement_count = 0
+        start = time.perf_counter()
+        response = client.post("/assets/bulk", json=items, headers=headers)
+        report("bulk", len(items), time.perf_counter() - start, statement_count)
+        body = response.json()
+        print(f"created={body['created']} failed={body['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cold start of the API server: spawns uvicorn (as start.sh does, without the
+migration and seed steps) --runs times and measures, from process spawn,
+
+  * listening  first 200 from /health (the app accepts connections),
+  * ready      first 200 from /ready (database reached, schema revision
+               checked, pools warm, background workers started),
+
+plus the per-step timings /ready reports. The database must already be at
+the head revision (alembic upgrade head), or pass --schema-mode upgrade.
+
+Usage (from backend/):
+    python benchmarks/cold_start.py --runs 5
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/cold_start.py --runs 10 --output cold.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(client, path, deadline):
+    while time.monotonic() < deadline:
+        try:
+            response = client.get(path)
+            if response.status_code == 200:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def cold_start(env, timeout):
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    started = time.monotonic()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            deadline = started + timeout
+            if wait_for(client, "/health", deadline) is None:
+                return None
+            listening = time.monotonic() - started
+            ready = wait_for(client, "/ready", deadline)
+            if ready is None:
+                return None
+            return {
+                "listening_seconds": round(listening, 3),
+                "ready_seconds": round(time.monotonic() - started, 3),
+                "app_timings": ready.json()["timings"],
+            }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        if server.returncode not in (0, -15) and server.stderr is not None:
+            sys.stderr.write(server.stderr.read().decode(errors="replace")[-2000:])
+
+
+def summarize(values):
+    return {"min": min(values), "median": round(statistics.median(values), 3), "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per start")
+    parser.add_argument("--schema-mode", choices=("check", "upgrade"), default="check")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DB_SCHEMA_MODE=args.schema_mode)
+    runs = []
+    for run in range(args.runs):
+        result = cold_start(env, args.timeout)
+        if result is None:
+            sys.exit(f"run {run + 1}: server not ready within {args.timeout}s")
+        print(f"run {run + 1}: listening={result['listening_seconds']}s ready={result['ready_seconds']}s")
+        runs.append(result)
+
+    report = {
+        "runs": runs,
+        "listening_seconds": summarize([r["listening_seconds"] for r in runs]),
+        "ready_seconds": summarize([r["ready_seconds"] for r in runs]),
+    }
+    print(json.dumps({key: report[key] for key in ("listening_seconds", "ready_seconds")}, indent=2))
+    print(f"last run app timings: {runs[-1]['app_timings']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
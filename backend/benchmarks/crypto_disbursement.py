@@ -0,0 +1,139 @@
+"""
+Compares the previous per-allocation crypto disbursement (a Beneficiary and
+User lookup per allocation, lazy owner load, one flush per cloned asset)
+with crypto_service.disburse_crypto_assets on identical estates.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/crypto_disbursement.py --allocations 1000 --wallets 200
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, insert
+
+from src.database import connection
+from src.database.base import Base
+from src.database.models import Asset, Beneficiary, CryptoAllocation, CryptoAsset, User
+from src.services import crypto_service
+
+statement_count = 0
+
+
+def count_statement(*_args, **_kwargs):
+    global statement_count
+    statement_count += 1
+
+
+def build_estate(db, allocations, wallets, beneficiaries):
+    """Owner with `wallets` crypto assets and `allocations` allocations spread over them."""
+    owner_id = str(uuid.uuid4())
+    db.execute(insert(User), [{"user_id": owner_id, "email": f"owner-{owner_id[:8]}@example.com", "password_hash": "x", "first_name": "Estate", "last_name": "Owner"}])
+
+    beneficiary_rows, heir_rows = [], []
+    for i in range(beneficiaries):
+        email = f"heir-{owner_id[:8]}-{i}@example.com"
+        beneficiary_rows.append({"beneficiary_id": str(uuid.uuid4()), "user_id": owner_id, "email": email, "status": "active"})
+        # Half of the beneficiaries have registered accounts and receive clones
+        if i % 2 == 0:
+            heir_rows.append({"user_id": str(uuid.uuid4()), "email": email, "password_hash": "x"})
+    db.execute(insert(Beneficiary), beneficiary_rows)
+    db.execute(insert(User), heir_rows)
+
+    wallet_ids = [str(uuid.uuid4()) for _ in range(wallets)]
+    db.execute(insert(Asset), [
+        {"asset_id": wallet_id, "user_id": owner_id, "asset_type": "crypto_wallet", "asset_name": f"Wallet {i}"}
+        for i, wallet_id in enumerate(wallet_ids)
+    ])
+    db.execute(insert(CryptoAsset), [
+        {"crypto_asset_id": wallet_id, "wallet_type": "bitcoin", "wallet_address": f"addr-{i}",
+         "private_key": "k", "seed_phrase": "s", "balance_usd": Decimal("1000"), "balance_crypto": Decimal("1")}
+        for i, wallet_id in enumerate(wallet_ids)
+    ])
+    per_wallet = max(allocations // wallets, 1)
+    db.execute(insert(CryptoAllocation), [
+        {"allocation_id": str(uuid.uuid4()), "crypto_asset_id": wallet_ids[i % wallets],
+         "beneficiary_id": beneficiary_rows[i % beneficiaries]["beneficiary_id"],
+         "percentage": Decimal(100) / per_wallet, "disbursement_status": "pending"}
+        for i in range(allocations)
+    ])
+    db.commit()
+    return wallet_ids
+
+
+def legacy_distribution(db, crypto_asset_id):
+    """The per-allocation implementation this benchmark replaces."""
+    original_crypto_asset = db.query(CryptoAsset).filter(CryptoAsset.crypto_asset_id == crypto_asset_id).first()
+    original_asset = db.query(Asset).filter(Asset.asset_id == crypto_asset_id).first()
+    allocations = db.query(CryptoAllocation).filter(CryptoAllocation.crypto_asset_id == crypto_asset_id).all()
+    for allocation in allocations:
+        allocation.allocated_amount_usd = original_crypto_asset.balance_usd * (allocation.percentage / 100)
+        allocation.allocated_amount_crypto = original_crypto_asset.balance_crypto * (allocation.percentage / 100)
+        allocation.mock_transaction_id = f"MOCK-{uuid.uuid4().hex[:16]}"
+        allocation.disbursement_status = "disbursed"
+        allocation.disbursed_at = datetime.now()
+        db.add(allocation)
+        beneficiary = db.query(Beneficiary).filter(Beneficiary.beneficiary_id == allocation.beneficiary_id).first()
+        if beneficiary and beneficiary.email:
+            beneficiary_user = db.query(User).filter(User.email == beneficiary.email).first()
+            if beneficiary_user:
+                new_asset = Asset(
+                    user_id=beneficiary_user.user_id,
+                    asset_type=original_asset.asset_type,
+                    asset_name=f"{original_asset.asset_name} (Inherited)",
+                    category="Inherited Assets",
+                    notes=f"Inherited from {original_asset.user.first_name} {original_asset.user.last_name}. ",
+                )
+                db.add(new_asset)
+                db.flush()
+                db.add(CryptoAsset(
+                    crypto_asset_id=new_asset.asset_id,
+                    wallet_type=original_crypto_asset.wallet_type,
+                    wallet_address=original_crypto_asset.wallet_address,
+                    balance_usd=allocation.allocated_amount_usd,
+                    balance_crypto=allocation.allocated_amount_crypto,
+                ))
+    db.commit()
+
+
+def measure(label, func):
+    global statement_count
+    statement_count = 0
+    start = time.perf_counter()
+    func()
+    wall = time.perf_counter() - start
+    print(f"{label:<8} wall={wall:8.3f}s round_trips={statement_count}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--allocations", type=int, default=1000)
+    parser.add_argument("--wallets", type=int, default=200)
+    parser.add_argument("--beneficiaries", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=connection.engine)
+    event.listen(connection.engine, "before_cursor_execute", count_statement)
+
+    db = connection.SessionLocal()
+    try:
+        legacy_wallets = build_estate(db, args.allocations, args.wallets, args.beneficiaries)
+        batched_wallets = build_estate(db, args.allocations, args.wallets, args.beneficiaries)
+        db.expunge_all()
+
+        print(f"allocations={args.allocations} wallets={args.wallets} beneficiaries={args.beneficiaries}")
+        measure("legacy", lambda: [legacy_distribution(db, wallet_id) for wallet_id in legacy_wallets])
+        db.expunge_all()
+        measure("batched", lambda: crypto_service.disburse_crypto_assets(db, batched_wallets))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
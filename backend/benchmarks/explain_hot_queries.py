@@ -0,0 +1,99 @@
+"""
+Runs EXPLAIN for each hot query and exits non-zero if any of them falls back
+to a full table scan. Run it against a migrated database (alembic upgrade
+head); --create builds the schema from the models instead.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/explain_hot_queries.py
+    DATABASE_URL=sqlite:///./explain.db python benchmarks/explain_hot_queries.py --create
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import select, text
+
+from src.database import connection
+from src.database.base import Base
+from src.database.models import AccessRule, Asset, AssetFile, Beneficiary, Job, User, VerificationRequest
+from src.services.access_log_service import access_log_query
+
+ID = "00000000-0000-0000-0000-000000000000"
+LAST_30_DAYS = (datetime(2026, 1, 1) - timedelta(days=30), datetime(2026, 1, 1))
+
+# name -> statement; each mirrors a lookup on a request path
+HOT_QUERIES = {
+    "portal token lookup": select(Beneficiary).where(Beneficiary.access_token_hash == "0" * 64),
+    "beneficiary by email": select(Beneficiary.beneficiary_id).where(Beneficiary.email == "heir@example.com"),
+    "beneficiary for user and email": select(Beneficiary).where(Beneficiary.user_id == ID, Beneficiary.email == "heir@example.com"),
+    "active beneficiaries of user": select(Beneficiary).where(Beneficiary.user_id == ID, Beneficiary.status == "active"),
+    "principal by email": select(User).where(User.email == "owner@example.com"),
+    "vault page": select(Asset).where(Asset.user_id == ID).order_by(Asset.created_at, Asset.asset_id).limit(50),
+    "asset by owner": select(Asset).where(Asset.asset_id == ID, Asset.user_id == ID),
+    "access rules of assets": select(AccessRule).where(AccessRule.asset_id.in_([ID, ID[:-1] + "1"])),
+    "released assets of beneficiary": select(Asset)
+        .join(AccessRule, AccessRule.asset_id == Asset.asset_id)
+        .where(AccessRule.beneficiary_id == ID),
+    "duplicate claim check": select(VerificationRequest).where(
+        VerificationRequest.user_id == ID,
+        VerificationRequest.beneficiary_id == ID,
+        VerificationRequest.status == "approved",
+    ),
+    "blob references": select(AssetFile.content_sha256).where(AssetFile.content_sha256.in_(["0" * 64])),
+    "job claim": select(Job.job_id).where(Job.status == "queued").order_by(Job.available_at).limit(10),
+    "access log of asset": access_log_query(*LAST_30_DAYS, asset_id=ID),
+    "access log of user": access_log_query(*LAST_30_DAYS, user_id=ID),
+    "access log of beneficiary": access_log_query(*LAST_30_DAYS, beneficiary_id=ID),
+}
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?! USING (COVERING )?INDEX)")
+
+
+def explain(conn, statement):
+    """Returns (plan lines, full-scan tables) for a statement on this dialect."""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).mappings().all()
+        lines = [row["detail"] for row in rows]
+        scans = [m.group(1) for m in (SQLITE_FULL_SCAN.match(line) for line in lines) if m]
+        return lines, scans
+    rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    # partitions lists what survives pruning on a partitioned table
+    lines = [
+        f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} partitions={row.get('partitions')}"
+        for row in rows
+    ]
+    # type=ALL is a full table scan; type=index reads the whole index
+    scans = [row["table"] for row in rows if row["type"] in ("ALL", "index") and row["table"]]
+    return lines, scans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--create", action="store_true", help="Create tables from the models first")
+    args = parser.parse_args()
+
+    if args.create:
+        Base.metadata.create_all(bind=connection.engine)
+
+    failures = 0
+    with connection.engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            lines, scans = explain(conn, statement)
+            verdict = "FULL SCAN " + ", ".join(scans) if scans else "ok"
+            print(f"{name:<32} {verdict}")
+            for line in lines:
+                print(f"    {line}")
+            failures += bool(scans)
+
+    if failures:
+        print(f"{failures} hot queries fall back to a full scan")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measures asset file download throughput and server CPU per GB by driving
+the ASGI app directly (response bodies are counted and discarded, so no
+client or network cost is included).
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/file_download_throughput.py --size-mb 256 --repeat 4
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+
+from src.database import connection
+from src.database.models import AssetFile
+from src.main import app
+
+
+def write_blob(path, size_mb):
+    digest = hashlib.sha256()
+    chunk = os.urandom(1024 * 1024)
+    with open(path, "wb") as out:
+        for _ in range(size_mb):
+            out.write(chunk)
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def fetch(path, headers):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+        "extensions": {},
+    }
+    received = {"status": None, "bytes": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            received["bytes"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+def run(label, path, headers, repeat):
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    total = 0
+    status = None
+    for _ in range(repeat):
+        result = asyncio.run(fetch(path, headers))
+        total += result["bytes"]
+        status = result["status"]
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    gb = total / 1024 ** 3
+    print(
+        f"{label:<14} status={status} bytes={total:<12} "
+        f"throughput={total / 1024 ** 2 / wall:8.1f} MB/s "
+        f"cpu/GB={cpu / gb if gb else 0:6.3f}s requests={repeat}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=4)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        token = client.post(
+            "/auth/register",
+            json={"email": email, "password": "benchmark", "first_name": "Bench", "last_name": "User"},
+        ).json()["access_token"]
+        headers = {"authorization": f"Bearer {token}"}
+        asset = client.post(
+            "/assets/", json={"asset_type": "document", "asset_name": "Large"}, headers=headers
+        ).json()
+
+    blob_path = os.path.join(tempfile.mkdtemp(), "blob.bin")
+    digest = write_blob(blob_path, args.size_mb)
+    db = connection.SessionLocal()
+    try:
+        asset_file = AssetFile(
+            asset_id=asset["asset_id"],
+            file_name="blob.bin",
+            file_type="application/octet-stream",
+            file_size=args.size_mb * 1024 * 1024,
+            encrypted_file_path=blob_path,
+            content_sha256=digest,
+        )
+        db.add(asset_file)
+        db.commit()
+        path = f"/assets/{asset['asset_id']}/files/{asset_file.file_id}"
+    finally:
+        db.close()
+
+    try:
+        run("full", path, headers, args.repeat)
+        run("range 1MB", path, {**headers, "range": "bytes=0-1048575"}, args.repeat)
+        run("if-none-match", path, {**headers, "if-none-match": f'"{digest}"'}, args.repeat)
+    finally:
+        os.remove(blob_path)
+
+
+if __name__ == "__main__":
+    main()
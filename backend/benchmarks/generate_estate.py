@@ -0,0 +1,225 @@
+"""
+Bulk-loads a synthetic estate for load testing: users, beneficiaries,
+assets with access rules and files, crypto wallets with allocations, and
+time-capsule messages, in whatever volume is asked for (1M users with 20
+assets each is 20M assets). Rows go in through Core executemany INSERTs,
+which pymysql sends as multi-row INSERT statements, in one transaction per
+block of users, so memory stays flat at any volume.
+
+Everything the load driver needs to find its way around is derived from
+the manifest written at the end:
+
+  * user i logs in as <prefix>-<i>@load.example.com with --password,
+  * the beneficiaries of user i are users i+1 .. i+k (registered accounts),
+    and beneficiary j of user i opens the portal with token
+    <prefix>-portal-<i>-<j>,
+  * the last --claim-users users are reserved for inheritance claims,
+  * every generated file points at one shared blob in the blob store.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/generate_estate.py --users 1000000 --assets-per-user 20 --no-fk-checks
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/generate_estate.py --users 10000 --manifest estate.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import insert, select, text
+
+from src.database import connection, schema
+from src.database.models import (
+    AccessRule, AdminUser, Asset, AssetFile, Beneficiary, CryptoAllocation, CryptoAsset, User, UserMessage,
+)
+from src.services.beneficiary_service import hash_access_token
+from src.utils import blob_store
+from src.utils.security import get_password_hash
+
+# Reviewer recorded on automatically approved inheritance claims
+CLAIM_VALIDATOR_ID = "zk-proof-validator"
+ASSET_TYPES = ("login_credential", "document", "social_media", "financial", "other")
+WALLET_TYPES = ("bitcoin", "ethereum", "usdc", "solana")
+
+
+def user_email(prefix, index):
+    return f"{prefix}-{index}@load.example.com"
+
+
+def portal_token(prefix, owner, position):
+    return f"{prefix}-portal-{owner}-{position}"
+
+
+def write_shared_blob(size, rng):
+    content = rng.randbytes(size)
+    temp_path = blob_store.new_temp_path()
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    digest, size = blob_store.hash_file(temp_path)
+    path, _ = blob_store.commit_blob(temp_path, digest)
+    return {"path": path, "sha256": digest, "size": size}
+
+
+def build_block(args, start, end, password_hash, blob, rng, now):
+    """Rows for users [start, end), keyed by table in foreign-key order."""
+    rows = {table: [] for table in (User, Beneficiary, Asset, AccessRule, AssetFile, CryptoAsset, CryptoAllocation, UserMessage)}
+    token_expiry = now + timedelta(days=365)
+    for i in range(start, end):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        rows[User].append({
+            "user_id": user_id, "email": user_email(args.prefix, i), "password_hash": password_hash,
+            "first_name": f"Load {i}", "last_name": "User", "account_status": "active", "email_verified": True,
+            "created_at": now,
+        })
+
+        beneficiary_ids = []
+        for j in range(args.beneficiaries_per_user):
+            beneficiary_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            beneficiary_ids.append(beneficiary_id)
+            rows[Beneficiary].append({
+                "beneficiary_id": beneficiary_id, "user_id": user_id,
+                "email": user_email(args.prefix, (i + j + 1) % args.users),
+                "first_name": f"Heir {j}", "last_name": "User", "relationship_type": "child", "priority_level": j + 1,
+                "status": "active", "notification_sent": False, "is_registered": True,
+                "access_token_hash": hash_access_token(portal_token(args.prefix, i, j)), "token_expires_at": token_expiry,
+                "added_date": now + timedelta(seconds=j),
+            })
+
+        for a in range(args.assets_per_user):
+            asset_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            is_crypto = a < args.crypto_per_user
+            rows[Asset].append({
+                "asset_id": asset_id, "user_id": user_id,
+                "asset_type": "crypto_wallet" if is_crypto else ASSET_TYPES[a % len(ASSET_TYPES)],
+                "platform_name": f"Platform {a % 50}", "asset_name": f"Asset {a}", "username": f"user{i}",
+                "password": "ciphertext", "notes": "Synthetic load-test asset", "category": "Load",
+                "created_at": now + timedelta(seconds=a),
+            })
+            for r in range(min(args.rules_per_asset, len(beneficiary_ids))):
+                rows[AccessRule].append({
+                    "rule_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "user_id": user_id,
+                    "beneficiary_id": beneficiary_ids[(a + r) % len(beneficiary_ids)], "asset_id": asset_id,
+                    "access_type": "full", "created_at": now,
+                })
+            if a < args.files_per_user:
+                rows[AssetFile].append({
+                    "file_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "asset_id": asset_id,
+                    "file_name": f"document-{a}.bin", "file_type": "application/octet-stream",
+                    "file_size": blob["size"], "content_sha256": blob["sha256"], "encrypted_file_path": blob["path"],
+                    "uploaded_at": now,
+                })
+            if is_crypto:
+                balance_usd = Decimal(rng.randint(100, 1000000))
+                rows[CryptoAsset].append({
+                    "crypto_asset_id": asset_id, "wallet_type": WALLET_TYPES[a % len(WALLET_TYPES)],
+                    "wallet_address": f"0x{rng.getrandbits(160):040x}", "private_key": "ciphertext", "seed_phrase": "ciphertext",
+                    "balance_usd": balance_usd, "balance_crypto": balance_usd / Decimal(1000),
+                })
+                share = Decimal(100) / len(beneficiary_ids) if beneficiary_ids else Decimal(0)
+                for beneficiary_id in beneficiary_ids:
+                    rows[CryptoAllocation].append({
+                        "allocation_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "crypto_asset_id": asset_id,
+                        "beneficiary_id": beneficiary_id, "percentage": share, "allocated_amount_usd": None,
+                        "allocated_amount_crypto": None, "disbursement_status": "pending", "mock_transaction_id": None,
+                        "disbursed_at": None,
+                    })
+
+        for m in range(args.messages_per_user):
+            scheduled = m % 2 == 1
+            rows[UserMessage].append({
+                "message_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "user_id": user_id,
+                "beneficiary_id": beneficiary_ids[m % len(beneficiary_ids)] if beneficiary_ids else None,
+                "message_title": f"Letter {m}", "message_content": "Synthetic load-test message",
+                "delivery_condition": "scheduled_date" if scheduled else "upon_death",
+                "deliver_at": now + timedelta(days=365 + i % 3650) if scheduled else None,
+                "delivered": False, "created_at": now + timedelta(seconds=m),
+            })
+    return rows
+
+
+def ensure_claim_validator(password_hash):
+    with connection.engine.begin() as conn:
+        exists = conn.execute(select(AdminUser.admin_id).where(AdminUser.admin_id == CLAIM_VALIDATOR_ID)).first()
+        if not exists:
+            conn.execute(insert(AdminUser), [{
+                "admin_id": CLAIM_VALIDATOR_ID, "email": "zk-validator@everaccess.system", "password_hash": password_hash,
+                "first_name": "ZK", "last_name": "Validator", "role": "verifier", "status": "active",
+            }])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--assets-per-user", type=int, default=20)
+    parser.add_argument("--beneficiaries-per-user", type=int, default=3)
+    parser.add_argument("--rules-per-asset", type=int, default=1, help="Beneficiaries each asset is released to")
+    parser.add_argument("--crypto-per-user", type=int, default=1, help="Assets per user that are crypto wallets with allocations")
+    parser.add_argument("--files-per-user", type=int, default=1, help="Assets per user with an attached file")
+    parser.add_argument("--messages-per-user", type=int, default=2)
+    parser.add_argument("--claim-users", type=int, default=None, help="Users reserved for inheritance claims (default 1%%)")
+    parser.add_argument("--file-size", type=int, default=256 * 1024)
+    parser.add_argument("--block-users", type=int, default=1000, help="Users per transaction")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT")
+    parser.add_argument("--password", default="load-test-password")
+    parser.add_argument("--prefix", default=None, help="Email/token prefix; defaults to a fresh random one")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-fk-checks", action="store_true", help="MySQL: disable foreign key and unique checks while loading")
+    parser.add_argument("--manifest", default="estate.json")
+    args = parser.parse_args()
+    if args.beneficiaries_per_user >= args.users:
+        parser.error("--beneficiaries-per-user must be lower than --users")
+    args.prefix = args.prefix or f"load{uuid.uuid4().hex[:6]}"
+    claim_users = args.claim_users if args.claim_users is not None else max(1, args.users // 100)
+
+    rng = random.Random(args.seed)
+    schema.upgrade_to_head()
+    password_hash = get_password_hash(args.password)  # bcrypt once; every user shares it
+    ensure_claim_validator(password_hash)
+    blob = write_shared_blob(args.file_size, rng) if args.files_per_user else {"path": None, "sha256": None, "size": 0}
+    now = datetime.utcnow().replace(microsecond=0)
+
+    totals = {}
+    start = time.perf_counter()
+    for block_start in range(0, args.users, args.block_users):
+        block_end = min(block_start + args.block_users, args.users)
+        rows = build_block(args, block_start, block_end, password_hash, blob, rng, now)
+        with connection.engine.begin() as conn:
+            if args.no_fk_checks and conn.dialect.name == "mysql":
+                conn.execute(text("SET SESSION foreign_key_checks = 0, unique_checks = 0"))
+            for table, table_rows in rows.items():
+                for offset in range(0, len(table_rows), args.batch_size):
+                    conn.execute(insert(table), table_rows[offset:offset + args.batch_size])
+                totals[table.__tablename__] = totals.get(table.__tablename__, 0) + len(table_rows)
+            if args.no_fk_checks and conn.dialect.name == "mysql":
+                conn.execute(text("SET SESSION foreign_key_checks = 1, unique_checks = 1"))
+        elapsed = time.perf_counter() - start
+        loaded = sum(totals.values())
+        print(f"users {block_end}/{args.users}: {loaded} rows in {elapsed:.1f}s ({loaded / elapsed:.0f} rows/s)", flush=True)
+
+    manifest = {
+        "prefix": args.prefix,
+        "password": args.password,
+        "users": args.users,
+        "beneficiaries_per_user": args.beneficiaries_per_user,
+        "assets_per_user": args.assets_per_user,
+        "files_per_user": args.files_per_user,
+        "claim_users": [args.users - claim_users, args.users],
+        "database": connection.engine.url.render_as_string(hide_password=True),
+        "rows": totals,
+        "load_seconds": round(time.perf_counter() - start, 1),
+        "generated_at": now.isoformat(),
+    }
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest["rows"]))
+    print(f"manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
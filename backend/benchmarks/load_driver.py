@@ -0,0 +1,352 @@
+"""
+Scripted HTTP load against an estate loaded by generate_estate.py. Virtual
+users (--concurrency threads) repeatedly run one of these sessions, picked
+by --mix weights:
+
+  vault   log in, poll the asset list (then revalidate it with its ETag),
+          list beneficiaries and messages, open an asset, download a file
+  upload  log in, upload a file to an asset and download it back
+  portal  open the beneficiary portal with an emailed token, then browse
+          released assets and messages and download a file with the
+          session token
+  claim   a registered heir claims an inheritance (reserved users only,
+          each claimed once) and polls the inheritance job
+
+Per endpoint (route template) it reports request count, throughput, mean
+and p50/p95/p99/max latency and status codes as JSON, so runs can be
+diffed. --in-process drives the app through TestClient instead of a server.
+
+Usage (from backend/):
+    python benchmarks/load_driver.py --manifest estate.json --base-url http://127.0.0.1:8000 --duration 60 --concurrency 32 --output run.json
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/load_driver.py --manifest estate.json --in-process --duration 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from generate_estate import portal_token, user_email
+
+SCENARIOS = ("vault", "upload", "portal", "claim")
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, label, seconds, status):
+        with self._lock:
+            self.latencies[label].append(seconds * 1000)
+            self.statuses[label][str(status)] += 1
+
+
+def percentile(ordered, fraction):
+    # Nearest rank
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def summarize(latencies, statuses, wall):
+    ordered = sorted(latencies)
+    ok = sum(count for status, count in statuses.items() if status.startswith(("2", "3")))
+    return {
+        "count": len(ordered),
+        "rps": round(len(ordered) / wall, 2),
+        "error_rate": round(1 - ok / len(ordered), 4) if ordered else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else None,
+        "p50_ms": round(percentile(ordered, 0.50), 2) if ordered else None,
+        "p95_ms": round(percentile(ordered, 0.95), 2) if ordered else None,
+        "p99_ms": round(percentile(ordered, 0.99), 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None,
+        "statuses": dict(statuses),
+    }
+
+
+class Session:
+    """One virtual user's view: an HTTP client plus timing of every call."""
+
+    def __init__(self, client, recorder, manifest, args, rng):
+        self.client = client
+        self.recorder = recorder
+        self.manifest = manifest
+        self.args = args
+        self.rng = rng
+
+    def call(self, label, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.add(label, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.recorder.add(label, time.perf_counter() - start, response.status_code)
+        return response
+
+    def login(self, index):
+        response = self.call("POST /auth/login", "POST", "/auth/login", json={
+            "username": user_email(self.manifest["prefix"], index), "password": self.manifest["password"],
+        })
+        if response is None or response.status_code != 200:
+            return None
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def random_owner(self):
+        # Reserved claim users may be deceased mid-run; browse the others
+        return self.rng.randrange(self.manifest["claim_users"][0])
+
+    def vault(self):
+        headers = self.login(self.random_owner())
+        if headers is None:
+            return
+        assets = self.call("GET /assets/", "GET", "/assets/", params={"limit": self.args.page_size}, headers=headers)
+        if assets is None or assets.status_code != 200:
+            return
+        etag = assets.headers.get("etag")
+        if etag:
+            self.call("GET /assets/ (revalidate)", "GET", "/assets/", params={"limit": self.args.page_size},
+                      headers={**headers, "If-None-Match": etag})
+        self.call("GET /beneficiaries/", "GET", "/beneficiaries/", headers=headers)
+        self.call("GET /messages/", "GET", "/messages/", headers=headers)
+        items = assets.json()
+        if not items:
+            return
+        asset = self.rng.choice(items)
+        self.call("GET /assets/{asset_id}", "GET", f"/assets/{asset['asset_id']}", headers=headers)
+        with_files = [a for a in items if a.get("asset_files")]
+        if with_files:
+            asset = self.rng.choice(with_files)
+            self.download("GET /assets/{asset_id}/files/{file_id}",
+                          f"/assets/{asset['asset_id']}/files/{asset['asset_files'][0]['file_id']}", headers)
+
+    def download(self, label, url, headers):
+        start = time.perf_counter()
+        try:
+            with self.client.stream("GET", url, headers=headers) as response:
+                for _ in response.iter_bytes():
+                    pass
+        except httpx.HTTPError as e:
+            self.recorder.add(label, time.perf_counter() - start, type(e).__name__)
+            return
+        self.recorder.add(label, time.perf_counter() - start, response.status_code)
+
+    def upload(self):
+        headers = self.login(self.random_owner())
+        if headers is None:
+            return
+        assets = self.call("GET /assets/", "GET", "/assets/", params={"limit": 1}, headers=headers)
+        if assets is None or assets.status_code != 200 or not assets.json():
+            return
+        asset_id = assets.json()[0]["asset_id"]
+        content = self.rng.randbytes(self.args.upload_size)
+        uploaded = self.call("POST /assets/{asset_id}/files/", "POST", f"/assets/{asset_id}/files/", headers=headers,
+                             files={"file": ("load.bin", content, "application/octet-stream")})
+        if uploaded is not None and uploaded.status_code == 200:
+            self.download("GET /assets/{asset_id}/files/{file_id}",
+                          f"/assets/{asset_id}/files/{uploaded.json()['file_id']}", headers)
+
+    def portal(self):
+        owner = self.random_owner()
+        token = portal_token(self.manifest["prefix"], owner, self.rng.randrange(self.manifest["beneficiaries_per_user"]))
+        auth = self.call("GET /beneficiary-portal/auth", "GET", "/beneficiary-portal/auth", params={"token": token})
+        if auth is None or auth.status_code != 200:
+            return
+        headers = {"X-Portal-Session": auth.json()["session_token"]}
+        assets = self.call("GET /beneficiary-portal/assets", "GET", "/beneficiary-portal/assets", headers=headers)
+        self.call("GET /beneficiary-portal/messages", "GET", "/beneficiary-portal/messages", headers=headers)
+        if assets is None or assets.status_code != 200:
+            return
+        with_files = [a for a in assets.json() if a.get("asset_files")]
+        if with_files:
+            asset = self.rng.choice(with_files)
+            self.download("GET /beneficiary-portal/assets/{asset_id}/files/{file_id}",
+                          f"/beneficiary-portal/assets/{asset['asset_id']}/files/{asset['asset_files'][0]['file_id']}",
+                          headers)
+
+    def claim(self, target):
+        # Beneficiary 0 of user i is user i+1
+        heir = (target + 1) % self.manifest["users"]
+        headers = self.login(heir)
+        if headers is None:
+            return
+        response = self.call(
+            "POST /verifications/inheritance-claim", "POST", "/verifications/inheritance-claim", headers=headers,
+            data={"target_user_email": user_email(self.manifest["prefix"], target)},
+            files={"file": ("death-certificate.pdf", b"%PDF-1.4 load test", "application/pdf")},
+        )
+        if response is None or response.status_code != 202:
+            return
+        job_id = response.json()["job"]["job_id"]
+        self.call("GET /verifications/inheritance-jobs/{job_id}", "GET", f"/verifications/inheritance-jobs/{job_id}",
+                  headers=headers)
+
+
+class ClaimTargets:
+    """Hands out each reserved user once across all threads."""
+
+    def __init__(self, start, end):
+        self._next = start
+        self._end = end
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            if self._next >= self._end:
+                return None
+            target = self._next
+            self._next += 1
+            return target
+
+
+def parse_mix(value):
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def worker(make_client, recorder, manifest, args, claims, deadline, seed, counts):
+    rng = random.Random(seed)
+    client = make_client()
+    session = Session(client, recorder, manifest, args, rng)
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    try:
+        while time.monotonic() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            if scenario == "claim":
+                target = claims.take()
+                if target is None:
+                    scenario = "vault"
+                else:
+                    session.claim(target)
+            if scenario != "claim":
+                getattr(session, scenario)()
+            counts[scenario] += 1
+    finally:
+        client.close()
+
+
+def wait_ready(client, timeout):
+    # The app answers before it is ready; /ready turns 200 once the schema is checked and pools are warm
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = client.get("/ready")
+            if response.status_code == 200:
+                return response.json()
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            sys.exit(f"target not ready after {timeout}s")
+        time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", default="estate.json", help="Written by generate_estate.py")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="Drive src.main.app through TestClient")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("vault=60,upload=10,portal=25,claim=5"))
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--upload-size", type=int, default=64 * 1024)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--ready-timeout", type=float, default=60, help="Seconds to wait for /ready")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="JSON file; printed to stdout when omitted")
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    lifespan = None
+    if args.in_process:
+        from fastapi.testclient import TestClient
+        from src.main import app
+        lifespan = TestClient(app)
+        lifespan.__enter__()  # startup: pools, job workers, dispatchers
+        make_client = lambda: TestClient(app, raise_server_exceptions=False)
+        target = "in-process"
+    else:
+        make_client = lambda: httpx.Client(base_url=args.base_url, timeout=args.timeout)
+        target = args.base_url
+
+    probe = make_client()
+    wait_ready(probe, args.ready_timeout)
+    probe.close()
+
+    recorder = Recorder()
+    claims = ClaimTargets(*manifest["claim_users"])
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    counts = [defaultdict(int) for _ in range(args.concurrency)]
+    started_at = datetime.utcnow()
+    start = time.perf_counter()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(make_client, recorder, manifest, args, claims, deadline, seed + i, counts[i]))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    if lifespan is not None:
+        lifespan.__exit__(None, None, None)
+
+    all_latencies = [ms for latencies in recorder.latencies.values() for ms in latencies]
+    all_statuses = defaultdict(int)
+    for statuses in recorder.statuses.values():
+        for status, count in statuses.items():
+            all_statuses[status] += count
+    sessions = defaultdict(int)
+    for thread_counts in counts:
+        for name, count in thread_counts.items():
+            sessions[name] += count
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "target": target,
+        "database": manifest.get("database"),
+        "estate": {key: manifest.get(key) for key in ("users", "assets_per_user", "beneficiaries_per_user", "rows")},
+        "config": {
+            "duration": args.duration, "concurrency": args.concurrency, "mix": args.mix,
+            "page_size": args.page_size, "upload_size": args.upload_size, "seed": seed,
+        },
+        "wall_seconds": round(wall, 2),
+        "sessions": dict(sessions),
+        "total": summarize(all_latencies, all_statuses, wall),
+        "endpoints": {
+            label: summarize(recorder.latencies[label], recorder.statuses[label], wall)
+            for label in sorted(recorder.latencies)
+        },
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        total = report["total"]
+        print(f"{total['count']} requests in {wall:.1f}s: {total['rps']} req/s, "
+              f"p50={total['p50_ms']}ms p95={total['p95_ms']}ms p99={total['p99_ms']}ms -> {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
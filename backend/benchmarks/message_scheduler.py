@@ -0,0 +1,173 @@
+"""
+Time-capsule delivery with millions of pending messages. Loads --messages
+future-scheduled messages plus --due messages that are already due and
+--estate upon_death messages held for one owner, then reports:
+
+  * the plan and latency of the due-message claim query, against the same
+    query forced to scan the table,
+  * scheduler throughput draining the due messages (--schedulers threads),
+  * the set-based upon_death release for the estate and its delivery.
+
+Exits 1 if any message is delivered twice or left undelivered.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/message_scheduler.py --messages 2000000 --schedulers 4
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/message_scheduler.py --messages 1000000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import func, insert, select, text
+
+from explain_hot_queries import explain
+from src.database import connection
+from src.database.base import Base
+from src.database.models import Beneficiary, Notification, User, UserMessage
+from src.services import message_service
+
+CHUNK = 20000
+
+
+def load(args, run_id):
+    now = datetime.utcnow()
+    owners = [str(uuid.uuid4()) for _ in range(args.owners)]
+    with connection.engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": owner, "email": f"{run_id}-{i}@example.com", "password_hash": "x", "first_name": f"Owner {i}"}
+            for i, owner in enumerate(owners)
+        ])
+        conn.execute(insert(Beneficiary), [
+            {"beneficiary_id": str(uuid.uuid4()), "user_id": owner, "email": f"heir-{run_id}-{i}@example.com", "status": "active"}
+            for i, owner in enumerate(owners)
+        ])
+
+    def rows(count, condition, deliver_at, owner=None):
+        for i in range(count):
+            yield {
+                "message_id": str(uuid.uuid4()),
+                "user_id": owner or owners[i % len(owners)],
+                "beneficiary_id": None,
+                "message_title": f"{run_id} {condition} {i}",
+                "message_content": "sealed",
+                "delivery_condition": condition,
+                "deliver_at": deliver_at(i),
+                "delivered": False,
+            }
+
+    batches = [
+        rows(args.messages, "scheduled_date", lambda i: now + timedelta(days=1 + i % 3650)),
+        rows(args.due, "scheduled_date", lambda i: now - timedelta(seconds=1 + i)),
+        rows(args.estate, "upon_death", lambda i: None, owner=owners[0]),
+    ]
+    start = time.perf_counter()
+    loaded = 0
+    for batch in batches:
+        chunk = []
+        for row in batch:
+            chunk.append(row)
+            if len(chunk) == CHUNK:
+                with connection.engine.begin() as conn:
+                    conn.execute(insert(UserMessage), chunk)
+                loaded += len(chunk)
+                chunk = []
+        if chunk:
+            with connection.engine.begin() as conn:
+                conn.execute(insert(UserMessage), chunk)
+            loaded += len(chunk)
+    print(f"loaded {loaded} messages in {time.perf_counter() - start:.1f}s")
+    return owners
+
+
+def time_query(conn, sql, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(text(sql)).all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def compare_claim_query(batch_size):
+    stmt = (
+        select(UserMessage.message_id)
+        .where(*message_service._due(datetime.utcnow()))
+        .limit(batch_size)
+    )
+    with connection.engine.connect() as conn:
+        lines, scans = explain(conn, stmt)
+        print("claim query plan:", "; ".join(lines))
+        sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        hint = "NOT INDEXED" if conn.dialect.name == "sqlite" else "IGNORE INDEX (ix_user_messages_due)"
+        scan_sql = sql.replace("FROM user_messages", f"FROM user_messages {hint}", 1)
+        print(f"claim query: indexed={time_query(conn, sql):.2f}ms scan={time_query(conn, scan_sql, repeat=2):.2f}ms")
+    return scans
+
+
+def drain(schedulers, batch_size):
+    delivered = [0] * schedulers
+
+    def run(i):
+        while True:
+            db = connection.SessionLocal()
+            try:
+                count = message_service.deliver_due_messages(db, batch_size)
+            finally:
+                db.close()
+            if not count:
+                return
+            delivered[i] += count
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(schedulers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(delivered), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000000, help="Pending messages scheduled in the future")
+    parser.add_argument("--due", type=int, default=5000)
+    parser.add_argument("--estate", type=int, default=5000, help="upon_death messages of the deceased owner")
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=message_service.MESSAGE_DELIVERY_BATCH_SIZE)
+    parser.add_argument("--schedulers", type=int, default=1, help="Concurrent scheduler threads (use 1 on SQLite)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=connection.engine)
+    run_id = uuid.uuid4().hex[:8]
+    owners = load(args, run_id)
+
+    scans = compare_claim_query(args.batch_size)
+
+    delivered, wall = drain(args.schedulers, args.batch_size)
+    print(f"scheduled: delivered={delivered} in {wall:.2f}s ({delivered / wall:.0f} msgs/s)")
+
+    db = connection.SessionLocal()
+    start = time.perf_counter()
+    released = message_service.release_messages(db, owners[0], "upon_death")
+    db.commit()
+    db.close()
+    print(f"upon_death release: {released} messages in {(time.perf_counter() - start) * 1000:.1f}ms (one UPDATE)")
+    estate_delivered, wall = drain(args.schedulers, args.batch_size)
+    print(f"upon_death: delivered={estate_delivered} in {wall:.2f}s ({estate_delivered / wall:.0f} msgs/s)")
+
+    with connection.engine.connect() as conn:
+        notifications = conn.execute(
+            select(func.count()).select_from(Notification).where(Notification.recipient_email.like(f"heir-{run_id}-%"))
+        ).scalar_one()
+    expected = args.due + args.estate
+    print(f"notifications={notifications} expected={expected}")
+    if scans or delivered + estate_delivered != expected or notifications != expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Delivers a burst of outbox notifications to a local SMTP sink through the
+NotificationDispatcher and reports throughput, SMTP connections opened and
+final delivery_status counts. Exits 1 unless every notification is sent.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/notification_outbox.py --notifications 2000 --fail-every 7
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import func, select
+
+from smtp_sink import SMTPSink
+from src.database import connection
+from src.database.base import Base
+from src.database.models import Notification
+from src.services import notification_service
+from src.utils.mailer import SMTPConnectionPool
+from src.utils.notification_dispatcher import NotificationDispatcher
+
+
+def queue(count, run_id):
+    db = connection.SessionLocal()
+    try:
+        for i in range(count):
+            notification_service.queue_notification(
+                db,
+                recipient_email=f"heir-{run_id}-{i}@example.com",
+                subject="Inheritance Access Granted",
+                message=f"Access has been granted ({i}).",
+                notification_type="access_granted",
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def status_counts(run_id):
+    db = connection.SessionLocal()
+    try:
+        rows = db.execute(
+            select(Notification.delivery_status, func.count())
+            .where(Notification.recipient_email.like(f"heir-{run_id}-%"))
+            .group_by(Notification.delivery_status)
+        ).all()
+        return dict(rows)
+    finally:
+        db.close()
+
+
+async def drain(dispatcher):
+    rounds = 0
+    while await dispatcher.dispatch_once():
+        rounds += 1
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notifications", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fail-every", type=int, default=0, help="Sink answers every Nth message with a 451")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=connection.engine)
+    # Transient failures are expected when --fail-every is set
+    logging.getLogger("src.utils.notification_dispatcher").setLevel(logging.ERROR)
+    sink = SMTPSink(fail_every=args.fail_every).start()
+    mailer = SMTPConnectionPool("127.0.0.1", sink.port, starttls=False, max_idle=args.concurrency)
+    dispatcher = NotificationDispatcher(mailer=mailer, batch_size=args.batch_size, concurrency=args.concurrency)
+
+    run_id = uuid.uuid4().hex[:8]
+    queue(args.notifications, run_id)
+
+    start = time.perf_counter()
+    rounds = asyncio.run(drain(dispatcher))
+
+    # Retry immediately instead of waiting out the backoff
+    for _ in range(5):
+        if not status_counts(run_id).get("pending"):
+            break
+        db = connection.SessionLocal()
+        db.query(Notification).filter(Notification.delivery_status == "pending").update(
+            {Notification.next_attempt_at: func.now()}, synchronize_session=False
+        )
+        db.commit()
+        db.close()
+        rounds += asyncio.run(drain(dispatcher))
+    wall = time.perf_counter() - start
+
+    mailer.close()
+    sink.stop()
+    counts = status_counts(run_id)
+    print(
+        f"notifications={args.notifications} rounds={rounds} wall={wall:.2f}s "
+        f"msgs/s={args.notifications / wall:.1f} smtp_connections={mailer.opened} "
+        f"sink_received={len(sink.messages)} retried={dispatcher.retried}"
+    )
+    print(f"delivery_status={counts}")
+    if counts.get("sent", 0) != args.notifications:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
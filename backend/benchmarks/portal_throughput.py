@@ -0,0 +1,86 @@
+"""
+Beneficiary-portal requests per second and SQL statements per request for
+the three ways of authenticating: access token with the cache disabled
+(database lookup every call), access token with the cache, and the
+stateless X-Portal-Session token.
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://... python benchmarks/portal_throughput.py --requests 2000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.database import connection
+from src.main import app
+from src.services import beneficiary_service
+from src.utils.portal_tokens import portal_token_cache
+
+statement_count = 0
+
+
+def count_statement(*_args, **_kwargs):
+    global statement_count
+    statement_count += 1
+
+
+def run(client, label, path, requests, params=None, headers=None):
+    global statement_count
+    client.get(path, params=params, headers=headers)  # warm up
+    statement_count = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+    wall = time.perf_counter() - start
+    print(f"{label:<16} rps={requests / wall:9.1f} statements/request={statement_count / requests:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/beneficiary-portal/assets", help="Portal endpoint to drive")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        token = client.post(
+            "/auth/register",
+            json={"email": email, "password": "benchmark", "first_name": "Bench", "last_name": "User"},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        beneficiary = client.post("/beneficiaries/", json={"email": f"heir-{email}"}, headers=headers).json()
+        for i in range(10):
+            client.post(
+                "/assets/",
+                json={"asset_type": "document", "asset_name": f"Released {i}", "beneficiary_ids": [beneficiary["beneficiary_id"]]},
+                headers=headers,
+            )
+
+        db = connection.SessionLocal()
+        try:
+            raw_token = beneficiary_service.generate_access_token(db, beneficiary["beneficiary_id"])
+        finally:
+            db.close()
+
+        event.listen(connection.engine, "before_cursor_execute", count_statement)
+
+        portal_token_cache.enabled = False
+        run(client, "db lookup", args.path, args.requests, params={"token": raw_token})
+        portal_token_cache.enabled = True
+        run(client, "token cache", args.path, args.requests, params={"token": raw_token})
+
+        session_token = client.get("/beneficiary-portal/auth", params={"token": raw_token}).json()["session_token"]
+        run(client, "session token", args.path, args.requests, headers={"X-Portal-Session": session_token})
+        print(portal_token_cache.snapshot())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Counts SQL statements per authenticated request with the principal cache
+enabled and disabled.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/principal_cache_queries.py --requests 500
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.database import connection
+from src.main import app
+from src.utils.principal_cache import principal_cache
+
+statement_count = 0
+
+
+def count_statement(*_args, **_kwargs):
+    global statement_count
+    statement_count += 1
+
+
+event.listen(connection.engine, "before_cursor_execute", count_statement)
+event.listen(connection.async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+
+def run(client, headers, requests, enabled):
+    global statement_count
+    principal_cache.enabled = enabled
+    principal_cache.clear()
+    statement_count = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/beneficiaries/", headers=headers)
+    wall = time.perf_counter() - start
+    label = "cache on" if enabled else "cache off"
+    print(
+        f"{label:<10} requests={requests} queries={statement_count} "
+        f"queries/request={statement_count / requests:.2f} "
+        f"latency/request={wall / requests * 1000:.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        response = client.post(
+            "/auth/register",
+            json={"email": email, "password": "benchmark", "first_name": "Bench", "last_name": "User"},
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        run(client, headers, args.requests, enabled=False)
+        run(client, headers, args.requests, enabled=True)
+        print(principal_cache.snapshot())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Per-item cost of serializing vault list responses. Each list is built from
+in-memory ORM rows (no database) and rendered three ways:
+
+  * jsonable: validate from attributes, dump to Python, json.dumps (the
+    JSONResponse path used for a response_model before FastAPI's fast path),
+  * dump_json: validate from attributes, dump to JSON in Pydantic's core
+    (FastAPI's response_model path, utils.serialization.ModelListAdapter),
+  * rows: plain dicts straight from the rows, rendered by orjson
+    (utils.serialization.RowSerializer, used by the read-only lists).
+
+Exits 1 if the three do not produce the same JSON.
+
+Usage (from backend/):
+    python benchmarks/response_serialization.py --items 100 --rounds 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.database.models import AccessRule, Asset, AssetFile, Beneficiary, UserMessage
+from src.schemas import asset as asset_schema, beneficiary as beneficiary_schema, user_message as message_schema
+from src.utils.serialization import ModelListAdapter, RowSerializer
+
+
+def build_assets(count, beneficiaries_per_asset, files_per_asset):
+    user_id = str(uuid.uuid4())
+    beneficiaries = [
+        Beneficiary(beneficiary_id=str(uuid.uuid4()), user_id=user_id, email=f"heir{i}@example.com",
+                    first_name=f"Heir {i}", last_name="Example", relationship_type="child", is_registered=i % 2 == 0)
+        for i in range(beneficiaries_per_asset)
+    ]
+    assets = []
+    for i in range(count):
+        asset_id = str(uuid.uuid4())
+        asset = Asset(
+            asset_id=asset_id, user_id=user_id, asset_type="login_credential", platform_name="Example Bank",
+            asset_name=f"Account {i}", username=f"user{i}", password="ciphertext" * 4,
+            recovery_email=f"recovery{i}@example.com", notes="Kept in the safe deposit box." * 3, category="Finance",
+        )
+        asset.access_rules = [
+            AccessRule(rule_id=str(uuid.uuid4()), user_id=user_id, asset_id=asset_id, beneficiary=b, access_type="full")
+            for b in beneficiaries
+        ]
+        asset.asset_files = [
+            AssetFile(file_id=str(uuid.uuid4()), asset_id=asset_id, file_name=f"statement-{j}.pdf",
+                      file_type="application/pdf", file_size=1024 * (j + 1), content_sha256=uuid.uuid4().hex * 2)
+            for j in range(files_per_asset)
+        ]
+        assets.append(asset)
+    return assets, beneficiaries
+
+
+def build_messages(count):
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        UserMessage(
+            message_id=str(uuid.uuid4()), user_id=str(uuid.uuid4()), beneficiary_id=None,
+            message_title=f"Letter {i}", message_content="To be opened later. " * 20,
+            delivery_condition="scheduled_date", deliver_at=now + timedelta(days=i), created_at=now,
+            delivered=False, delivered_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def render_jsonable(adapter, rows):
+    value = adapter.adapter.validate_python(list(rows), from_attributes=True)
+    content = adapter.adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def measure(fn, rows, rounds):
+    fn(rows)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = fn(rows)
+    return (time.perf_counter() - start) / rounds / len(rows) * 1e6, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100, help="Rows per list response")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--beneficiaries", type=int, default=3, help="Beneficiaries per asset")
+    parser.add_argument("--files", type=int, default=2, help="Files per asset")
+    args = parser.parse_args()
+
+    assets, beneficiaries = build_assets(args.items, args.beneficiaries, args.files)
+    lists = [
+        ("assets", asset_schema.Asset, assets),
+        ("beneficiaries", beneficiary_schema.Beneficiary, beneficiaries * (args.items // max(len(beneficiaries), 1) or 1)),
+        ("messages", message_schema.UserMessage, build_messages(args.items)),
+    ]
+
+    mismatches = 0
+    for name, model, rows in lists:
+        adapter = ModelListAdapter(model)
+        row_serializer = RowSerializer(model)
+        results = {
+            "jsonable": measure(lambda r: render_jsonable(adapter, r), rows, args.rounds),
+            "dump_json": measure(adapter.dump_json, rows, args.rounds),
+            "rows": measure(row_serializer.dump_json, rows, args.rounds),
+        }
+        baseline = results["jsonable"][0]
+        summary = "  ".join(
+            f"{method}={per_item:.2f}us/item ({baseline / per_item:.1f}x)" for method, (per_item, _) in results.items()
+        )
+        print(f"{name} ({len(rows)} items, {len(results['rows'][1])} bytes): {summary}")
+        bodies = [json.loads(body) for _, body in results.values()]
+        if any(body != bodies[0] for body in bodies[1:]):
+            print(f"{name}: serialized output differs between methods")
+            mismatches += 1
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Minimal local SMTP server that accepts and records every message, for
+exercising the notification dispatcher without a real mail relay. It can
+also reject a share of messages with a transient 451 to exercise retries.
+
+Usage (from backend/):
+    python benchmarks/smtp_sink.py --port 1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false uvicorn src.main:app
+"""
+import argparse
+import asyncio
+import threading
+
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_every: int = 0, verbose: bool = False):
+        self.host = host
+        self.port = port
+        self.fail_every = fail_every
+        self.verbose = verbose
+        self.messages = []
+        self.connections = 0
+        self._received = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 sink ESMTP")
+        sender, recipients = None, []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                await reply("250-sink\r\n250 8BITMIME" if verb == "EHLO" else "250 sink")
+            elif verb == "MAIL":
+                sender, recipients = command[10:], []
+                await reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command[8:])
+                await reply("250 OK")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = await reader.readline()
+                    if data in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data)
+                self._received += 1
+                if self.fail_every and self._received % self.fail_every == 0:
+                    await reply("451 Temporary failure, try again")
+                    continue
+                self.messages.append((sender, recipients, b"".join(lines)))
+                if self.verbose:
+                    print(f"--- message from {sender} to {', '.join(recipients)}\n{b''.join(lines).decode(errors='replace')}")
+                await reply("250 OK queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                await reply("250 OK")
+            elif verb == "NOOP":
+                await reply("250 OK")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+        writer.close()
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> "SMTPSink":
+        """Runs the sink on a background thread and returns once it is listening."""
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._serve())
+            except asyncio.CancelledError:
+                pass
+
+        threading.Thread(target=run, name="smtp-sink", daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(self._loop)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth message with a transient 451")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.fail_every, verbose=True)
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    asyncio.run(sink._serve())
+
+
+if __name__ == "__main__":
+    main()
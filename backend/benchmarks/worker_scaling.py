@@ -0,0 +1,140 @@
+"""
+Throughput as the server scales from 1 to N worker processes. For each
+--workers count it starts serve.py on a free port, waits for /ready, runs
+load_driver.py against it for --duration seconds and then stops the server
+with SIGTERM, timing the graceful drain. Reports req/s, latency percentiles
+and error rate per worker count, plus speedup over the first count.
+
+The database must hold an estate from generate_estate.py. The default mix
+leaves out claims, which consume their reserved users on the first run.
+Results only scale up to the cores the machine (and the database) can give.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/generate_estate.py --users 2000 --manifest estate.json
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/worker_scaling.py --manifest estate.json --workers 1,2,4 --duration 30
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LOAD_DRIVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_driver.py")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_counts(value):
+    counts = sorted({int(part) for part in value.split(",") if part.strip()})
+    if not counts or counts[0] < 1:
+        raise argparse.ArgumentTypeError("worker counts must be positive integers, e.g. 1,2,4")
+    return counts
+
+
+def wait_ready(base_url, server, timeout):
+    deadline = time.monotonic() + timeout
+    with httpx.Client(base_url=base_url, timeout=5) as client:
+        while time.monotonic() < deadline and server.poll() is None:
+            try:
+                if client.get("/ready").status_code == 200:
+                    return True
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+    return False
+
+
+def stop(server, timeout):
+    # SIGTERM: workers finish in-flight requests, then drain their queues
+    start = time.monotonic()
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+        return None
+    return round(time.monotonic() - start, 2)
+
+
+def run(workers, args, log_dir):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(log_dir, f"server-{workers}.log")
+    output_path = os.path.join(log_dir, f"load-{workers}.json")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        if not wait_ready(base_url, server, args.ready_timeout):
+            with open(log_path) as log:
+                sys.exit(f"{workers} worker(s): server not ready\n{log.read()[-2000:]}")
+        subprocess.run(
+            [sys.executable, LOAD_DRIVER, "--manifest", args.manifest, "--base-url", base_url,
+             "--duration", str(args.duration), "--concurrency", str(args.concurrency), "--mix", args.mix,
+             "--seed", str(args.seed), "--output", output_path],
+            cwd=BACKEND_DIR, check=True,
+        )
+    finally:
+        shutdown_seconds = stop(server, args.shutdown_timeout)
+    with open(output_path, encoding="utf-8") as f:
+        total = json.load(f)["total"]
+    return {
+        "workers": workers,
+        "rps": total["rps"],
+        "p50_ms": total["p50_ms"],
+        "p95_ms": total["p95_ms"],
+        "p99_ms": total["p99_ms"],
+        "error_rate": total["error_rate"],
+        "shutdown_seconds": shutdown_seconds,
+        "exit_code": server.returncode,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", default="estate.json", help="Written by generate_estate.py")
+    parser.add_argument("--workers", type=parse_counts, default=parse_counts(f"1,{os.cpu_count() or 1}"),
+                        help="Comma-separated worker counts (default: 1 and the CPU count)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="Virtual users")
+    parser.add_argument("--mix", default="vault=70,upload=5,portal=25")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ready-timeout", type=float, default=120)
+    parser.add_argument("--shutdown-timeout", type=float, default=120)
+    parser.add_argument("--output", default=None, help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="worker-scaling-") as log_dir:
+        for workers in args.workers:
+            result = run(workers, args, log_dir)
+            results.append(result)
+
+    baseline = results[0]["rps"] or None
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'drain s':>7}")
+    for result in results:
+        result["speedup"] = round(result["rps"] / baseline, 2) if baseline else None
+        print(f"{result['workers']:>7} {result['rps']:>9} {result['speedup']!s:>7} {result['p50_ms']!s:>8} "
+              f"{result['p95_ms']!s:>8} {result['p99_ms']!s:>8} {result['error_rate']:>7} {result['shutdown_seconds']!s:>7}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cpus": os.cpu_count(), "config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
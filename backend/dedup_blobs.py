@@ -0,0 +1,144 @@
+"""
+One-shot migration of existing asset files into the content-addressed blob
+store (src/utils/blob_store.py).
+
+Files are hashed in parallel, placed in the store under their SHA-256
+(identical content is stored once), the AssetFile rows are repointed in
+batches and only then are the original files removed, so an interrupted run
+can simply be started again.
+
+Usage (from backend/):
+    python dedup_blobs.py [--workers 8] [--batch-size 500] [--dry-run] [--gc]
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to the system path to allow imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from sqlalchemy import func, select, update
+from src.database.connection import SessionLocal
+from src.database.models import AssetFile
+from src.utils import blob_store
+
+
+def hash_or_none(path):
+    try:
+        return blob_store.hash_file(path)
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def place_blob(source, digest):
+    """Puts a copy of source into the store without touching the original."""
+    final_path = blob_store.blob_path(digest)
+    if os.path.exists(final_path):
+        return final_path, False
+    temp_path = blob_store.new_temp_path()
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    return blob_store.commit_blob(temp_path, digest)
+
+
+def migrate(db, workers, batch_size, dry_run):
+    rows = db.execute(select(AssetFile.file_id, AssetFile.encrypted_file_path)).all()
+    legacy = {}
+    for file_id, path in rows:
+        if path and not blob_store.is_blob_path(path):
+            legacy.setdefault(path, []).append(file_id)
+
+    stats = {"files": len(legacy), "rows": 0, "missing": 0, "duplicates": 0, "bytes_reclaimed": 0}
+    known = set()
+    pending, originals = [], []
+
+    def flush():
+        if pending and not dry_run:
+            db.execute(update(AssetFile), pending)
+            db.commit()
+            for path in originals:
+                os.remove(path)
+        pending.clear()
+        originals.clear()
+
+    paths = list(legacy)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, result in zip(paths, pool.map(hash_or_none, paths)):
+            if result is None:
+                stats["missing"] += 1
+                continue
+            digest, size = result
+            duplicate = digest in known or os.path.exists(blob_store.blob_path(digest))
+            known.add(digest)
+            if duplicate:
+                stats["duplicates"] += 1
+                stats["bytes_reclaimed"] += size
+            if dry_run:
+                stats["rows"] += len(legacy[path])
+                continue
+            final_path, _ = place_blob(path, digest)
+            for file_id in legacy[path]:
+                pending.append({"file_id": file_id, "encrypted_file_path": final_path, "content_sha256": digest})
+            stats["rows"] += len(legacy[path])
+            originals.append(path)
+            if len(pending) >= batch_size:
+                flush()
+    flush()
+    return stats
+
+
+def collect_garbage(db, dry_run):
+    """Removes blobs no AssetFile row references any more."""
+    referenced = set(
+        db.execute(select(AssetFile.content_sha256).where(AssetFile.content_sha256.isnot(None)).group_by(AssetFile.content_sha256)).scalars()
+    )
+    removed, freed = 0, 0
+    now = time.time()
+    for directory, dirnames, filenames in os.walk(blob_store.BLOB_ROOT):
+        if "tmp" in dirnames:
+            dirnames.remove("tmp")
+        for name in filenames:
+            path = os.path.join(directory, name)
+            if name in referenced or now - os.path.getmtime(path) < blob_store.ORPHAN_GRACE_SECONDS:
+                continue
+            removed += 1
+            freed += os.path.getsize(path) if dry_run else blob_store._remove(path)
+    return {"orphans_removed": removed, "bytes_reclaimed": freed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without moving files")
+    parser.add_argument("--gc", action="store_true", help="Also remove blobs with no remaining references")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = migrate(db, args.workers, args.batch_size, args.dry_run)
+        print(
+            f"Migrated {stats['rows']} rows from {stats['files']} files "
+            f"({stats['duplicates']} duplicates, {stats['missing']} missing) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        print(f"Bytes reclaimed by deduplication: {stats['bytes_reclaimed']}")
+        if args.gc:
+            gc_stats = collect_garbage(db, args.dry_run)
+            print(f"Removed {gc_stats['orphans_removed']} unreferenced blobs, reclaiming {gc_stats['bytes_reclaimed']} bytes")
+        total = db.execute(select(func.count()).select_from(AssetFile)).scalar()
+        print(f"Asset files in database: {total}")
+        if args.dry_run:
+            print("Dry run: nothing was changed")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""baseline schema
+
+Schema as created by Base.metadata.create_all before migrations were
+introduced. Databases that were created that way are adopted with
+`alembic stamp 0001` followed by `alembic upgrade head`; tables, columns
+and indexes added to the models in the meantime arrive with 0008.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 22:10:13.910798
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('admin_users',
+    sa.Column('admin_id', sa.String(length=36), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=512), nullable=False),
+    sa.Column('first_name', sa.String(length=255), nullable=True),
+    sa.Column('last_name', sa.String(length=255), nullable=True),
+    sa.Column('role', sa.Enum('super_admin', 'support', 'verifier', name='admin_role_enum'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('active', 'inactive', name='admin_status_enum'), nullable=True),
+    sa.PrimaryKeyConstraint('admin_id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('partners',
+    sa.Column('partner_id', sa.String(length=36), nullable=False),
+    sa.Column('company_name', sa.String(length=255), nullable=False),
+    sa.Column('contact_email', sa.String(length=255), nullable=True),
+    sa.Column('contact_phone', sa.String(length=255), nullable=True),
+    sa.Column('license_type', sa.String(length=255), nullable=True),
+    sa.Column('license_start_date', sa.DateTime(), nullable=True),
+    sa.Column('license_end_date', sa.DateTime(), nullable=True),
+    sa.Column('annual_fee', sa.DECIMAL(), nullable=True),
+    sa.Column('status', sa.Enum('active', 'suspended', 'expired', name='partner_status_enum'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('partner_id')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=512), nullable=False),
+    sa.Column('first_name', sa.String(length=255), nullable=True),
+    sa.Column('last_name', sa.String(length=255), nullable=True),
+    sa.Column('phone_number', sa.String(length=255), nullable=True),
+    sa.Column('date_of_birth', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('account_status', sa.Enum('active', 'suspended', 'deceased', 'deleted', name='account_status_enum'), nullable=True),
+    sa.Column('email_verified', sa.Boolean(), nullable=True),
+    sa.Column('mfa_enabled', sa.Boolean(), nullable=True),
+    sa.Column('mfa_secret', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('assets',
+    sa.Column('asset_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('asset_type', sa.Enum('login_credential', 'crypto_wallet', 'document', 'social_media', 'financial', 'other', name='asset_type_enum'), nullable=True),
+    sa.Column('platform_name', sa.String(length=255), nullable=True),
+    sa.Column('asset_name', sa.String(length=255), nullable=True),
+    sa.Column('username', sa.String(length=255), nullable=True),
+    sa.Column('password', sa.String(length=255), nullable=True),
+    sa.Column('recovery_email', sa.String(length=255), nullable=True),
+    sa.Column('recovery_phone', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('last_accessed', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('asset_id')
+    )
+    op.create_table('beneficiaries',
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('first_name', sa.String(length=255), nullable=True),
+    sa.Column('last_name', sa.String(length=255), nullable=True),
+    sa.Column('phone_number', sa.String(length=255), nullable=True),
+    sa.Column('relationship_type', sa.String(length=255), nullable=True),
+    sa.Column('priority_level', sa.Integer(), nullable=True),
+    sa.Column('added_date', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('status', sa.Enum('active', 'inactive', 'revoked', name='beneficiary_status_enum'), nullable=True),
+    sa.Column('notification_sent', sa.Boolean(), nullable=True),
+    sa.Column('is_registered', sa.Boolean(), nullable=True),
+    sa.Column('access_token_hash', sa.String(length=255), nullable=True),
+    sa.Column('token_expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('beneficiary_id')
+    )
+    op.create_table('encryption_keys',
+    sa.Column('key_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('key_hash', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('rotated_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('active', 'rotated', 'revoked', name='key_status_enum'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('key_id')
+    )
+    op.create_table('partner_clients',
+    sa.Column('client_id', sa.String(length=36), nullable=False),
+    sa.Column('partner_id', sa.String(length=36), nullable=True),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('referral_date', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('commission_paid', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['partner_id'], ['partners.partner_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('client_id')
+    )
+    op.create_table('subscription',
+    sa.Column('subscription_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('plan_type', sa.Enum('free', 'premium', 'partner', name='plan_type_enum'), nullable=True),
+    sa.Column('status', sa.Enum('active', 'expired', 'cancelled', 'pending', name='sub_status_enum'), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('payment_method_id', sa.String(length=255), nullable=True),
+    sa.Column('auto_renew', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('subscription_id')
+    )
+    op.create_table('access_logs',
+    sa.Column('log_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('asset_id', sa.String(length=36), nullable=True),
+    sa.Column('action_type', sa.Enum('login', 'view_asset', 'download', 'update', 'delete', 'access_granted', name='action_type_enum'), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('status', sa.Enum('success', 'failed', 'blocked', name='log_status_enum'), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.asset_id'], ),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('log_id')
+    )
+    op.create_table('access_rules',
+    sa.Column('rule_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('asset_id', sa.String(length=36), nullable=True),
+    sa.Column('access_type', sa.Enum('full', 'view_only', 'download', name='access_type_enum'), nullable=True),
+    sa.Column('conditions', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.asset_id'], ),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('rule_id')
+    )
+    op.create_table('asset_files',
+    sa.Column('file_id', sa.String(length=36), nullable=False),
+    sa.Column('asset_id', sa.String(length=36), nullable=True),
+    sa.Column('file_name', sa.String(length=255), nullable=True),
+    sa.Column('file_type', sa.String(length=255), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('encrypted_file_path', sa.String(length=512), nullable=True),
+    sa.Column('encryption_key_id', sa.String(length=255), nullable=True),
+    sa.Column('uploaded_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.asset_id'], ),
+    sa.PrimaryKeyConstraint('file_id')
+    )
+    op.create_table('crypto_assets',
+    sa.Column('crypto_asset_id', sa.String(length=36), nullable=False),
+    sa.Column('wallet_type', sa.Enum('bitcoin', 'ethereum', 'usdt', 'solana', 'xrp', 'cardano', 'polkadot', 'usdc', name='wallet_type_enum'), nullable=True),
+    sa.Column('wallet_address', sa.String(length=255), nullable=True),
+    sa.Column('private_key', sa.String(length=512), nullable=True),
+    sa.Column('seed_phrase', sa.String(length=512), nullable=True),
+    sa.Column('balance_usd', sa.DECIMAL(), nullable=True),
+    sa.Column('balance_crypto', sa.DECIMAL(), nullable=True),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crypto_asset_id'], ['assets.asset_id'], ),
+    sa.PrimaryKeyConstraint('crypto_asset_id')
+    )
+    op.create_table('notifications',
+    sa.Column('notification_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('notification_type', sa.Enum('subscription_expiry', 'verification_update', 'access_granted', 'system_alert', name='notification_type_enum'), nullable=True),
+    sa.Column('subject', sa.String(length=255), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.Column('delivery_status', sa.Enum('pending', 'sent', 'failed', name='delivery_status_enum'), nullable=True),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('notification_id')
+    )
+    op.create_table('payments',
+    sa.Column('payment_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('subscription_id', sa.String(length=36), nullable=True),
+    sa.Column('amount', sa.DECIMAL(), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('payment_type', sa.Enum('monthly_subscription', 'guided_service', 'partner_license', name='payment_type_enum'), nullable=True),
+    sa.Column('payment_status', sa.Enum('pending', 'completed', 'failed', 'refunded', name='payment_status_enum'), nullable=True),
+    sa.Column('payment_method', sa.Enum('credit_card', 'paypal', 'bank_transfer', name='payment_method_enum'), nullable=True),
+    sa.Column('transaction_id', sa.String(length=255), nullable=True),
+    sa.Column('payment_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.subscription_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('payment_id')
+    )
+    op.create_table('user_messages',
+    sa.Column('message_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('message_title', sa.String(length=255), nullable=True),
+    sa.Column('message_content', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('delivery_condition', sa.Enum('upon_death', 'after_verification', 'scheduled_date', name='delivery_condition_enum'), nullable=True),
+    sa.Column('delivered', sa.Boolean(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_table('verification_requests',
+    sa.Column('request_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('requester_email', sa.String(length=255), nullable=True),
+    sa.Column('request_date', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'under_review', 'approved', 'rejected', name='request_status_enum'), nullable=True),
+    sa.Column('reviewed_by', sa.String(length=36), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('rejection_reason', sa.Text(), nullable=True),
+    sa.Column('approval_expiry_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['admin_users.admin_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('request_id')
+    )
+    op.create_table('crypto_allocations',
+    sa.Column('allocation_id', sa.String(length=36), nullable=False),
+    sa.Column('crypto_asset_id', sa.String(length=36), nullable=True),
+    sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+    sa.Column('percentage', sa.DECIMAL(), nullable=True),
+    sa.Column('allocated_amount_usd', sa.DECIMAL(), nullable=True),
+    sa.Column('allocated_amount_crypto', sa.DECIMAL(), nullable=True),
+    sa.Column('disbursement_status', sa.Enum('pending', 'approved', 'disbursed', name='disbursement_status_enum'), nullable=True),
+    sa.Column('mock_transaction_id', sa.String(length=255), nullable=True),
+    sa.Column('disbursed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['beneficiary_id'], ['beneficiaries.beneficiary_id'], ),
+    sa.ForeignKeyConstraint(['crypto_asset_id'], ['crypto_assets.crypto_asset_id'], ),
+    sa.PrimaryKeyConstraint('allocation_id')
+    )
+    op.create_table('verification_documents',
+    sa.Column('document_id', sa.String(length=36), nullable=False),
+    sa.Column('request_id', sa.String(length=36), nullable=True),
+    sa.Column('document_type', sa.Enum('death_certificate', 'government_id', 'legal_authorization', 'other', name='doc_type_enum'), nullable=True),
+    sa.Column('file_name', sa.String(length=255), nullable=True),
+    sa.Column('encrypted_file_path', sa.String(length=512), nullable=True),
+    sa.Column('uploaded_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('verified', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['request_id'], ['verification_requests.request_id'], ),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('verification_documents')
+    op.drop_table('crypto_allocations')
+    op.drop_table('verification_requests')
+    op.drop_table('user_messages')
+    op.drop_table('payments')
+    op.drop_table('notifications')
+    op.drop_table('crypto_assets')
+    op.drop_table('asset_files')
+    op.drop_table('access_rules')
+    op.drop_table('access_logs')
+    op.drop_table('subscription')
+    op.drop_table('partner_clients')
+    op.drop_table('encryption_keys')
+    op.drop_table('beneficiaries')
+    op.drop_table('assets')
+    op.drop_table('users')
+    op.drop_table('partners')
+    op.drop_table('admin_users')
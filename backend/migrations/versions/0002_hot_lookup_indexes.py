@@ -0,0 +1,43 @@
+"""hot lookup indexes
+
+Indexes for lookups that previously scanned their tables: beneficiary-portal
+token checks, beneficiary email matching, active beneficiaries per user,
+access rules by beneficiary/asset and the duplicate inheritance claim check.
+Asset.user_id is served by the leading column of ix_assets_user_created (0008).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 22:10:31.085476
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_beneficiaries_access_token_hash', 'beneficiaries', ['access_token_hash'], unique=False)
+    op.create_index('ix_beneficiaries_email', 'beneficiaries', ['email'], unique=False)
+    op.create_index('ix_beneficiaries_user_status', 'beneficiaries', ['user_id', 'status'], unique=False)
+    op.create_index('ix_access_rules_beneficiary_asset', 'access_rules', ['beneficiary_id', 'asset_id'], unique=False)
+    op.create_index('ix_access_rules_asset', 'access_rules', ['asset_id'], unique=False)
+    op.create_index('ix_verification_requests_user_beneficiary_status', 'verification_requests', ['user_id', 'beneficiary_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_verification_requests_user_beneficiary_status', table_name='verification_requests')
+    op.drop_index('ix_access_rules_asset', table_name='access_rules')
+    op.drop_index('ix_access_rules_beneficiary_asset', table_name='access_rules')
+    op.drop_index('ix_beneficiaries_user_status', table_name='beneficiaries')
+    op.drop_index('ix_beneficiaries_email', table_name='beneficiaries')
+    op.drop_index('ix_beneficiaries_access_token_hash', table_name='beneficiaries')
@@ -0,0 +1,51 @@
+"""notification outbox
+
+Delivery state for notifications written as an outbox and sent by the
+background dispatcher: recipient, retry bookkeeping and the claim lease.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 22:13:08.407823
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recipient_email', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('claim_token', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('claimed_until', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True))
+        batch_op.create_index('ix_notifications_claim_token', ['claim_token'], unique=False)
+        batch_op.create_index('ix_notifications_dispatch', ['delivery_status', 'next_attempt_at'], unique=False)
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_dispatch')
+        batch_op.drop_index('ix_notifications_claim_token')
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('claimed_until')
+        batch_op.drop_column('claim_token')
+        batch_op.drop_column('next_attempt_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('recipient_email')
+
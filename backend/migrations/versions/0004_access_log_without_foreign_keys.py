@@ -0,0 +1,78 @@
+"""access log without foreign keys
+
+Access logs are now written in batches after the request has finished and
+must outlive the users, beneficiaries and assets they mention, so the id
+columns lose their foreign keys. On MySQL the indexes implicitly created
+for those keys go too.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 22:17:31.586476
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCES = {
+    'user_id': ('users', 'user_id'),
+    'beneficiary_id': ('beneficiaries', 'beneficiary_id'),
+    'asset_id': ('assets', 'asset_id'),
+}
+
+
+def _access_logs_table() -> sa.Table:
+    # SQLite foreign keys are unnamed, so the table is rebuilt from this definition
+    return sa.Table(
+        'access_logs',
+        sa.MetaData(),
+        sa.Column('log_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+        sa.Column('asset_id', sa.String(length=36), nullable=True),
+        sa.Column('action_type', sa.Enum('login', 'view_asset', 'download', 'update', 'delete', 'access_granted', name='action_type_enum'), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('status', sa.Enum('success', 'failed', 'blocked', name='log_status_enum'), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('log_id'),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        with op.batch_alter_table('access_logs', copy_from=_access_logs_table(), recreate='always'):
+            pass
+        return
+
+    inspector = sa.inspect(bind)
+    for foreign_key in inspector.get_foreign_keys('access_logs'):
+        op.drop_constraint(foreign_key['name'], 'access_logs', type_='foreignkey')
+    if bind.dialect.name == 'mysql':
+        for index in inspector.get_indexes('access_logs'):
+            if index['name'] in REFERENCES:
+                op.drop_index(index['name'], table_name='access_logs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows pointing at deleted records would violate the restored keys
+    for column, (table, key) in REFERENCES.items():
+        op.execute(
+            f"UPDATE access_logs SET {column} = NULL "
+            f"WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT {key} FROM {table})"
+        )
+    with op.batch_alter_table('access_logs', schema=None) as batch_op:
+        for column, (table, key) in REFERENCES.items():
+            batch_op.create_foreign_key(f'fk_access_logs_{column}', table, [column], [key])
@@ -0,0 +1,117 @@
+"""partitioned access logs
+
+access_logs gets (id, timestamp) indexes for per-user, per-asset and
+per-beneficiary range queries. On MySQL it is range-partitioned by month
+on timestamp, so the retention job can drop whole months and range
+queries only touch the months they cover.
+
+MySQL requires the partitioning column in every unique key, so the
+primary key becomes (log_id, timestamp) and timestamp becomes NOT NULL.
+Partitions run from the oldest existing row's month to
+ACCESS_LOG_PARTITIONS_AHEAD months ahead, plus a pmax catch-all that
+access_log_service.extend_partitions splits further months off.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 22:37:52.120958
+
+"""
+import os
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_access_logs_user_timestamp': ['user_id', 'timestamp'],
+    'ix_access_logs_asset_timestamp': ['asset_id', 'timestamp'],
+    'ix_access_logs_beneficiary_timestamp': ['beneficiary_id', 'timestamp'],
+}
+
+
+def _access_logs_table(partitioned: bool) -> sa.Table:
+    # SQLite cannot alter a primary key in place, so the table is rebuilt from this definition
+    return sa.Table(
+        'access_logs',
+        sa.MetaData(),
+        sa.Column('log_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('beneficiary_id', sa.String(length=36), nullable=True),
+        sa.Column('asset_id', sa.String(length=36), nullable=True),
+        sa.Column('action_type', sa.Enum('login', 'view_asset', 'download', 'update', 'delete', 'access_granted', name='action_type_enum'), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now(), nullable=not partitioned),
+        sa.Column('status', sa.Enum('success', 'failed', 'blocked', name='log_status_enum'), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint(*(['log_id', 'timestamp'] if partitioned else ['log_id'])),
+    )
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _monthly_partitions(first: datetime, last: datetime) -> str:
+    definitions = []
+    month = datetime(first.year, first.month, 1)
+    while month <= last:
+        definitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{_add_months(month, 1):%Y-%m-%d}')")
+        month = _add_months(month, 1)
+    definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(definitions)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    op.execute("UPDATE access_logs SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+
+    if bind.dialect.name == 'sqlite':
+        with op.batch_alter_table('access_logs', copy_from=_access_logs_table(partitioned=True), recreate='always'):
+            pass
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'access_logs', columns, unique=False)
+        return
+
+    op.execute(
+        "ALTER TABLE access_logs MODIFY `timestamp` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (log_id, `timestamp`)"
+    )
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'access_logs', columns, unique=False)
+
+    now = datetime.utcnow()
+    oldest = bind.execute(sa.text("SELECT MIN(`timestamp`) FROM access_logs")).scalar() or now
+    last = _add_months(datetime(now.year, now.month, 1), int(os.getenv("ACCESS_LOG_PARTITIONS_AHEAD", "3")))
+    op.execute(
+        f"ALTER TABLE access_logs PARTITION BY RANGE COLUMNS(`timestamp`) ({_monthly_partitions(oldest, last)})"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'mysql':
+        op.execute("ALTER TABLE access_logs REMOVE PARTITIONING")
+    for name in INDEXES:
+        op.drop_index(name, table_name='access_logs')
+
+    if bind.dialect.name == 'sqlite':
+        with op.batch_alter_table('access_logs', copy_from=_access_logs_table(partitioned=False), recreate='always'):
+            pass
+        return
+
+    op.execute(
+        "ALTER TABLE access_logs DROP PRIMARY KEY, ADD PRIMARY KEY (log_id), "
+        "MODIFY `timestamp` DATETIME NULL DEFAULT CURRENT_TIMESTAMP"
+    )
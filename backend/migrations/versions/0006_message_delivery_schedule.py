@@ -0,0 +1,38 @@
+"""message delivery schedule
+
+deliver_at on user_messages plus the (delivered, delivery_condition,
+deliver_at) index the delivery scheduler uses to find due messages.
+Messages with a NULL delivered flag are normalised to false so the index
+range covers them.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 22:24:57.413535
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE user_messages SET delivered = false WHERE delivered IS NULL")
+    with op.batch_alter_table('user_messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deliver_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_user_messages_due', ['delivered', 'delivery_condition', 'deliver_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_messages_due')
+        batch_op.drop_column('deliver_at')
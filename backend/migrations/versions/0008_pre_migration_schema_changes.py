@@ -0,0 +1,108 @@
+"""pre-migration schema changes
+
+Schema changes made while tables were still built by create_all, before
+0001 existed: the jobs and job_steps tables (durable inheritance jobs),
+asset_files.content_sha256 and its index (deduplicated blob store), and the
+keyset pagination indexes. Databases adopted with `alembic stamp 0001` get
+them here. Databases first migrated while 0001 still contained them already
+have them, so each object is only created when it is missing.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:12:40.518223
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PAGINATION_INDEXES = (
+    ('ix_users_created', 'users', ['created_at', 'user_id']),
+    ('ix_assets_user_created', 'assets', ['user_id', 'created_at', 'asset_id']),
+    ('ix_beneficiaries_user_added', 'beneficiaries', ['user_id', 'added_date', 'beneficiary_id']),
+    ('ix_user_messages_user_created', 'user_messages', ['user_id', 'created_at', 'message_id']),
+    ('ix_verification_requests_request_date', 'verification_requests', ['request_date', 'request_id']),
+)
+
+
+def _index_names(inspector, table: str) -> set:
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'jobs' not in tables:
+        op.create_table('jobs',
+        sa.Column('job_id', sa.String(length=36), nullable=False),
+        sa.Column('job_type', sa.String(length=64), nullable=False),
+        sa.Column('dedupe_key', sa.String(length=255), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('status', sa.Enum('queued', 'running', 'succeeded', 'failed', name='job_status_enum'), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('max_attempts', sa.Integer(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=True),
+        sa.Column('locked_by', sa.String(length=255), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('job_id')
+        )
+        op.create_index('ix_jobs_status_available', 'jobs', ['status', 'available_at'], unique=False)
+        op.create_index('ix_jobs_type_dedupe_key', 'jobs', ['job_type', 'dedupe_key'], unique=False)
+
+    if 'job_steps' not in tables:
+        op.create_table('job_steps',
+        sa.Column('step_id', sa.String(length=36), nullable=False),
+        sa.Column('job_id', sa.String(length=36), nullable=True),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'running', 'succeeded', 'failed', name='job_step_status_enum'), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('completed', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ),
+        sa.PrimaryKeyConstraint('step_id')
+        )
+        op.create_index(op.f('ix_job_steps_job_id'), 'job_steps', ['job_id'], unique=False)
+
+    if 'content_sha256' not in {column['name'] for column in inspector.get_columns('asset_files')}:
+        with op.batch_alter_table('asset_files', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    if 'ix_asset_files_content_sha256' not in _index_names(inspector, 'asset_files'):
+        op.create_index('ix_asset_files_content_sha256', 'asset_files', ['content_sha256'], unique=False)
+
+    for name, table, columns in PAGINATION_INDEXES:
+        if name not in _index_names(inspector, table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(PAGINATION_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    op.drop_index('ix_asset_files_content_sha256', table_name='asset_files')
+    with op.batch_alter_table('asset_files', schema=None) as batch_op:
+        batch_op.drop_column('content_sha256')
+
+    op.drop_index(op.f('ix_job_steps_job_id'), table_name='job_steps')
+    op.drop_table('job_steps')
+    op.drop_index('ix_jobs_type_dedupe_key', table_name='jobs')
+    op.drop_index('ix_jobs_status_available', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,65 @@
+"""unique active job dedupe key
+
+jobs.active_dedupe_key holds dedupe_key while a job is queued or running
+and is cleared when it finishes. A unique (job_type, active_dedupe_key)
+constraint replaces the plain ix_jobs_type_dedupe_key index, so two
+concurrent enqueues can no longer both create an active job for one key
+(NULLs do not collide). Existing unfinished jobs are backfilled; where
+duplicates already exist only the oldest keeps the key.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 14:05:12.804117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_dedupe_key', sa.String(length=255), nullable=True))
+
+    jobs = sa.table(
+        'jobs',
+        sa.column('job_id', sa.String),
+        sa.column('job_type', sa.String),
+        sa.column('dedupe_key', sa.String),
+        sa.column('active_dedupe_key', sa.String),
+        sa.column('status', sa.String),
+        sa.column('created_at', sa.DateTime),
+    )
+    bind = op.get_bind()
+    active = bind.execute(
+        sa.select(jobs.c.job_id, jobs.c.job_type, jobs.c.dedupe_key)
+        .where(jobs.c.dedupe_key.is_not(None), jobs.c.status.in_(('queued', 'running')))
+        .order_by(jobs.c.created_at, jobs.c.job_id)
+    ).all()
+    seen = set()
+    for job_id, job_type, dedupe_key in active:
+        if (job_type, dedupe_key) in seen:
+            continue
+        seen.add((job_type, dedupe_key))
+        bind.execute(jobs.update().where(jobs.c.job_id == job_id).values(active_dedupe_key=dedupe_key))
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_type_dedupe_key')
+        batch_op.create_unique_constraint('uq_jobs_type_active_dedupe_key', ['job_type', 'active_dedupe_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_jobs_type_active_dedupe_key', type_='unique')
+        batch_op.create_index('ix_jobs_type_dedupe_key', ['job_type', 'dedupe_key'], unique=False)
+        batch_op.drop_column('active_dedupe_key')
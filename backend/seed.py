@@ -7,21 +7,18 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
 from sqlalchemy.orm import Session
-from src.database.connection import engine, SessionLocal
-from src.database.base import Base
+from src.database.connection import SessionLocal
 from src.database.models import User, Beneficiary, Asset, CryptoAsset, CryptoAllocation, AdminUser
 from src.utils.security import get_password_hash
 
 def seed_data():
-    # Always drop and recreate tables to ensure schema updates and clean state
-    print("Dropping old tables...")
-    Base.metadata.drop_all(bind=engine)
-    
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
-
+    # Tables come from the migrations (alembic upgrade head); existing data is never touched
     db: Session = SessionLocal()
     try:
+        if db.query(User.user_id).filter(User.email == "demo@everaccess.com").first():
+            print("Demo data already present, nothing to seed.")
+            return
+
         print("Seeding data...")
 
         # 1. Create User
@@ -0,0 +1,91 @@
+"""
+Runs the API under uvicorn with several worker processes (start.sh runs
+this). The worker count comes from WEB_CONCURRENCY or --workers, and
+defaults to the CPUs this container may use. It is exported to the workers,
+which divide the DB_MAX_CONNECTIONS connection budget and the bcrypt
+threads between them (src/database/pool.py, src/utils/security.py).
+
+On SIGTERM/SIGINT each worker stops accepting connections, finishes the
+requests in flight (for up to WEB_GRACEFUL_SHUTDOWN_SECONDS), then drains
+its background queues (src/main.py shutdown_event).
+
+Workers share nothing in memory. /metrics reports the worker that answered
+the scrape, labelled pid="<worker pid>"; aggregate with sum without (pid).
+In-process caches are invalidated only in the worker that made the change,
+so other workers can serve a stale entry until it expires: up to
+PRINCIPAL_CACHE_TTL (default 60s) for a user's account status and
+PORTAL_TOKEN_CACHE_TTL (default 60s) for a revoked portal token. Lower them,
+or disable the caches, where that window matters. The vault response cache
+is keyed by the vault version read from the database and is not affected.
+
+Usage (from backend/):
+    python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("serve")
+
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+# Seconds a stopping worker waits for in-flight requests before cancelling them
+WEB_GRACEFUL_SHUTDOWN_SECONDS = float(os.getenv("WEB_GRACEFUL_SHUTDOWN_SECONDS", "30"))
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on: affinity mask, lowered by a cgroup CPU quota (docker --cpus)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period) + 0.5)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")) or None,
+                        help="Worker processes (default: WEB_CONCURRENCY, else one per available CPU)")
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    parser.add_argument("--graceful-shutdown", type=float, default=WEB_GRACEFUL_SHUTDOWN_SECONDS,
+                        help="Seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    workers = max(1, args.workers or available_cpus())
+    # Read by every worker at import: uvicorn spawns fresh interpreters that inherit the environment
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    from src.database import pool
+    logger.info(
+        f"Starting {workers} worker(s): {pool.ENGINE_POOL_SIZE}+{pool.ENGINE_MAX_OVERFLOW} connections per engine, "
+        f"at most {workers * 2 * (pool.ENGINE_POOL_SIZE + pool.ENGINE_MAX_OVERFLOW)} in total "
+        f"(DB_MAX_CONNECTIONS={pool.DB_MAX_CONNECTIONS})"
+    )
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=args.graceful_shutdown,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
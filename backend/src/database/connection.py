@@ -1,18 +1,61 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from .pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolWaitStats, engine_options
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Sync drivers mapped to their async counterparts for the async engine.
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Derive the async driver URL from a sync DATABASE_URL."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+
+engine = create_engine(DATABASE_URL, **engine_options(InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(InstrumentedAsyncQueuePool))
+# expire_on_commit is disabled so attributes stay readable after commit
+# without an implicit (and in async code, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+def _reset_after_fork():
+    # A forked worker (gunicorn --preload, os.fork) must not reuse the
+    # parent's sockets: give both engines fresh, empty pools without closing
+    # the inherited connections, which still belong to the parent. Sessions
+    # and modules keep referencing the same engine objects. uvicorn --workers
+    # spawns fresh interpreters instead and never gets here.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    InstrumentedQueuePool.wait_stats = PoolWaitStats()
+    InstrumentedAsyncQueuePool.wait_stats = PoolWaitStats()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
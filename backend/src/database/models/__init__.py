@@ -16,6 +16,7 @@ from .user_message import UserMessage
 from .admin_user import AdminUser
 from .crypto_asset import CryptoAsset
 from .crypto_allocation import CryptoAllocation
+from .job import Job, JobStep
 
 __all__ = [
     "User",
@@ -36,4 +37,6 @@ __all__ = [
     "AdminUser",
     "CryptoAsset",
     "CryptoAllocation",
+    "Job",
+    "JobStep",
 ]
@@ -4,7 +4,7 @@ from sqlalchemy import (
     String,
     Enum,
     DateTime,
-    ForeignKey,
+    Index,
     Text,
     JSON,
 )
@@ -13,13 +13,26 @@ from sqlalchemy.sql import func
 from ..base import Base
 
 class AccessLog(Base):
+    """
+    Audit trail, written in batches by utils.access_log_writer. The id
+    columns carry no foreign keys: rows are inserted after the request
+    has finished and must outlive the users, beneficiaries and assets
+    they refer to.
+
+    On MySQL the table is range-partitioned by month on timestamp (see
+    migration 0005), which is why timestamp is part of the primary key.
+    """
     __tablename__ = "access_logs"
-    log_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.user_id"), nullable=True)
-    beneficiary_id = Column(
-        String(36), ForeignKey("beneficiaries.beneficiary_id"), nullable=True
+    __table_args__ = (
+        # "Activity of X between T1 and T2" queries, per partition
+        Index("ix_access_logs_user_timestamp", "user_id", "timestamp"),
+        Index("ix_access_logs_asset_timestamp", "asset_id", "timestamp"),
+        Index("ix_access_logs_beneficiary_timestamp", "beneficiary_id", "timestamp"),
     )
-    asset_id = Column(String(36), ForeignKey("assets.asset_id"), nullable=True)
+    log_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String(36), nullable=True)
+    beneficiary_id = Column(String(36), nullable=True)
+    asset_id = Column(String(36), nullable=True)
     action_type = Column(
         Enum(
             "login",
@@ -33,10 +46,18 @@ class AccessLog(Base):
     )
     ip_address = Column(String(45))
     user_agent = Column(Text)
-    timestamp = Column(DateTime, server_default=func.now())
+    timestamp = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
     status = Column(Enum("success", "failed", "blocked", name="log_status_enum"))
     details = Column(JSON)
 
-    user = relationship("User", back_populates="access_logs")
-    beneficiary = relationship("Beneficiary", back_populates="access_logs")
-    asset = relationship("Asset", back_populates="access_logs")
+    user = relationship(
+        "User", primaryjoin="foreign(AccessLog.user_id) == User.user_id", back_populates="access_logs"
+    )
+    beneficiary = relationship(
+        "Beneficiary",
+        primaryjoin="foreign(AccessLog.beneficiary_id) == Beneficiary.beneficiary_id",
+        back_populates="access_logs",
+    )
+    asset = relationship(
+        "Asset", primaryjoin="foreign(AccessLog.asset_id) == Asset.asset_id", back_populates="access_logs"
+    )
@@ -6,6 +6,7 @@ from sqlalchemy import (
     ForeignKey,
     JSON,
     String,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +14,10 @@ from ..base import Base
 
 class AccessRule(Base):
     __tablename__ = "access_rules"
+    __table_args__ = (
+        Index("ix_access_rules_beneficiary_asset", "beneficiary_id", "asset_id"),
+        Index("ix_access_rules_asset", "asset_id"),
+    )
     rule_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"))
     beneficiary_id = Column(String(36), ForeignKey("beneficiaries.beneficiary_id"))
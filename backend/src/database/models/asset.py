@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Text,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +14,11 @@ from ..base import Base
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        # Keyset pagination order (see utils/pagination.py)
+        # Also serves plain Asset.user_id lookups through its leading column
+        Index("ix_assets_user_created", "user_id", "created_at", "asset_id"),
+    )
     asset_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"))
     asset_type = Column(
@@ -41,7 +47,13 @@ class Asset(Base):
     user = relationship("User", back_populates="assets")
     asset_files = relationship("AssetFile", back_populates="asset")
     access_rules = relationship("AccessRule", back_populates="asset")
-    access_logs = relationship("AccessLog", back_populates="asset")
+    # Deleting the asset leaves its audit trail untouched
+    access_logs = relationship(
+        "AccessLog",
+        primaryjoin="Asset.asset_id == foreign(AccessLog.asset_id)",
+        back_populates="asset",
+        passive_deletes="all",
+    )
     crypto_asset = relationship("CryptoAsset", back_populates="asset", uselist=False, cascade="all, delete-orphan")
 
     @property
@@ -6,6 +6,7 @@ from sqlalchemy import (
     ForeignKey,
     BigInteger,
     Text,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,11 +14,17 @@ from ..base import Base
 
 class AssetFile(Base):
     __tablename__ = "asset_files"
+    __table_args__ = (
+        # Reference counting for the content-addressed store (see utils/blob_store.py)
+        Index("ix_asset_files_content_sha256", "content_sha256"),
+    )
     file_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     asset_id = Column(String(36), ForeignKey("assets.asset_id"))
     file_name = Column(String(255))
     file_type = Column(String(255))
     file_size = Column(BigInteger)
+    # Hex SHA-256 of the stored bytes, computed while streaming the upload
+    content_sha256 = Column(String(64), nullable=True)
     encrypted_file_path = Column(String(512))
     encryption_key_id = Column(String(255))
     uploaded_at = Column(DateTime, server_default=func.now())
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,6 +15,14 @@ from ..base import Base
 
 class Beneficiary(Base):
     __tablename__ = "beneficiaries"
+    __table_args__ = (
+        # Keyset pagination order (see utils/pagination.py)
+        Index("ix_beneficiaries_user_added", "user_id", "added_date", "beneficiary_id"),
+        # Beneficiary-portal token lookup (verify_access_token)
+        Index("ix_beneficiaries_access_token_hash", "access_token_hash"),
+        Index("ix_beneficiaries_email", "email"),
+        Index("ix_beneficiaries_user_status", "user_id", "status"),
+    )
     beneficiary_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"))
     email = Column(String(255), nullable=False)
@@ -37,7 +46,13 @@ class Beneficiary(Base):
     verification_requests = relationship(
         "VerificationRequest", back_populates="beneficiary"
     )
-    access_logs = relationship("AccessLog", back_populates="beneficiary")
+    # Deleting the beneficiary leaves its audit trail untouched
+    access_logs = relationship(
+        "AccessLog",
+        primaryjoin="Beneficiary.beneficiary_id == foreign(AccessLog.beneficiary_id)",
+        back_populates="beneficiary",
+        passive_deletes="all",
+    )
     notifications = relationship("Notification", back_populates="beneficiary")
     user_messages = relationship("UserMessage", back_populates="beneficiary")
     crypto_allocations = relationship("CryptoAllocation", back_populates="beneficiary")
@@ -0,0 +1,65 @@
+import uuid
+from sqlalchemy import (
+    Column,
+    String,
+    Enum,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Text,
+    JSON,
+    Index,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..base import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Worker claim order (see utils/job_queue.py)
+        Index("ix_jobs_status_available", "status", "available_at"),
+        # One queued/running job per key, enforced by the database (see enqueue_job)
+        UniqueConstraint("job_type", "active_dedupe_key", name="uq_jobs_type_active_dedupe_key"),
+    )
+    job_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String(64), nullable=False)
+    dedupe_key = Column(String(255), nullable=True)
+    # Copy of dedupe_key while the job is queued/running, NULL once it finishes
+    active_dedupe_key = Column(String(255), nullable=True)
+    payload = Column(JSON)
+    status = Column(
+        Enum("queued", "running", "succeeded", "failed", name="job_status_enum"),
+        default="queued",
+    )
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    available_at = Column(DateTime)
+    locked_by = Column(String(255), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    steps = relationship("JobStep", back_populates="job", order_by="JobStep.position", cascade="all, delete-orphan")
+
+class JobStep(Base):
+    __tablename__ = "job_steps"
+    step_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(String(36), ForeignKey("jobs.job_id"), index=True)
+    name = Column(String(64), nullable=False)
+    position = Column(Integer, nullable=False)
+    status = Column(
+        Enum("pending", "running", "succeeded", "failed", name="job_step_status_enum"),
+        default="pending",
+    )
+    total = Column(Integer, nullable=True)
+    completed = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    job = relationship("Job", back_populates="steps")
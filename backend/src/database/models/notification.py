@@ -6,6 +6,8 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Text,
+    Integer,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +15,11 @@ from ..base import Base
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Dispatcher claim order (see utils/notification_dispatcher.py)
+        Index("ix_notifications_dispatch", "delivery_status", "next_attempt_at"),
+        Index("ix_notifications_claim_token", "claim_token"),
+    )
     notification_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"), nullable=True)
     beneficiary_id = Column(
@@ -35,6 +42,14 @@ class Notification(Base):
         Enum("pending", "sent", "failed", name="delivery_status_enum"),
         default="pending",
     )
+    # Outbox delivery state
+    recipient_email = Column(String(255), nullable=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    claim_token = Column(String(36), nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User", back_populates="notifications")
     beneficiary = relationship("Beneficiary", back_populates="notifications")
@@ -5,6 +5,8 @@ from sqlalchemy import (
     Boolean,
     Enum,
     DateTime,
+    Index,
+    BigInteger,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -12,6 +14,10 @@ from ..base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination order (see utils/pagination.py)
+        Index("ix_users_created", "created_at", "user_id"),
+    )
     user_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(512), nullable=False)
@@ -35,13 +41,21 @@ class User(Base):
     email_verified = Column(Boolean, default=False)
     mfa_enabled = Column(Boolean, default=False)
     mfa_secret = Column(String(255))  # Encrypted
+    # Bumped by every vault write; list endpoints use it as their ETag (see services/vault_service.py)
+    vault_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     subscriptions = relationship("Subscription", back_populates="user")
     beneficiaries = relationship("Beneficiary", back_populates="user")
     assets = relationship("Asset", back_populates="user")
     access_rules = relationship("AccessRule", back_populates="user")
     verification_requests = relationship("VerificationRequest", back_populates="user")
-    access_logs = relationship("AccessLog", back_populates="user")
+    # Deleting the user leaves its audit trail untouched
+    access_logs = relationship(
+        "AccessLog",
+        primaryjoin="User.user_id == foreign(AccessLog.user_id)",
+        back_populates="user",
+        passive_deletes="all",
+    )
     payments = relationship("Payment", back_populates="user")
     partner_clients = relationship("PartnerClient", back_populates="user")
     encryption_keys = relationship("EncryptionKey", back_populates="user")
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Text,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,6 +15,12 @@ from ..base import Base
 
 class UserMessage(Base):
     __tablename__ = "user_messages"
+    __table_args__ = (
+        # Keyset pagination order (see utils/pagination.py)
+        Index("ix_user_messages_user_created", "user_id", "created_at", "message_id"),
+        # Due-message scan of the delivery scheduler (see services/message_service.py)
+        Index("ix_user_messages_due", "delivered", "delivery_condition", "deliver_at"),
+    )
     message_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"))
     beneficiary_id = Column(
@@ -30,6 +37,9 @@ class UserMessage(Base):
             name="delivery_condition_enum",
         )
     )
+    # When the message becomes deliverable: chosen by the owner for scheduled_date,
+    # set on release for upon_death and after_verification
+    deliver_at = Column(DateTime, nullable=True)
     delivered = Column(Boolean, default=False)
     delivered_at = Column(DateTime, nullable=True)
 
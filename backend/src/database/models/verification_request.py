@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Text,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +14,12 @@ from ..base import Base
 
 class VerificationRequest(Base):
     __tablename__ = "verification_requests"
+    __table_args__ = (
+        # Keyset pagination order (see utils/pagination.py)
+        Index("ix_verification_requests_request_date", "request_date", "request_id"),
+        # Duplicate-claim check (get_approved_claim_async)
+        Index("ix_verification_requests_user_beneficiary_status", "user_id", "beneficiary_id", "status"),
+    )
     request_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.user_id"))
     beneficiary_id = Column(String(36), ForeignKey("beneficiaries.beneficiary_id"))
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Pool settings apply to each engine (sync and async) separately.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle well below MySQL's wait_timeout so idle connections are never stale.
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+POOL_USE_LIFO = _env_bool("DB_POOL_USE_LIFO", True)
+# Server processes sharing the database (set by serve.py; gunicorn and uvicorn read it too).
+WEB_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+# Connections all workers together may hold: two engines per worker, each
+# capped at its share. Keep it below MySQL's max_connections (151 by default)
+# minus what migrations, cron scripts and admin sessions need; 0 disables the cap.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "100"))
+
+
+def _per_engine_limits(pool_size: int, max_overflow: int, max_connections: int, workers: int):
+    share = max_connections // (workers * 2) if max_connections > 0 else 0
+    if max_connections <= 0 or pool_size + max_overflow <= share:
+        return pool_size, max_overflow
+    if share < 1:
+        logger.warning(
+            f"DB_MAX_CONNECTIONS={max_connections} is too low for {workers} workers; "
+            f"using one connection per engine ({workers * 2} in total)"
+        )
+        return 1, 0
+    capped = min(pool_size, share)
+    return capped, share - capped
+
+
+ENGINE_POOL_SIZE, ENGINE_MAX_OVERFLOW = _per_engine_limits(POOL_SIZE, MAX_OVERFLOW, DB_MAX_CONNECTIONS, WEB_WORKERS)
+# Number of connections opened per engine at startup before serving traffic.
+POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(ENGINE_POOL_SIZE)))
+
+
+class PoolWaitStats:
+    """Time spent waiting for a connection on checkout."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_avg": round(self.total_wait / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.max_wait, 6),
+            }
+
+
+class _TimedCheckoutMixin:
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def engine_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": ENGINE_POOL_SIZE,
+        "max_overflow": ENGINE_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+        "pool_use_lifo": POOL_USE_LIFO,
+    }
+
+
+def pool_status(pool) -> dict:
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": ENGINE_MAX_OVERFLOW,
+        "workers": WEB_WORKERS,
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(wait_stats.snapshot())
+    return status
+
+
+def warm_pool(engine, count: int = POOL_WARMUP) -> int:
+    """Open up to pool_size connections and return them to the pool idle."""
+    count = min(count, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def warm_async_pool(async_engine, count: int = POOL_WARMUP) -> int:
+    count = min(count, async_engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await async_engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
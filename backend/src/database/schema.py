@@ -0,0 +1,39 @@
+import os
+from typing import Tuple
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+# backend/alembic.ini; ALEMBIC_CONFIG (also read by the alembic CLI) overrides it
+ALEMBIC_INI = os.getenv(
+    "ALEMBIC_CONFIG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini"),
+)
+
+
+def _config() -> Config:
+    # The application's logging stays as configured; env.py skips fileConfig
+    return Config(ALEMBIC_INI, attributes={"configure_logger": False})
+
+
+def expected_heads() -> Tuple[str, ...]:
+    """Head revisions of the migration scripts shipped with this build."""
+    return tuple(sorted(ScriptDirectory.from_config(_config()).get_heads()))
+
+
+def current_heads(engine) -> Tuple[str, ...]:
+    """Revisions recorded in the database's alembic_version table (empty if never migrated)."""
+    with engine.connect() as connection:
+        return tuple(sorted(MigrationContext.configure(connection).get_current_heads()))
+
+
+def schema_status(engine) -> dict:
+    expected = expected_heads()
+    current = current_heads(engine)
+    return {"current": list(current), "expected": list(expected), "up_to_date": current == expected}
+
+
+def upgrade_to_head():
+    """Applies pending migrations, as `alembic upgrade head` does."""
+    command.upgrade(_config(), "head")
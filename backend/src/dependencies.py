@@ -1,13 +1,24 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from .database import connection
 from .utils.security import decode_access_token
-from .services import user_service
+from .utils.pagination import InvalidCursor, decode_cursor
+from .utils.principal_cache import get_principal, get_principal_async
 from .database.models import user as user_model
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+def get_cursor(cursor: Optional[str] = None) -> Optional[str]:
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return cursor
+
 def get_current_user(db: Session = Depends(connection.get_db), token: str = Depends(oauth2_scheme)) -> user_model.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -19,8 +30,25 @@ def get_current_user(db: Session = Depends(connection.get_db), token: str = Depe
     if email is None:
         raise credentials_exception
     
-    user = user_service.get_user_by_email(db, email=email)
+    user = get_principal(db, email=email)
     if user is None:
         raise credentials_exception
         
     return user
+
+async def get_current_user_async(db: AsyncSession = Depends(connection.get_async_db), token: str = Depends(oauth2_scheme)) -> user_model.User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    email = decode_access_token(token)
+    if email is None:
+        raise credentials_exception
+
+    user = await get_principal_async(db, email=email)
+    if user is None:
+        raise credentials_exception
+
+    return user
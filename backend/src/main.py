@@ -1,18 +1,38 @@
-from fastapi import FastAPI
+import anyio
+from fastapi import Depends, FastAPI, Response
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-import time
-from sqlalchemy.exc import OperationalError
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 
-from .database.base import Base
-from .database.connection import engine
-from .routes import auth, assets, beneficiaries, crypto, verifications, beneficiary_portal, messages, users
+from .database.connection import engine, async_engine
+from .database.pool import pool_status
+from .utils.security import password_hash_pool
+from .utils.principal_cache import principal_cache
+from .utils.portal_tokens import portal_token_cache
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.vault_responses import vault_response_cache
+from .utils.serialization import OrjsonResponse
+from .utils.job_queue import job_worker_pool
+from .utils.access_log_writer import access_log_writer
+from .utils.notification_dispatcher import NOTIFICATION_DISPATCHER_ENABLED, notification_dispatcher
+from .utils.message_scheduler import MESSAGE_SCHEDULER_ENABLED, message_scheduler
+from .utils.metrics import (
+    METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry, snapshot_collector,
+)
+from .utils.sql_profiler import SQL_STATS_HEADER, sql_profiler
+from .utils.readiness import readiness
+from .services import inheritance_service  # registers the inheritance job type
+from .database.models import user as user_model
+from .routes import admin, auth, assets, beneficiaries, crypto, verifications, beneficiary_portal, messages, users
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Default() keeps FastAPI's Pydantic fast path for routes with a response_model
+app = FastAPI(default_response_class=Default(OrjsonResponse))
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,7 +40,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", SQL_STATS_HEADER],
 )
+# Added last so it is outermost and times the whole stack; it also opens the
+# request context the SQL profiler attributes statements to
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+sql_profiler.instrument_engine(engine)
+sql_profiler.instrument_engine(async_engine.sync_engine)
 
 app.include_router(auth.router, prefix="/auth")
 app.include_router(users.router)
@@ -30,31 +57,70 @@ app.include_router(crypto.router)
 app.include_router(verifications.router)
 app.include_router(beneficiary_portal.router)
 app.include_router(messages.router)
+app.include_router(admin.router)
+
+# Internal state of each component: exported on /metrics and returned
+# together by the admin-only /admin/health
+COMPONENT_SNAPSHOTS = (
+    ("db_pool", lambda: pool_status(engine.pool), {"engine": "sync"}),
+    ("db_pool", lambda: pool_status(async_engine.pool), {"engine": "async"}),
+    ("password_hasher", password_hash_pool.snapshot, None),
+    ("principal_cache", principal_cache.snapshot, None),
+    ("portal_token_cache", portal_token_cache.snapshot, None),
+    ("vault_response_cache", vault_response_cache.snapshot, None),
+    ("notifications", notification_dispatcher.snapshot, None),
+    ("access_log", access_log_writer.snapshot, None),
+    ("messages", message_scheduler.snapshot, None),
+    ("jobs", job_worker_pool.snapshot, None),
+    ("sql", sql_profiler.snapshot, None),
+    ("readiness", readiness.snapshot, None),
+)
+for component, snapshot, labels in COMPONENT_SNAPSHOTS:
+    metrics_registry.register_collector(snapshot_collector(component, snapshot, labels))
+
+
+def threadpool_metrics():
+    # AnyIO's limiter for sync endpoints and dependencies; must be read on the event loop
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return [
+        ("everaccess_threadpool_size", "gauge", "Threads available to sync endpoints.", [({}, limiter.total_tokens)]),
+        ("everaccess_threadpool_in_use", "gauge", "Threads running sync endpoints.", [({}, statistics.borrowed_tokens)]),
+        ("everaccess_threadpool_waiting", "gauge", "Sync calls waiting for a free thread.", [({}, statistics.tasks_waiting)]),
+    ]
 
+metrics_registry.register_collector(threadpool_metrics)
 
-def create_tables():
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Tables created successfully.")
-    except Exception as e:
-        logger.error(f"Error creating tables: {e}")
-        # We don't raise here to allow the app to start even if DB is momentarily down,
-        # though the healthcheck should catch it.
+
+def start_background_workers():
+    job_worker_pool.start()
+    if NOTIFICATION_DISPATCHER_ENABLED:
+        notification_dispatcher.start()
+    if MESSAGE_SCHEDULER_ENABLED:
+        message_scheduler.start()
 
 @app.on_event("startup")
 async def startup_event():
-    # Retry logic for DB connection
-    max_retries = 5
-    for i in range(max_retries):
-        try:
-            create_tables()
-            break
-        except OperationalError as e:
-            logger.warning(f"Database not ready yet, retrying in 2 seconds... ({i+1}/{max_retries})")
-            time.sleep(2)
-        except Exception as e:
-            logger.error(f"Unexpected error during startup: {e}")
-            break
+    # Returns at once: the database wait, schema check and pool warmup run
+    # in the background and /ready turns 200 when they are done. Workers that
+    # poll tables start only then; the access log writer spills while the
+    # database is away, so it starts now.
+    access_log_writer.start()
+    readiness.start(on_ready=start_background_workers)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # The server has stopped accepting connections and drained in-flight
+    # requests (up to WEB_GRACEFUL_SHUTDOWN_SECONDS) before this runs
+    await readiness.stop()
+    # Drained side by side so shutdown takes the longest of them, not the sum.
+    # Running jobs stop at their next batch boundary and are re-queued
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(run_in_threadpool, job_worker_pool.stop)
+        task_group.start_soon(run_in_threadpool, message_scheduler.stop)
+        task_group.start_soon(notification_dispatcher.stop)
+    # Writes out every buffered access log event (or spills it to disk)
+    await run_in_threadpool(access_log_writer.stop)
 
 @app.get("/")
 def read_root():
@@ -63,3 +129,25 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/ready")
+async def readiness_check():
+    # Async so probes are answered on the event loop even when the threadpool is saturated
+    status = readiness.snapshot()
+    return status if status["ready"] else JSONResponse(status_code=503, content=status)
+
+@app.get("/admin/health", tags=["Admin"])
+async def component_health(current_admin: user_model.User = Depends(admin.get_current_admin)):
+    """Snapshots of the pools, caches, queues and background workers of the worker that answers."""
+    status = {}
+    for component, snapshot, labels in COMPONENT_SNAPSHOTS:
+        if labels:
+            status.setdefault(component, {})["_".join(labels.values())] = snapshot()
+        else:
+            status[component] = snapshot()
+    return status
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Async so collectors run on the event loop, where the threadpool limiter lives
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
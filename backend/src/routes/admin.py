@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from ..database import connection
 from ..schemas import admin as admin_schema, user as user_schema
-from ..services import admin_service, user_service
-from ..routes.assets import get_current_user 
+from ..services import access_log_service, admin_service, user_service
+from ..dependencies import get_current_user_async, get_cursor
+from ..utils.pagination import page_items
+from ..utils import job_queue
+from ..utils.job_queue import job_worker_pool
 from ..database.models import user as user_model
 
 router = APIRouter(
@@ -12,31 +18,118 @@ router = APIRouter(
     tags=["Admin"],
 )
 
-# A mock dependency to ensure the user is an admin.
-def get_current_admin(current_user: user_model.User = Depends(get_current_user)):
-    # For now, we assume any logged-in user is an admin for prototyping.
-    # In a real application, you would check current_user.role or similar.
-    if current_user.role != "admin":
+async def get_current_admin(
+    current_user: user_model.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(connection.get_async_db),
+):
+    # Admin rights come from an active admin_users row with the signed-in user's email
+    admin = await admin_service.get_admin_by_email_async(db, email=current_user.email)
+    if admin is None or admin.status != "active":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not an admin")
     return current_user
 
 @router.get("/users", response_model=List[admin_schema.UserAdminView])
 async def get_all_users_admin(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(connection.get_db),
+    cursor: Optional[str] = Depends(get_cursor),
+    db: AsyncSession = Depends(connection.get_async_db),
     current_admin: user_model.User = Depends(get_current_admin),
 ):
-    users = admin_service.get_all_users(db, skip=skip, limit=limit)
-    return users
+    page = await admin_service.get_all_users_async(db, skip=skip, limit=limit, cursor=cursor)
+    return page_items(response, page)
 
 @router.get("/users/{user_id}", response_model=admin_schema.UserAdminView)
 async def get_user_by_id_admin(
     user_id: str,
-    db: Session = Depends(connection.get_db),
+    db: AsyncSession = Depends(connection.get_async_db),
     current_admin: user_model.User = Depends(get_current_admin),
 ):
-    user = admin_service.get_user_by_id(db, user_id=user_id)
+    user = await admin_service.get_user_by_id_async(db, user_id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+def _time_range(start: Optional[datetime], end: Optional[datetime]):
+    try:
+        return access_log_service.resolve_time_range(start, end)
+    except access_log_service.InvalidTimeRange as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _stream_access_logs(stmt) -> StreamingResponse:
+    """Newline-delimited JSON, one access log entry per line, oldest first."""
+    async def lines():
+        async for logs in access_log_service.stream_access_logs(stmt):
+            yield "".join(admin_schema.AccessLogEntry.model_validate(log).model_dump_json() + "\n" for log in logs)
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/access-logs/assets/{asset_id}")
+async def get_asset_access_logs(
+    asset_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action_type: Optional[str] = None,
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    """Who accessed the asset between start and end (default: the last 30 days)."""
+    start, end = _time_range(start, end)
+    return _stream_access_logs(access_log_service.access_log_query(start, end, asset_id=asset_id, action_type=action_type))
+
+@router.get("/access-logs/users/{user_id}")
+async def get_user_access_logs(
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action_type: Optional[str] = None,
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    """All activity recorded for the user between start and end (default: the last 30 days)."""
+    start, end = _time_range(start, end)
+    return _stream_access_logs(access_log_service.access_log_query(start, end, user_id=user_id, action_type=action_type))
+
+@router.get("/access-logs/beneficiaries/{beneficiary_id}")
+async def get_beneficiary_access_logs(
+    beneficiary_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action_type: Optional[str] = None,
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    """All portal activity of the beneficiary between start and end (default: the last 30 days)."""
+    start, end = _time_range(start, end)
+    return _stream_access_logs(
+        access_log_service.access_log_query(start, end, beneficiary_id=beneficiary_id, action_type=action_type)
+    )
+
+@router.get("/access-logs/partitions", response_model=List[admin_schema.AccessLogPartition])
+def get_access_log_partitions(
+    db: Session = Depends(connection.get_db),
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    """Monthly partitions with estimated row counts; empty when the table is not partitioned."""
+    return access_log_service.list_partitions(db)
+
+@router.post("/access-logs/retention", response_model=admin_schema.AccessLogRetentionJob, status_code=status.HTTP_202_ACCEPTED)
+def run_access_log_retention(
+    db: Session = Depends(connection.get_db),
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    """
+    Queues the retention job: adds upcoming monthly partitions and drops the
+    ones past ACCESS_LOG_RETENTION_MONTHS.
+    """
+    job = access_log_service.enqueue_retention(db, requested_by=current_admin.user_id)
+    job_worker_pool.wake()
+    return job_queue.get_job(db, job.job_id)
+
+@router.get("/access-logs/retention/{job_id}", response_model=admin_schema.AccessLogRetentionJob)
+def get_access_log_retention_job(
+    job_id: str,
+    db: Session = Depends(connection.get_db),
+    current_admin: user_model.User = Depends(get_current_admin),
+):
+    job = job_queue.get_job(db, job_id)
+    if job is None or job.job_type != access_log_service.RETENTION_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
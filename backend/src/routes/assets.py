@@ -1,22 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import shutil
 import os
-import uuid
 from ..database import connection
 from ..schemas import asset as asset_schema
 from ..services import asset_service
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_current_user_async, get_cursor
 from ..database.models import user as user_model
+from ..utils.vault_responses import versioned_list_response
+from ..utils.uploads import InvalidUpload, UploadTooLarge, stream_upload_to_disk
+from ..utils.file_responses import conditional_file_response
+from ..utils import blob_store
+from ..utils.access_log_writer import access_log_writer
+from ..utils.serialization import list_serializer
+import anyio
 
 router = APIRouter(
     prefix="/assets",
     tags=["Assets"],
 )
 
-UPLOAD_DIR = "uploads"
+# Upper bound on items accepted by a single POST /assets/bulk request
+BULK_MAX_ITEMS = int(os.getenv("ASSET_BULK_MAX_ITEMS", "10000"))
+
+# Read-only list: rows go straight to JSON without re-validation
+ASSET_LIST = list_serializer(asset_schema.Asset)
 
 @router.post("/", response_model=asset_schema.Asset)
 def create_asset(
@@ -26,25 +35,44 @@ def create_asset(
 ):
     return asset_service.create_asset(db=db, asset=asset, user_id=current_user.user_id)
 
+@router.post("/bulk", response_model=asset_schema.AssetBulkResult)
+def create_assets_bulk(
+    assets: List[asset_schema.AssetCreate],
+    db: Session = Depends(connection.get_db),
+    current_user: user_model.User = Depends(get_current_user),
+):
+    if len(assets) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BULK_MAX_ITEMS} assets per bulk request",
+        )
+    return asset_service.create_assets_bulk(db=db, assets=assets, user_id=current_user.user_id)
+
 @router.get("/", response_model=List[asset_schema.Asset])
 def read_assets(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(get_cursor),
     db: Session = Depends(connection.get_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
-    assets = asset_service.get_assets(db, user_id=current_user.user_id, skip=skip, limit=limit)
-    return assets
+    return versioned_list_response(
+        request, db, current_user.user_id, ASSET_LIST,
+        lambda: asset_service.get_assets(db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor),
+    )
 
 @router.get("/{asset_id}", response_model=asset_schema.Asset)
 def read_asset(
     asset_id: str,
+    request: Request,
     db: Session = Depends(connection.get_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     db_asset = asset_service.get_asset(db, asset_id=asset_id, user_id=current_user.user_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
+    access_log_writer.record("view_asset", request=request, user_id=current_user.user_id, asset_id=asset_id)
     return db_asset
 
 @router.put("/{asset_id}", response_model=asset_schema.Asset)
@@ -70,38 +98,56 @@ def delete_asset(
         raise HTTPException(status_code=404, detail="Asset not found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-@router.post("/{asset_id}/files/", response_model=asset_schema.AssetFile)
+# The body is parsed by the handler, not by FastAPI, so the form is described here
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+@router.post("/{asset_id}/files/", response_model=asset_schema.AssetFile, openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_asset_file(
     asset_id: str,
-    file: UploadFile = File(...),
-    db: Session = Depends(connection.get_db),
-    current_user: user_model.User = Depends(get_current_user),
+    request: Request,
+    db: AsyncSession = Depends(connection.get_async_db),
+    current_user: user_model.User = Depends(get_current_user_async),
 ):
-    # Verify asset exists and belongs to user
-    asset = asset_service.get_asset(db, asset_id=asset_id, user_id=current_user.user_id)
+    # Verify asset exists and belongs to user before reading the body
+    asset = await asset_service.get_asset_async(db, asset_id=asset_id, user_id=current_user.user_id, profile=None)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    # Save file to disk
-    file_id = str(uuid.uuid4())
-    file_extension = os.path.splitext(file.filename)[1]
-    saved_filename = f"{file_id}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, saved_filename)
-    
-    # Ensure directory exists
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    # Parse the multipart body as it arrives and stream the file to a staging
+    # file, hashing and enforcing the size limit as we go
+    temp_path = await anyio.to_thread.run_sync(blob_store.new_temp_path)
+    try:
+        stored = await stream_upload_to_disk(request, temp_path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Move it into the content-addressed store; identical content is kept once
+    file_path, _ = await anyio.to_thread.run_sync(blob_store.commit_blob, temp_path, stored.sha256)
 
     # Save metadata to DB
-    asset_file = asset_service.add_file_to_asset(
+    asset_file = await asset_service.add_file_to_asset_async(
         db=db,
         asset_id=asset_id,
-        file_name=file.filename,
+        file_name=stored.filename,
         file_path=file_path,
-        file_type=file.content_type,
-        file_size=os.path.getsize(file_path)
+        file_type=stored.content_type,
+        file_size=stored.size,
+        content_sha256=stored.sha256
     )
     return asset_file
 
@@ -109,11 +155,12 @@ async def upload_asset_file(
 def download_asset_file(
     asset_id: str,
     file_id: str,
+    request: Request,
     db: Session = Depends(connection.get_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     # Verify asset exists and belongs to user
-    asset = asset_service.get_asset(db, asset_id=asset_id, user_id=current_user.user_id)
+    asset = asset_service.get_asset(db, asset_id=asset_id, user_id=current_user.user_id, profile=None)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
@@ -121,8 +168,14 @@ def download_asset_file(
     if not asset_file:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(
-        path=asset_file.encrypted_file_path, 
+    access_log_writer.record(
+        "download", request=request, user_id=current_user.user_id, asset_id=asset_id, details={"file_id": file_id}
+    )
+    return conditional_file_response(
+        request,
+        path=asset_file.encrypted_file_path,
         filename=asset_file.file_name,
-        media_type=asset_file.file_type
+        media_type=asset_file.file_type,
+        content_sha256=asset_file.content_sha256,
+        modified_at=asset_file.uploaded_at,
     )
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import connection
 from ..schemas import user as user_schema
 from ..services import user_service
 from ..utils import security
+from ..utils.access_log_writer import access_log_writer
 
 router = APIRouter(
     tags=["Authentication"],
 )
 
+def hasher_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=user_schema.Token)
-def register_user(user: user_schema.UserCreate, db: Session = Depends(connection.get_db)):
-    db_user = user_service.get_user_by_email(db, email=user.email)
+async def register_user(user: user_schema.UserCreate, db: AsyncSession = Depends(connection.get_async_db)):
+    db_user = await user_service.get_user_by_email_async(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    
+
     # Create user
-    created_user = user_service.create_user(db=db, user=user)
-    
+    try:
+        created_user = await user_service.create_user_async(db=db, user=user)
+    except security.PasswordHasherBusy:
+        raise hasher_busy_exception()
+
     # Create access token for the new user
     access_token = security.create_access_token(
         data={"sub": created_user.email}
@@ -25,10 +36,22 @@ def register_user(user: user_schema.UserCreate, db: Session = Depends(connection
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=user_schema.Token)
-def login_for_access_token(form_data: user_schema.UserLogin, db: Session = Depends(connection.get_db)):
+async def login_for_access_token(
+    form_data: user_schema.UserLogin,
+    request: Request,
+    db: AsyncSession = Depends(connection.get_async_db),
+):
     # Frontend sends username as email
-    user = user_service.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    user = await user_service.get_user_by_email_async(db, email=form_data.username)
+    try:
+        password_ok = user is not None and await security.verify_password_async(form_data.password, user.password_hash)
+    except security.PasswordHasherBusy:
+        raise hasher_busy_exception()
+    if not password_ok:
+        await access_log_writer.record_async(
+            "login", status="failed", request=request,
+            user_id=user.user_id if user else None, details={"email": form_data.username},
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -37,4 +60,5 @@ def login_for_access_token(form_data: user_schema.UserLogin, db: Session = Depen
     access_token = security.create_access_token(
         data={"sub": user.email}
     )
+    await access_log_writer.record_async("login", request=request, user_id=user.user_id)
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import connection
 from ..schemas import beneficiary as beneficiary_schema
 from ..services import beneficiary_service
@@ -8,13 +8,17 @@ from ..utils.security import decode_access_token
 from fastapi.security import OAuth2PasswordBearer
 from ..services import user_service
 from ..database.models import user as user_model
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_cursor
+from ..utils.serialization import list_serializer
+from ..utils.vault_responses import versioned_list_response
 
 router = APIRouter(
     prefix="/beneficiaries",
     tags=["Beneficiaries"],
 )
 
+BENEFICIARY_LIST = list_serializer(beneficiary_schema.Beneficiary)
+
 @router.post("/", response_model=beneficiary_schema.Beneficiary)
 def create_beneficiary(
     beneficiary: beneficiary_schema.BeneficiaryCreate,
@@ -25,13 +29,17 @@ def create_beneficiary(
 
 @router.get("/", response_model=List[beneficiary_schema.Beneficiary])
 def read_beneficiaries(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(get_cursor),
     db: Session = Depends(connection.get_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
-    beneficiaries = beneficiary_service.get_beneficiaries(db, user_id=current_user.user_id, skip=skip, limit=limit)
-    return beneficiaries
+    return versioned_list_response(
+        request, db, current_user.user_id, BENEFICIARY_LIST,
+        lambda: beneficiary_service.get_beneficiaries(db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor),
+    )
 
 @router.get("/{beneficiary_id}", response_model=beneficiary_schema.Beneficiary)
 def read_beneficiary(
@@ -1,44 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import connection
-from ..schemas import asset as asset_schema
-from ..services import asset_service, beneficiary_service
+from ..schemas import asset as asset_schema, user_message as message_schema
+from ..services import asset_service, beneficiary_service, message_service
+from ..utils.access_log_writer import access_log_writer
+from ..utils.file_responses import conditional_file_response
+from ..utils.serialization import list_serializer
+from ..utils.portal_tokens import PortalGrant, create_portal_session_token, decode_portal_session_token, get_portal_grant
 
 router = APIRouter(
     prefix="/beneficiary-portal",
     tags=["Beneficiary Portal"],
 )
 
+PORTAL_SESSION_HEADER = "X-Portal-Session"
+
+# Read-only lists: rows go straight to JSON without re-validation
+ASSET_LIST = list_serializer(asset_schema.Asset)
+MESSAGE_LIST = list_serializer(message_schema.UserMessage)
+
 def get_authorized_beneficiary(
-    token: str = Query(...),
+    request: Request,
+    token: Optional[str] = Query(None),
+    portal_session: Optional[str] = Header(None, alias=PORTAL_SESSION_HEADER),
     db: Session = Depends(connection.get_db)
-):
-    beneficiary = beneficiary_service.verify_access_token(db, token)
-    if not beneficiary:
+) -> PortalGrant:
+    """
+    Accepts either the emailed access token (?token=, verified through the
+    token cache) or the session token returned by /auth, which is checked
+    without touching the database.
+    """
+    grant = None
+    if portal_session:
+        grant = decode_portal_session_token(portal_session)
+    elif token:
+        grant = get_portal_grant(db, token)
+    if not grant:
+        if portal_session or token:
+            access_log_writer.record(
+                "login", status="failed", request=request,
+                details={"credential": "session" if portal_session else "token"},
+            )
         raise HTTPException(status_code=401, detail="Invalid or expired access token")
-    return beneficiary
+    return grant
 
 @router.get("/auth")
 def verify_access(
-    beneficiary = Depends(get_authorized_beneficiary)
+    request: Request,
+    db: Session = Depends(connection.get_db),
+    grant: PortalGrant = Depends(get_authorized_beneficiary)
 ):
     """
-    Verifies the access token and returns beneficiary details.
+    Verifies the access token and returns beneficiary details, plus a
+    short-lived session token to send as X-Portal-Session on later calls.
     """
+    beneficiary = beneficiary_service.get_beneficiary_by_id(db, grant.beneficiary_id)
+    if not beneficiary or beneficiary.status == "revoked":
+        raise HTTPException(status_code=401, detail="Invalid or expired access token")
+    access_log_writer.record("login", request=request, beneficiary_id=beneficiary.beneficiary_id)
     return {
         "valid": True,
         "beneficiary_id": beneficiary.beneficiary_id,
         "first_name": beneficiary.first_name,
-        "last_name": beneficiary.last_name
+        "last_name": beneficiary.last_name,
+        "session_token": create_portal_session_token(grant),
     }
 
 @router.get("/assets", response_model=List[asset_schema.Asset])
 def read_beneficiary_assets(
+    request: Request,
     db: Session = Depends(connection.get_db),
-    beneficiary = Depends(get_authorized_beneficiary)
+    beneficiary: PortalGrant = Depends(get_authorized_beneficiary)
 ):
     """
     Returns assets released to this beneficiary.
     """
-    return asset_service.get_assets_for_beneficiary(db, beneficiary.beneficiary_id)
\ No newline at end of file
+    assets = asset_service.get_assets_for_beneficiary(db, beneficiary.beneficiary_id)
+    for asset in assets:
+        access_log_writer.record(
+            "view_asset", request=request, beneficiary_id=beneficiary.beneficiary_id, asset_id=asset.asset_id
+        )
+    return Response(content=ASSET_LIST.dump_json(assets), media_type="application/json")
+
+@router.get("/messages", response_model=List[message_schema.UserMessage])
+def read_beneficiary_messages(
+    db: Session = Depends(connection.get_db),
+    beneficiary: PortalGrant = Depends(get_authorized_beneficiary)
+):
+    """
+    Returns time-capsule messages delivered to this beneficiary.
+    """
+    messages = message_service.get_delivered_messages_for_beneficiary(db, beneficiary.beneficiary_id)
+    return Response(content=MESSAGE_LIST.dump_json(messages), media_type="application/json")
+
+@router.get("/assets/{asset_id}/files/{file_id}")
+def download_released_file(
+    asset_id: str,
+    file_id: str,
+    request: Request,
+    db: Session = Depends(connection.get_db),
+    beneficiary: PortalGrant = Depends(get_authorized_beneficiary)
+):
+    """
+    Downloads a file attached to an asset released to this beneficiary.
+    """
+    asset_file = asset_service.get_released_asset_file(
+        db, beneficiary_id=beneficiary.beneficiary_id, asset_id=asset_id, file_id=file_id
+    )
+    if not asset_file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    access_log_writer.record(
+        "download", request=request, beneficiary_id=beneficiary.beneficiary_id, asset_id=asset_id,
+        details={"file_id": file_id},
+    )
+    return conditional_file_response(
+        request,
+        path=asset_file.encrypted_file_path,
+        filename=asset_file.file_name,
+        media_type=asset_file.file_type,
+        content_sha256=asset_file.content_sha256,
+        modified_at=asset_file.uploaded_at,
+    )
@@ -1,34 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import connection
 from ..schemas import user_message as message_schema
 from ..services import message_service
 from ..utils import security
 from ..database.models.user import User
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_cursor
+from ..utils.serialization import list_serializer
+from ..utils.vault_responses import versioned_list_response
 
 router = APIRouter(
     prefix="/messages",
     tags=["Time Capsule Messages"],
 )
 
+MESSAGE_LIST = list_serializer(message_schema.UserMessage)
+
 @router.post("/", response_model=message_schema.UserMessage)
 def create_message(
     message: message_schema.UserMessageCreate,
     db: Session = Depends(connection.get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if message.delivery_condition == message_schema.DeliveryConditionEnum.scheduled_date and message.deliver_at is None:
+        raise HTTPException(status_code=400, detail="deliver_at is required for scheduled_date messages")
     return message_service.create_message(db=db, message=message, user_id=current_user.user_id)
 
 @router.get("/", response_model=List[message_schema.UserMessage])
 def read_messages(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(get_cursor),
     db: Session = Depends(connection.get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return message_service.get_user_messages(db=db, user_id=current_user.user_id, skip=skip, limit=limit)
+    return versioned_list_response(
+        request, db, current_user.user_id, MESSAGE_LIST,
+        lambda: message_service.get_user_messages(db=db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor),
+    )
 
 @router.delete("/{message_id}", response_model=message_schema.UserMessage)
 def delete_message(
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import connection
 from ..schemas import verification as verification_schema
-from ..services import verification_service
-from ..dependencies import get_current_user
+from ..services import verification_service, user_service, beneficiary_service, inheritance_service
+from ..utils.job_queue import get_job_async, job_worker_pool
+from ..dependencies import get_current_user, get_current_user_async, get_cursor
+from ..utils.pagination import page_items
 from ..database.models import user as user_model, beneficiary as beneficiary_model, verification_request as verification_request_model
 
 router = APIRouter(
@@ -34,7 +37,7 @@ async def upload_verification_document(
     request_id: str,
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    db: Session = Depends(connection.get_db),
+    db: AsyncSession = Depends(connection.get_async_db),
 ):
     # Here you would save the file to a storage service (e.g., S3, MinIO)
     # For now, we'll just use the filename.
@@ -42,14 +45,15 @@ async def upload_verification_document(
         document_type=document_type,
         file_name=file.filename,
     )
-    return verification_service.add_document_to_request(db, request_id=request_id, document=document)
+    return await verification_service.add_document_to_request_async(db, request_id=request_id, document=document)
 
-@router.post("/inheritance-claim", response_model=verification_schema.VerificationRequest)
+@router.post("/inheritance-claim", response_model=verification_schema.InheritanceClaim, status_code=202)
 async def claim_inheritance(
+    response: Response,
     target_user_email: str = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(connection.get_db),
-    current_user: user_model.User = Depends(get_current_user),
+    db: AsyncSession = Depends(connection.get_async_db),
+    current_user: user_model.User = Depends(get_current_user_async),
 ):
     """
     Zero-Knowledge Inheritance Claim Protocol:
@@ -62,16 +66,15 @@ async def claim_inheritance(
     claimant_email = current_user.email
     
     # 2. Find target user
-    target_user = db.query(user_model.User).filter(user_model.User.email == target_user_email).first()
+    target_user = await user_service.get_user_by_email_async(db, email=target_user_email)
     if not target_user:
         raise HTTPException(status_code=404, detail="Target user not found in cryptographic registry")
 
     # 3. Zero-Knowledge Validation: Verify Claimant is a registered Beneficiary
     # This validates the relationship without exposing underlying asset details
-    beneficiary = db.query(beneficiary_model.Beneficiary).filter(
-        beneficiary_model.Beneficiary.user_id == target_user.user_id,
-        beneficiary_model.Beneficiary.email == claimant_email
-    ).first()
+    beneficiary = await beneficiary_service.get_beneficiary_for_user_email_async(
+        db, user_id=target_user.user_id, email=claimant_email
+    )
 
     if not beneficiary:
          raise HTTPException(
@@ -87,11 +90,9 @@ async def claim_inheritance(
         )
 
     # 5. Check for existing successful claim (prevent double-spending)
-    existing_claim = db.query(verification_request_model.VerificationRequest).filter(
-        verification_request_model.VerificationRequest.user_id == target_user.user_id,
-        verification_request_model.VerificationRequest.beneficiary_id == beneficiary.beneficiary_id,
-        verification_request_model.VerificationRequest.status == 'approved'
-    ).first()
+    existing_claim = await verification_service.get_approved_claim_async(
+        db, user_id=target_user.user_id, beneficiary_id=beneficiary.beneficiary_id
+    )
     
     if existing_claim:
         raise HTTPException(
@@ -105,35 +106,66 @@ async def claim_inheritance(
         user_id=target_user.user_id,
     )
     
-    new_request = verification_service.create_verification_request(db, request=request_create, beneficiary_id=beneficiary.beneficiary_id)
+    new_request = await verification_service.create_verification_request_async(db, request=request_create, beneficiary_id=beneficiary.beneficiary_id)
 
     # 7. Add Death Certificate Document to cryptographic audit trail
     document = verification_schema.VerificationDocumentCreate(
         document_type="death_certificate",
         file_name=file.filename,
     )
-    verification_service.add_document_to_request(db, request_id=new_request.request_id, document=document)
+    await verification_service.add_document_to_request_async(db, request_id=new_request.request_id, document=document)
 
     # 8. Automatically Approve Request via Smart Contract (For Demo Purpose)
     # In production, this would involve multi-party computation and threshold signatures
-    verification_service.approve_verification_request(db, request_id=new_request.request_id, admin_id="zk-proof-validator")
-    
+    approval = await verification_service.approve_verification_request_async(
+        db, request_id=new_request.request_id, admin_id="zk-proof-validator", requested_by=current_user.user_id
+    )
+
+    # 9. Asset transfer runs as a background job; poll the status endpoint
+    job_worker_pool.wake()
+    job = await get_job_async(db, approval["job"].job_id, populate_existing=True)
+    response.headers["Location"] = f"/verifications/inheritance-jobs/{job.job_id}"
+
     # Reload request to get updated status from distributed ledger
-    db.refresh(new_request)
+    await db.refresh(new_request)
+
+    return {"request": new_request, "job": job}
 
-    return new_request
+@router.get("/inheritance-jobs/{job_id}", response_model=verification_schema.InheritanceJob)
+async def get_inheritance_job(
+    job_id: str,
+    db: AsyncSession = Depends(connection.get_async_db),
+    current_user: user_model.User = Depends(get_current_user_async),
+):
+    """
+    Progress of a queued inheritance process, per step. Visible to every
+    beneficiary of the estate, not only the claimant whose request queued it:
+    a later claim for the same estate is handed this job by deduplication.
+    """
+    job = await get_job_async(db, job_id)
+    if job is None or job.job_type != inheritance_service.INHERITANCE_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Inheritance job not found")
+    estate_user_id = (job.payload or {}).get("user_id")
+    if estate_user_id != current_user.user_id and not await beneficiary_service.get_beneficiary_for_user_email_async(
+        db, user_id=estate_user_id, email=current_user.email
+    ):
+        raise HTTPException(status_code=404, detail="Inheritance job not found")
+    return job
 
 
 # Admin routes
 @router.get("/admin/requests", response_model=List[verification_schema.VerificationRequest])
 def get_all_verification_requests(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(get_cursor),
     db: Session = Depends(connection.get_db),
     # Here you would add a dependency to check if the user is an admin
     # current_admin: user_model.AdminUser = Depends(get_current_admin),
 ):
-    return verification_service.get_verification_requests(db, skip=skip, limit=limit)
+    page = verification_service.get_verification_requests(db, skip=skip, limit=limit, cursor=cursor)
+    return page_items(response, page)
 
 @router.post("/admin/requests/{request_id}/approve", response_model=verification_schema.VerificationRequest)
 def approve_request(
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
 from ..schemas.user import UserOut
+from ..schemas.verification import JobStep
 
 class AdminUserOut(BaseModel):
     admin_id: str
@@ -24,3 +25,35 @@ class UserAdminView(UserOut):
     mfa_enabled: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+class AccessLogEntry(BaseModel):
+    log_id: str
+    timestamp: datetime
+    action_type: Optional[str] = None
+    status: Optional[str] = None
+    user_id: Optional[str] = None
+    beneficiary_id: Optional[str] = None
+    asset_id: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    details: Optional[dict] = None
+
+    class Config:
+        from_attributes = True
+
+class AccessLogPartition(BaseModel):
+    name: str
+    month: Optional[datetime] = None
+    rows: Optional[int] = None
+
+class AccessLogRetentionJob(BaseModel):
+    job_id: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    steps: List[JobStep] = []
+
+    class Config:
+        from_attributes = True
@@ -42,10 +42,22 @@ class AssetFile(BaseModel):
     file_name: str
     file_type: Optional[str] = None
     file_size: Optional[int] = None
+    content_sha256: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+class AssetBulkItemResult(BaseModel):
+    index: int
+    status: str  # "created" or "failed"
+    asset_id: Optional[str] = None
+    error: Optional[str] = None
+
+class AssetBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[AssetBulkItemResult]
+
 class Asset(AssetBase):
     asset_id: str
     beneficiaries: Optional[List[Beneficiary]] = []
@@ -13,6 +13,8 @@ class UserMessageBase(BaseModel):
     message_title: str
     message_content: str
     delivery_condition: DeliveryConditionEnum
+    # Required for scheduled_date; for the other conditions it is set on release
+    deliver_at: Optional[datetime] = None
 
 class UserMessageCreate(UserMessageBase):
     pass
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
+from datetime import datetime
 from enum import Enum
 
 class VerificationStatusEnum(str, Enum):
@@ -35,3 +36,33 @@ class VerificationDocument(VerificationDocumentBase):
 
     class Config:
         from_attributes = True
+
+class JobStep(BaseModel):
+    name: str
+    status: str
+    total: Optional[int] = None
+    completed: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class InheritanceJob(BaseModel):
+    job_id: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    steps: List[JobStep] = []
+
+    class Config:
+        from_attributes = True
+
+class InheritanceClaim(BaseModel):
+    request: VerificationRequest
+    job: InheritanceJob
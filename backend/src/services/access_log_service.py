@@ -0,0 +1,194 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+from ..database import connection
+from ..database.models.access_log import AccessLog
+from ..database.models.job import JobStep
+from ..utils import job_queue
+
+RETENTION_JOB_TYPE = "access_log_retention"
+# Whole months of access logs kept; older monthly partitions are dropped
+ACCESS_LOG_RETENTION_MONTHS = int(os.getenv("ACCESS_LOG_RETENTION_MONTHS", "24"))
+# Monthly partitions created ahead of the current month
+ACCESS_LOG_PARTITIONS_AHEAD = int(os.getenv("ACCESS_LOG_PARTITIONS_AHEAD", "3"))
+# Widest time window an admin query may scan
+ACCESS_LOG_MAX_QUERY_DAYS = int(os.getenv("ACCESS_LOG_MAX_QUERY_DAYS", "366"))
+# Rows removed per transaction where the table is not partitioned (SQLite)
+ACCESS_LOG_DELETE_BATCH_SIZE = int(os.getenv("ACCESS_LOG_DELETE_BATCH_SIZE", "5000"))
+STREAM_BATCH_SIZE = 500
+
+# Monthly partitions are named pYYYYMM and hold rows with timestamp < the next month;
+# pmax catches anything beyond the last one
+PARTITION_NAME = re.compile(r"^p(\d{4})(\d{2})$")
+CATCH_ALL_PARTITION = "pmax"
+
+
+class InvalidTimeRange(ValueError):
+    pass
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_definition(month: datetime) -> str:
+    return f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+def list_partitions(db: Session) -> List[dict]:
+    """Monthly partitions of access_logs, oldest first. Empty when the table is not partitioned."""
+    if db.get_bind().dialect.name != "mysql":
+        return []
+    rows = db.execute(text(
+        "SELECT PARTITION_NAME, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'access_logs' AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    )).all()
+    partitions = []
+    for name, table_rows in rows:
+        match = PARTITION_NAME.match(name)
+        month = datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+        partitions.append({"name": name, "month": month, "rows": table_rows})
+    return partitions
+
+
+def extend_partitions(db: Session, months_ahead: int = ACCESS_LOG_PARTITIONS_AHEAD, now: Optional[datetime] = None) -> List[str]:
+    """
+    Splits monthly partitions off pmax up to months_ahead past the current
+    month, so new rows never land in the catch-all.
+    """
+    partitions = list_partitions(db)
+    months = [p["month"] for p in partitions if p["month"]]
+    if not partitions or not any(p["name"] == CATCH_ALL_PARTITION for p in partitions):
+        return []
+    target = add_months(month_start(now or datetime.utcnow()), months_ahead)
+    month = add_months(max(months), 1) if months else month_start(now or datetime.utcnow())
+    new_months = []
+    while month <= target:
+        new_months.append(month)
+        month = add_months(month, 1)
+    if not new_months:
+        return []
+    definitions = ", ".join(partition_definition(m) for m in new_months)
+    db.execute(text(
+        f"ALTER TABLE access_logs REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO "
+        f"({definitions}, PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN (MAXVALUE))"
+    ))
+    return [f"p{m:%Y%m}" for m in new_months]
+
+
+def drop_expired_partitions(db: Session, retention_months: int = ACCESS_LOG_RETENTION_MONTHS, now: Optional[datetime] = None) -> List[str]:
+    """Drops every monthly partition that ends before the retention cutoff. A metadata operation."""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    expired = [p["name"] for p in list_partitions(db) if p["month"] and add_months(p["month"], 1) <= cutoff]
+    if expired:
+        db.execute(text(f"ALTER TABLE access_logs DROP PARTITION {', '.join(expired)}"))
+    return expired
+
+
+def delete_expired_rows(db: Session, retention_months: int = ACCESS_LOG_RETENTION_MONTHS, now: Optional[datetime] = None,
+                        batch_size: int = ACCESS_LOG_DELETE_BATCH_SIZE, heartbeat=None) -> int:
+    """Fallback for an unpartitioned table: deletes expired rows in bounded batches."""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    deleted = 0
+    while True:
+        ids = db.execute(
+            select(AccessLog.log_id).where(AccessLog.timestamp < cutoff).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+        db.execute(delete(AccessLog).where(AccessLog.log_id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        deleted += len(ids)
+        if heartbeat:
+            heartbeat()
+
+
+def _extend_partitions_step(db: Session, payload: dict, step: JobStep, heartbeat):
+    heartbeat()
+    added = extend_partitions(db, payload.get("months_ahead", ACCESS_LOG_PARTITIONS_AHEAD))
+    step.total = step.completed = len(added)
+    db.commit()
+
+
+def _apply_retention_step(db: Session, payload: dict, step: JobStep, heartbeat):
+    retention_months = payload.get("retention_months", ACCESS_LOG_RETENTION_MONTHS)
+    heartbeat()
+    if list_partitions(db):
+        step.total = step.completed = len(drop_expired_partitions(db, retention_months))
+    else:
+        step.completed = delete_expired_rows(db, retention_months, heartbeat=heartbeat)
+        step.total = step.completed
+    db.commit()
+
+
+job_queue.register_job_type(RETENTION_JOB_TYPE, [
+    ("extend_partitions", _extend_partitions_step),
+    ("apply_retention", _apply_retention_step),
+])
+
+
+def enqueue_retention(db: Session, requested_by: Optional[str] = None):
+    # One run at a time; a request while one is pending returns that job
+    return job_queue.enqueue_job(
+        db, RETENTION_JOB_TYPE,
+        {"retention_months": ACCESS_LOG_RETENTION_MONTHS, "months_ahead": ACCESS_LOG_PARTITIONS_AHEAD, "requested_by": requested_by},
+        dedupe_key="access_logs",
+    )
+
+
+def resolve_time_range(start: Optional[datetime], end: Optional[datetime], default_days: int = 30):
+    """
+    Defaults to the last default_days. The range is always bounded so MySQL
+    can prune to the partitions it covers.
+    """
+    # Timestamps are stored as naive UTC
+    if start and start.tzinfo:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end and end.tzinfo:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=default_days)
+    if start >= end:
+        raise InvalidTimeRange("start must be before end")
+    if end - start > timedelta(days=ACCESS_LOG_MAX_QUERY_DAYS):
+        raise InvalidTimeRange(f"Time range is limited to {ACCESS_LOG_MAX_QUERY_DAYS} days")
+    return start, end
+
+
+def access_log_query(start: datetime, end: datetime, user_id: Optional[str] = None, asset_id: Optional[str] = None,
+                     beneficiary_id: Optional[str] = None, action_type: Optional[str] = None):
+    """
+    Equality on one id plus a timestamp range: served by the matching
+    (id, timestamp) index inside the partitions the range covers.
+    """
+    stmt = select(AccessLog).where(AccessLog.timestamp >= start, AccessLog.timestamp < end)
+    if user_id:
+        stmt = stmt.where(AccessLog.user_id == user_id)
+    if asset_id:
+        stmt = stmt.where(AccessLog.asset_id == asset_id)
+    if beneficiary_id:
+        stmt = stmt.where(AccessLog.beneficiary_id == beneficiary_id)
+    if action_type:
+        stmt = stmt.where(AccessLog.action_type == action_type)
+    return stmt.order_by(AccessLog.timestamp, AccessLog.log_id)
+
+
+async def stream_access_logs(stmt):
+    """
+    Yields matching rows in lists of up to STREAM_BATCH_SIZE, read through a
+    server-side cursor on a session of its own so a streamed response can
+    outlive the request's session.
+    """
+    async with connection.AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.scalars().partitions():
+            yield partition
@@ -1,8 +1,30 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..database.models import user as user_model
+from ..database.models import user as user_model, admin_user as admin_user_model
+from ..utils.pagination import Page, keyset_paginate, page_from_rows
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(user_model.User).offset(skip).limit(limit).all()
+def get_all_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    User = user_model.User
+    rows = keyset_paginate(db.query(User), User.created_at, User.user_id, limit, cursor=cursor, skip=skip).all()
+    return page_from_rows(rows, User.created_at, User.user_id, limit)
 
 def get_user_by_id(db: Session, user_id: str):
     return db.query(user_model.User).filter(user_model.User.user_id == user_id).first()
+
+# Async variants for use with connection.get_async_db
+
+async def get_all_users_async(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    User = user_model.User
+    result = await db.execute(
+        keyset_paginate(select(User), User.created_at, User.user_id, limit, cursor=cursor, skip=skip)
+    )
+    return page_from_rows(result.scalars().all(), User.created_at, User.user_id, limit)
+
+async def get_user_by_id_async(db: AsyncSession, user_id: str):
+    result = await db.execute(select(user_model.User).where(user_model.User.user_id == user_id))
+    return result.scalars().first()
+
+async def get_admin_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(admin_user_model.AdminUser).where(admin_user_model.AdminUser.email == email))
+    return result.scalars().first()
@@ -1,17 +1,48 @@
-from sqlalchemy.orm import Session
+import os
+import uuid
+from typing import Dict, Iterable, List
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from ..database.models import asset as asset_model, access_rule as access_rule_model
 from ..database.models import asset as asset_model
 from ..database.models.access_rule import AccessRule
+from ..database.models.asset_file import AssetFile
+from ..database.models.beneficiary import Beneficiary
 from ..schemas import asset as asset_schema
+from ..utils.pagination import Page, keyset_paginate, page_from_rows
+from ..utils import blob_store
+from . import vault_service
+
+# Named eager-loading profiles for queries whose results are serialized with
+# asset_schema.Asset (beneficiaries via access_rules, plus asset_files).
+# "list" keeps the query count constant regardless of page size; "detail"
+# folds the rules and beneficiaries into the asset row for single lookups.
+ASSET_LOAD_PROFILES = {
+    "list": (
+        selectinload(asset_model.Asset.access_rules).joinedload(AccessRule.beneficiary),
+        selectinload(asset_model.Asset.asset_files),
+    ),
+    "detail": (
+        joinedload(asset_model.Asset.access_rules).joinedload(AccessRule.beneficiary),
+        selectinload(asset_model.Asset.asset_files),
+    ),
+}
+
+def load_profile(name: str):
+    return ASSET_LOAD_PROFILES[name] if name else ()
+
+# Rows per multi-row INSERT statement in create_assets_bulk
+BULK_INSERT_BATCH_SIZE = int(os.getenv("ASSET_BULK_INSERT_BATCH_SIZE", "500"))
 
 def create_asset(db: Session, asset: asset_schema.AssetCreate, user_id: str):
     asset_data = asset.dict()
     beneficiary_ids = asset_data.pop("beneficiary_ids", [])
 
+    vault_service.bump(db, user_id)
     db_asset = asset_model.Asset(**asset_data, user_id=user_id)
     db.add(db_asset)
-    db.commit()
-    db.refresh(db_asset)
+    db.flush()
 
     if beneficiary_ids:
         for b_id in beneficiary_ids:
@@ -22,21 +53,23 @@ def create_asset(db: Session, asset: asset_schema.AssetCreate, user_id: str):
                 access_type="full"
             )
             db.add(access_rule)
-        db.commit()
-        db.refresh(db_asset)
+    db.commit()
 
-    return db_asset
+    return get_asset(db, db_asset.asset_id, user_id)
 
-def get_assets(db: Session, user_id: str, skip: int = 0, limit: int = 100):
-    return db.query(asset_model.Asset).filter(asset_model.Asset.user_id == user_id).offset(skip).limit(limit).all()
+def get_assets(db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    query = db.query(asset_model.Asset).options(*load_profile("list")).filter(asset_model.Asset.user_id == user_id)
+    rows = keyset_paginate(query, asset_model.Asset.created_at, asset_model.Asset.asset_id, limit, cursor=cursor, skip=skip).all()
+    return page_from_rows(rows, asset_model.Asset.created_at, asset_model.Asset.asset_id, limit)
 
-def get_asset(db: Session, asset_id: str, user_id: str):
-    return db.query(asset_model.Asset).filter(asset_model.Asset.asset_id == asset_id, asset_model.Asset.user_id == user_id).first()
+def get_asset(db: Session, asset_id: str, user_id: str, profile: str = "detail"):
+    return db.query(asset_model.Asset).options(*load_profile(profile)).filter(asset_model.Asset.asset_id == asset_id, asset_model.Asset.user_id == user_id).first()
 
 def update_asset(db: Session, asset_id: str, asset_update: asset_schema.AssetUpdate, user_id: str):
-    db_asset = get_asset(db, asset_id, user_id)
+    db_asset = get_asset(db, asset_id, user_id, profile=None)
     if not db_asset:
         return None
+    vault_service.bump(db, user_id)
 
     update_data = asset_update.dict(exclude_unset=True)
     beneficiary_ids = update_data.pop("beneficiary_ids", None)
@@ -59,14 +92,88 @@ def update_asset(db: Session, asset_id: str, asset_update: asset_schema.AssetUpd
             db.add(access_rule)
 
     db.commit()
-    db.refresh(db_asset)
-    return db_asset
+    return get_asset(db, asset_id, user_id)
+
+def create_assets_bulk(db: Session, assets: List[asset_schema.AssetCreate], user_id: str) -> asset_schema.AssetBulkResult:
+    """
+    Inserts many assets and their access rules in one transaction using
+    batched multi-row INSERTs. Items referencing beneficiaries the user
+    does not own are reported as failed and skipped; the rest are created.
+    """
+    requested_ids = {b_id for asset in assets for b_id in (asset.beneficiary_ids or [])}
+    owned_ids = set()
+    if requested_ids:
+        owned_ids = set(db.scalars(
+            select(Beneficiary.beneficiary_id).where(
+                Beneficiary.user_id == user_id,
+                Beneficiary.beneficiary_id.in_(requested_ids)
+            )
+        ))
+
+    results = []
+    asset_rows = []
+    rule_rows = []
+    for index, asset in enumerate(assets):
+        asset_data = asset.dict()
+        beneficiary_ids = asset_data.pop("beneficiary_ids", None) or []
+
+        unknown = [b_id for b_id in beneficiary_ids if b_id not in owned_ids]
+        if unknown:
+            results.append(asset_schema.AssetBulkItemResult(
+                index=index, status="failed", error=f"Unknown beneficiary ids: {', '.join(unknown)}"
+            ))
+            continue
+
+        asset_id = str(uuid.uuid4())
+        asset_data["asset_type"] = asset.asset_type.value
+        asset_rows.append({**asset_data, "asset_id": asset_id, "user_id": user_id})
+        for b_id in dict.fromkeys(beneficiary_ids):
+            rule_rows.append({
+                "rule_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "beneficiary_id": b_id,
+                "asset_id": asset_id,
+                "access_type": "full",
+            })
+        results.append(asset_schema.AssetBulkItemResult(index=index, status="created", asset_id=asset_id))
+
+    try:
+        if asset_rows:
+            vault_service.bump(db, user_id)
+        for table, rows in ((asset_model.Asset.__table__, asset_rows), (AccessRule.__table__, rule_rows)):
+            for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+                db.execute(insert(table).values(rows[start:start + BULK_INSERT_BATCH_SIZE]))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    created = len(asset_rows)
+    return asset_schema.AssetBulkResult(created=created, failed=len(assets) - created, results=results)
+
+def count_blob_references(db: Session, digests: Iterable[str]) -> Dict[str, int]:
+    """Number of AssetFile rows referencing each content digest."""
+    digests = {digest for digest in digests if digest}
+    if not digests:
+        return {}
+    return dict(db.execute(
+        select(AssetFile.content_sha256, func.count())
+        .where(AssetFile.content_sha256.in_(digests))
+        .group_by(AssetFile.content_sha256)
+    ).all())
 
 def delete_asset(db: Session, asset_id: str, user_id: str):
     db_asset = db.query(asset_model.Asset).filter(asset_model.Asset.asset_id == asset_id, asset_model.Asset.user_id == user_id).first()
     if db_asset:
+        vault_service.bump(db, user_id)
+        files = db.query(AssetFile.encrypted_file_path, AssetFile.content_sha256).filter(AssetFile.asset_id == asset_id).all()
+        db.query(AssetFile).filter(AssetFile.asset_id == asset_id).delete(synchronize_session=False)
         db.delete(db_asset)
         db.commit()
+        # Stored bytes go only once the last AssetFile referencing them is gone
+        if files:
+            counts = count_blob_references(db, [digest for _, digest in files])
+            blob_store.release_files(files, counts)
     return db_asset
 
 def get_assets_for_beneficiary(db: Session, beneficiary_id: str):
@@ -74,7 +181,7 @@ def get_assets_for_beneficiary(db: Session, beneficiary_id: str):
     Retrieve assets accessible to a beneficiary via AccessRules.
     """
     # Join AccessRule and Asset
-    results = db.query(asset_model.Asset).join(
+    results = db.query(asset_model.Asset).options(*load_profile("list")).join(
         access_rule_model.AccessRule,
         access_rule_model.AccessRule.asset_id == asset_model.Asset.asset_id
     ).filter(
@@ -83,21 +190,62 @@ def get_assets_for_beneficiary(db: Session, beneficiary_id: str):
     
     return results
 
-def add_file_to_asset(db: Session, asset_id: str, file_name: str, file_path: str, file_type: str, file_size: int):
-    from ..database.models.asset_file import AssetFile
-    
+def add_file_to_asset(db: Session, asset_id: str, file_name: str, file_path: str, file_type: str, file_size: int, content_sha256: str = None):
     db_file = AssetFile(
         asset_id=asset_id,
         file_name=file_name,
         encrypted_file_path=file_path,
         file_type=file_type,
-        file_size=file_size
+        file_size=file_size,
+        content_sha256=content_sha256
     )
+    vault_service.bump_asset_owner(db, asset_id)
     db.add(db_file)
     db.commit()
     db.refresh(db_file)
     return db_file
 
 def get_asset_file(db: Session, asset_id: str, file_id: str):
-    from ..database.models.asset_file import AssetFile
     return db.query(AssetFile).filter(AssetFile.asset_id == asset_id, AssetFile.file_id == file_id).first()
+
+def get_released_asset_file(db: Session, beneficiary_id: str, asset_id: str, file_id: str):
+    """
+    Returns a file only if its asset has been released to the beneficiary.
+    """
+    return db.query(AssetFile).join(
+        AccessRule, AccessRule.asset_id == AssetFile.asset_id
+    ).filter(
+        AccessRule.beneficiary_id == beneficiary_id,
+        AssetFile.asset_id == asset_id,
+        AssetFile.file_id == file_id
+    ).first()
+
+# Async variants for use with connection.get_async_db.
+# Async sessions cannot lazy load, so queries returning assets for
+# serialization always apply one of the loading profiles above.
+
+async def get_asset_async(db: AsyncSession, asset_id: str, user_id: str, profile: str = "detail", populate_existing: bool = False):
+    stmt = (
+        select(asset_model.Asset)
+        .where(asset_model.Asset.asset_id == asset_id, asset_model.Asset.user_id == user_id)
+        .options(*load_profile(profile))
+    )
+    if populate_existing:
+        stmt = stmt.execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.unique().scalars().first()
+
+async def add_file_to_asset_async(db: AsyncSession, asset_id: str, file_name: str, file_path: str, file_type: str, file_size: int, content_sha256: str = None):
+    db_file = AssetFile(
+        asset_id=asset_id,
+        file_name=file_name,
+        encrypted_file_path=file_path,
+        file_type=file_type,
+        file_size=file_size,
+        content_sha256=content_sha256
+    )
+    await vault_service.bump_asset_owner_async(db, asset_id)
+    db.add(db_file)
+    await db.commit()
+    await db.refresh(db_file)
+    return db_file
@@ -1,39 +1,62 @@
 import secrets
 import hashlib
 from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..database.models import beneficiary as beneficiary_model
 from ..database.models.user import User
 from ..schemas import beneficiary as beneficiary_schema
+from ..utils.pagination import Page, keyset_paginate, page_from_rows
+from . import notification_service, vault_service
+
+def _queue_beneficiary_added(db, beneficiary: beneficiary_model.Beneficiary):
+    action = "Sign in" if beneficiary.is_registered else "Create an account with this email address"
+    notification_service.queue_notification(
+        db,
+        recipient_email=beneficiary.email,
+        subject="You have been added as a beneficiary on EverAccess",
+        message=f"Dear {beneficiary.first_name or beneficiary.email}, you have been named as a beneficiary on EverAccess. {action} to be ready when access is released.",
+        notification_type="system_alert",
+        beneficiary_id=beneficiary.beneficiary_id,
+    )
 
 def create_beneficiary(db: Session, beneficiary: beneficiary_schema.BeneficiaryCreate, user_id: str):
     # Check if the beneficiary email is already registered in the system
     existing_user = db.query(User).filter(User.email == beneficiary.email).first()
     is_registered = existing_user is not None
 
+    vault_service.bump(db, user_id)
     db_beneficiary = beneficiary_model.Beneficiary(
         **beneficiary.dict(), 
         user_id=user_id,
         is_registered=is_registered
     )
     db.add(db_beneficiary)
+    db.flush()
+    # Email to the beneficiary goes through the notification outbox
+    _queue_beneficiary_added(db, db_beneficiary)
     db.commit()
     db.refresh(db_beneficiary)
-    # Here you would typically send an email to the beneficiary.
-    # For now, we'll just print to the console.
-    print(f"Beneficiary {db_beneficiary.email} added for user {user_id}. Registered: {is_registered}")
     return db_beneficiary
 
-def get_beneficiaries(db: Session, user_id: str, skip: int = 0, limit: int = 100):
-    return db.query(beneficiary_model.Beneficiary).filter(beneficiary_model.Beneficiary.user_id == user_id).offset(skip).limit(limit).all()
+def get_beneficiaries(db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    Beneficiary = beneficiary_model.Beneficiary
+    query = db.query(Beneficiary).filter(Beneficiary.user_id == user_id)
+    rows = keyset_paginate(query, Beneficiary.added_date, Beneficiary.beneficiary_id, limit, cursor=cursor, skip=skip).all()
+    return page_from_rows(rows, Beneficiary.added_date, Beneficiary.beneficiary_id, limit)
 
 def get_beneficiary(db: Session, beneficiary_id: str, user_id: str):
     return db.query(beneficiary_model.Beneficiary).filter(beneficiary_model.Beneficiary.beneficiary_id == beneficiary_id, beneficiary_model.Beneficiary.user_id == user_id).first()
 
+def get_beneficiary_by_id(db: Session, beneficiary_id: str):
+    return db.query(beneficiary_model.Beneficiary).filter(beneficiary_model.Beneficiary.beneficiary_id == beneficiary_id).first()
+
 def update_beneficiary(db: Session, beneficiary_id: str, beneficiary_update: beneficiary_schema.BeneficiaryUpdate, user_id: str):
     db_beneficiary = get_beneficiary(db, beneficiary_id, user_id)
     if not db_beneficiary:
         return None
+    vault_service.bump(db, user_id)
     
     update_data = beneficiary_update.dict(exclude_unset=True)
 
@@ -51,28 +74,39 @@ def update_beneficiary(db: Session, beneficiary_id: str, beneficiary_update: ben
 def delete_beneficiary(db: Session, beneficiary_id: str, user_id: str):
     db_beneficiary = db.query(beneficiary_model.Beneficiary).filter(beneficiary_model.Beneficiary.beneficiary_id == beneficiary_id, beneficiary_model.Beneficiary.user_id == user_id).first()
     if db_beneficiary:
+        vault_service.bump(db, user_id)
         db.delete(db_beneficiary)
         db.commit()
     return db_beneficiary
 
-def generate_access_token(db: Session, beneficiary_id: str) -> str:
+def hash_access_token(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+def issue_access_token(beneficiary: beneficiary_model.Beneficiary) -> str:
     """
-    Generates a secure access token for a beneficiary, stores the hash, and returns the raw token.
+    Sets a fresh access token hash and expiry on a beneficiary and returns the
+    raw token. The caller owns the transaction.
     """
     # 1. Generate a secure random token
     raw_token = secrets.token_urlsafe(32)
     
     # 2. Hash the token
-    token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+    token_hash = hash_access_token(raw_token)
     
     # 3. Set expiry (e.g., 7 days)
     expiry = datetime.utcnow() + timedelta(days=7)
-    
-    # 4. Update Beneficiary record
+
+    beneficiary.access_token_hash = token_hash
+    beneficiary.token_expires_at = expiry
+    return raw_token
+
+def generate_access_token(db: Session, beneficiary_id: str) -> str:
+    """
+    Generates a secure access token for a beneficiary, stores the hash, and returns the raw token.
+    """
     beneficiary = db.query(beneficiary_model.Beneficiary).filter(beneficiary_model.Beneficiary.beneficiary_id == beneficiary_id).first()
     if beneficiary:
-        beneficiary.access_token_hash = token_hash
-        beneficiary.token_expires_at = expiry
+        raw_token = issue_access_token(beneficiary)
         db.add(beneficiary)
         db.commit()
         return raw_token
@@ -83,15 +117,35 @@ def verify_access_token(db: Session, raw_token: str):
     Verifies a raw token against stored hashes and checks expiry.
     Returns the Beneficiary object if valid, else None.
     """
-    token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+    token_hash = hash_access_token(raw_token)
     
     beneficiary = db.query(beneficiary_model.Beneficiary).filter(
         beneficiary_model.Beneficiary.access_token_hash == token_hash
     ).first()
     
-    if beneficiary:
+    if beneficiary and beneficiary.status != "revoked":
         # Check expiry
         if beneficiary.token_expires_at and beneficiary.token_expires_at > datetime.utcnow():
             return beneficiary
             
     return None
+
+# Async variants for use with connection.get_async_db
+
+async def get_beneficiary_async(db: AsyncSession, beneficiary_id: str, user_id: str):
+    result = await db.execute(
+        select(beneficiary_model.Beneficiary).where(
+            beneficiary_model.Beneficiary.beneficiary_id == beneficiary_id,
+            beneficiary_model.Beneficiary.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+async def get_beneficiary_for_user_email_async(db: AsyncSession, user_id: str, email: str):
+    result = await db.execute(
+        select(beneficiary_model.Beneficiary).where(
+            beneficiary_model.Beneficiary.user_id == user_id,
+            beneficiary_model.Beneficiary.email == email
+        )
+    )
+    return result.scalars().first()
@@ -1,10 +1,19 @@
-from sqlalchemy.orm import Session
+import logging
+import os
+from typing import List
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session, aliased
 from ..database.models import crypto_asset as crypto_asset_model, crypto_allocation as crypto_allocation_model, asset as asset_model, user as user_model, beneficiary as beneficiary_model
 from ..schemas import crypto as crypto_schema
+from ..utils.metrics import count_after_commit, registry
+from . import vault_service
 import uuid
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 def create_crypto_asset(db: Session, crypto_asset: crypto_schema.CryptoAssetCreate, asset_id: str):
+    vault_service.bump_asset_owner(db, asset_id)
     db_crypto_asset = crypto_asset_model.CryptoAsset(**crypto_asset.dict(), crypto_asset_id=asset_id)
     db.add(db_crypto_asset)
     db.commit()
@@ -42,6 +51,7 @@ def create_crypto_allocation(db: Session, allocation: crypto_schema.CryptoAlloca
         disbursement_status="pending",  # Default to pending upon creation
         mock_transaction_id=None  # Will be generated when disbursed
     )
+    vault_service.bump_asset_owner(db, crypto_asset_id)
     db.add(db_allocation)
     db.commit()
     db.refresh(db_allocation)
@@ -63,84 +73,116 @@ def get_crypto_asset(db: Session, crypto_asset_id: str, user_id: str):
 def get_allocations_for_asset(db: Session, crypto_asset_id: str):
     return db.query(crypto_allocation_model.CryptoAllocation).filter(crypto_allocation_model.CryptoAllocation.crypto_asset_id == crypto_asset_id).all()
 
+# Crypto assets disbursed per joined query / bulk insert
+DISBURSEMENT_BATCH_SIZE = int(os.getenv("CRYPTO_DISBURSEMENT_BATCH_SIZE", "500"))
+
+crypto_disbursements = registry.counter(
+    "everaccess_crypto_disbursements_total", "Crypto allocations disbursed, by wallet type.", ("wallet_type",))
+inherited_assets = registry.counter("everaccess_inherited_assets_total", "Assets cloned into registered heirs' vaults by disbursement.")
+
+def _pending_allocations_stmt(crypto_asset_ids: List[str]):
+    """
+    Pending allocations with their wallet, original asset, owner name and the
+    registered user (if any) behind each beneficiary, in one joined query.
+    """
+    CryptoAllocation = crypto_allocation_model.CryptoAllocation
+    CryptoAsset = crypto_asset_model.CryptoAsset
+    Asset = asset_model.Asset
+    Beneficiary = beneficiary_model.Beneficiary
+    Owner = aliased(user_model.User)
+    Heir = aliased(user_model.User)
+    return (
+        select(CryptoAllocation, CryptoAsset, Asset, Owner.first_name, Owner.last_name, Heir.user_id)
+        .join(CryptoAsset, CryptoAsset.crypto_asset_id == CryptoAllocation.crypto_asset_id)
+        .join(Asset, Asset.asset_id == CryptoAsset.crypto_asset_id)
+        .outerjoin(Owner, Owner.user_id == Asset.user_id)
+        .outerjoin(Beneficiary, Beneficiary.beneficiary_id == CryptoAllocation.beneficiary_id)
+        .outerjoin(Heir, Heir.email == Beneficiary.email)
+        .where(
+            CryptoAllocation.crypto_asset_id.in_(crypto_asset_ids),
+            or_(CryptoAllocation.disbursement_status != "disbursed", CryptoAllocation.disbursement_status.is_(None)),
+        )
+        .order_by(CryptoAllocation.crypto_asset_id, CryptoAllocation.allocation_id)
+    )
+
+def disburse_crypto_assets(db: Session, crypto_asset_ids: List[str], commit: bool = True):
+    """
+    Disburses every pending allocation of the given crypto assets. Allocations
+    are loaded with their beneficiaries and registered users in one query per
+    batch, amounts are computed in a single pass and the inherited Asset /
+    CryptoAsset clones are bulk-inserted. Already-disbursed allocations are
+    skipped, so calling this again is safe. Returns the disbursed allocations.
+    """
+    disbursed = []
+    crypto_asset_ids = list(dict.fromkeys(crypto_asset_ids))
+    for start in range(0, len(crypto_asset_ids), DISBURSEMENT_BATCH_SIZE):
+        batch = crypto_asset_ids[start:start + DISBURSEMENT_BATCH_SIZE]
+        new_assets, new_crypto_assets = [], []
+        changed_user_ids = set()
+        wallet_counts = {}
+        now = datetime.now()
+
+        for allocation, original_crypto_asset, original_asset, owner_first_name, owner_last_name, heir_user_id in db.execute(_pending_allocations_stmt(batch)):
+            # Calculate amounts
+            allocation.allocated_amount_usd = original_crypto_asset.balance_usd * (allocation.percentage / 100)
+            allocation.allocated_amount_crypto = original_crypto_asset.balance_crypto * (allocation.percentage / 100)
+            allocation.mock_transaction_id = f"MOCK-{uuid.uuid4().hex[:16]}"
+            allocation.disbursement_status = "disbursed"
+            allocation.disbursed_at = now
+            disbursed.append(allocation)
+            changed_user_ids.add(original_asset.user_id)
+            wallet_counts[original_crypto_asset.wallet_type] = wallet_counts.get(original_crypto_asset.wallet_type, 0) + 1
+
+            # Clone Asset to the beneficiary's account if they have registered
+            if heir_user_id is None:
+                continue
+            changed_user_ids.add(heir_user_id)
+            new_asset_id = str(uuid.uuid4())
+            new_assets.append({
+                "asset_id": new_asset_id,
+                "user_id": heir_user_id,
+                "asset_type": original_asset.asset_type,
+                "platform_name": original_asset.platform_name,
+                "asset_name": f"{original_asset.asset_name} (Inherited)",
+                "category": "Inherited Assets",
+                "username": original_asset.username,
+                # In a real app, you might re-encrypt these or share the key
+                "password": original_asset.password,
+                "recovery_email": original_asset.recovery_email,
+                "notes": f"Inherited from {owner_first_name} {owner_last_name}. " + (original_asset.notes or ""),
+            })
+            # New CryptoAsset record with the allocated balance
+            new_crypto_assets.append({
+                "crypto_asset_id": new_asset_id,
+                "wallet_type": original_crypto_asset.wallet_type,
+                "wallet_address": original_crypto_asset.wallet_address,
+                "balance_usd": allocation.allocated_amount_usd,
+                "balance_crypto": allocation.allocated_amount_crypto,
+                "private_key": original_crypto_asset.private_key, # In real app, consider security implications
+                "seed_phrase": original_crypto_asset.seed_phrase,
+            })
+
+        # Owners' allocations changed and heirs gain inherited assets
+        vault_service.bump(db, *changed_user_ids)
+        db.flush()
+        if new_assets:
+            db.execute(insert(asset_model.Asset), new_assets)
+            db.execute(insert(crypto_asset_model.CryptoAsset), new_crypto_assets)
+            count_after_commit(db, inherited_assets, amount=len(new_assets))
+        for wallet_type, count in wallet_counts.items():
+            count_after_commit(db, crypto_disbursements, wallet_type, amount=count)
+        # Counts only: keys, seed phrases and wallet addresses never go to the log
+        logger.debug(f"Disbursed {sum(wallet_counts.values())} allocation(s) of {len(batch)} crypto asset(s), {len(new_assets)} cloned to registered heirs")
+
+    if commit:
+        db.commit()
+    return disbursed
+
 def calculate_crypto_distribution(db: Session, crypto_asset_id: str):
     """Calculate and generate mock disbursements"""
-    # 1. Fetch the original Asset and CryptoAsset
     original_crypto_asset = db.query(crypto_asset_model.CryptoAsset).filter(crypto_asset_model.CryptoAsset.crypto_asset_id == crypto_asset_id).first()
     if not original_crypto_asset:
         return None
-    
-    original_asset = db.query(asset_model.Asset).filter(asset_model.Asset.asset_id == crypto_asset_id).first()
-    if not original_asset:
-        return None
-
-    allocations = get_allocations_for_asset(db, crypto_asset_id)
-
-    for allocation in allocations:
-        # Calculate amounts
-        allocation.allocated_amount_usd = original_crypto_asset.balance_usd * (allocation.percentage / 100)
-        allocation.allocated_amount_crypto = original_crypto_asset.balance_crypto * (allocation.percentage / 100)
-        allocation.mock_transaction_id = f"MOCK-{uuid.uuid4().hex[:16]}"
-        allocation.disbursement_status = "disbursed"
-        allocation.disbursed_at = datetime.now()
-        db.add(allocation)
-        
-        # Simulate Decryption and Disbursement
-        print(f"---------------------------------------------------")
-        print(f"DISBURSING CRYPTO ASSET: {original_crypto_asset.asset_name}")
-        print(f"Beneficiary: {allocation.beneficiary_id}")
-        print(f"Amount: {allocation.allocated_amount_crypto} {original_crypto_asset.wallet_type.upper()}")
-        print(f"Decrypting Private Key: {original_crypto_asset.private_key} using ZK-Proof derived key...")
-        print(f"Unlocking Wallet: {original_crypto_asset.wallet_address}")
-        print(f"Broadcasting Transaction: {allocation.mock_transaction_id}")
-        print(f"Status: CONFIRMED")
-        print(f"---------------------------------------------------")
-        
-        # ------------------------------------------------------------------
-        # NEW: Clone Asset to Beneficiary's Account
-        # ------------------------------------------------------------------
-        # Find the beneficiary record to get the email
-        beneficiary = db.query(beneficiary_model.Beneficiary).filter(
-            beneficiary_model.Beneficiary.beneficiary_id == allocation.beneficiary_id
-        ).first()
-        
-        if beneficiary and beneficiary.email:
-            # Check if this beneficiary has a registered User account
-            beneficiary_user = db.query(user_model.User).filter(
-                user_model.User.email == beneficiary.email
-            ).first()
-            
-            if beneficiary_user:
-                print(f"Creating inherited asset for User {beneficiary_user.email} from allocation {allocation.allocation_id}")
-                
-                # 1. Create new Asset record
-                new_asset = asset_model.Asset(
-                    user_id=beneficiary_user.user_id,
-                    asset_type=original_asset.asset_type,
-                    platform_name=original_asset.platform_name,
-                    asset_name=f"{original_asset.asset_name} (Inherited)",
-                    category="Inherited Assets",
-                    username=original_asset.username,
-                    # In a real app, you might re-encrypt these or share the key
-                    password=original_asset.password,
-                    recovery_email=original_asset.recovery_email,
-                    notes=f"Inherited from {original_asset.user.first_name} {original_asset.user.last_name}. " + (original_asset.notes or "")
-                )
-                db.add(new_asset)
-                db.flush() # get new_asset.asset_id
-                
-                # 2. Create new CryptoAsset record with allocated balance
-                new_crypto_asset = crypto_asset_model.CryptoAsset(
-                    crypto_asset_id=new_asset.asset_id,
-                    wallet_type=original_crypto_asset.wallet_type,
-                    wallet_address=original_crypto_asset.wallet_address,
-                    # Set balance to the allocated amount
-                    balance_usd=allocation.allocated_amount_usd,
-                    balance_crypto=allocation.allocated_amount_crypto,
-                    private_key=original_crypto_asset.private_key, # In real app, consider security implications
-                    seed_phrase=original_crypto_asset.seed_phrase
-                )
-                db.add(new_crypto_asset)
 
-    db.commit()
-    return allocations
+    disburse_crypto_assets(db, [crypto_asset_id])
+    return get_allocations_for_asset(db, crypto_asset_id)
@@ -0,0 +1,137 @@
+import logging
+import os
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..database.models import user as user_model, beneficiary as beneficiary_model, asset as asset_model, crypto_asset as crypto_asset_model, crypto_allocation as crypto_allocation_model
+from ..database.models.job import JobStep
+from ..services import beneficiary_service, crypto_service, message_service, notification_service
+from ..utils import job_queue
+from ..utils.metrics import count_after_commit, registry
+
+INHERITANCE_JOB_TYPE = "inheritance"
+# Beneficiaries handled per transaction in the notification step
+INHERITANCE_BATCH_SIZE = int(os.getenv("INHERITANCE_BATCH_SIZE", "50"))
+PORTAL_URL = os.getenv("BENEFICIARY_PORTAL_URL", "http://localhost:3000/dashboard/beneficiary-access")
+
+logger = logging.getLogger(__name__)
+
+inheritance_triggered = registry.counter("everaccess_inheritance_triggered_total", "Users marked deceased by the inheritance process.")
+beneficiaries_notified = registry.counter("everaccess_inheritance_beneficiaries_notified_total", "Beneficiaries issued an access token and notified.")
+
+
+def mark_deceased(db: Session, payload: dict, step: JobStep, heartbeat):
+    """
+    1. Set User account_status to 'deceased' and release the user's
+    upon_death messages (one UPDATE, same transaction) to the scheduler.
+    """
+    step.total = 1
+    user = db.query(user_model.User).filter(user_model.User.user_id == payload["user_id"]).first()
+    if user and user.account_status != "deceased":
+        user.account_status = "deceased"
+        count_after_commit(db, inheritance_triggered)
+        logger.info(f"Inheritance process triggered for user {payload['user_id']}")
+    if user:
+        message_service.release_messages(db, user.user_id, "upon_death")
+    step.completed = 1
+    db.commit()
+
+
+def notify_beneficiaries(db: Session, payload: dict, step: JobStep, heartbeat):
+    """
+    2. Generate secure access tokens for all active beneficiaries and
+    3. queue notifications (emails) with the access link in the outbox.
+    Beneficiaries already notified are skipped, so a retry never rotates a
+    token that has been sent.
+    """
+    Beneficiary = beneficiary_model.Beneficiary
+    active = db.query(Beneficiary).filter(Beneficiary.user_id == payload["user_id"], Beneficiary.status == "active")
+    pending = active.filter(or_(Beneficiary.notification_sent.is_(False), Beneficiary.notification_sent.is_(None)))
+    step.total = active.count()
+    step.completed = step.total - pending.count()
+    db.commit()
+
+    while True:
+        batch = pending.order_by(Beneficiary.beneficiary_id).limit(INHERITANCE_BATCH_SIZE).all()
+        if not batch:
+            break
+        for beneficiary in batch:
+            raw_token = beneficiary_service.issue_access_token(beneficiary)
+
+            # Queued in the same transaction as the token it carries
+            access_link = f"{PORTAL_URL}?token={raw_token}"
+            notification_service.queue_notification(
+                db,
+                recipient_email=beneficiary.email,
+                subject="Inheritance Access Granted",
+                message=f"Dear {beneficiary.first_name}, access has been granted. Click here: {access_link}",
+                notification_type="access_granted",
+                beneficiary_id=beneficiary.beneficiary_id,
+            )
+
+            beneficiary.notification_sent = True
+        step.completed += len(batch)
+        count_after_commit(db, beneficiaries_notified, amount=len(batch))
+        heartbeat()
+        db.commit()
+
+
+def disburse_crypto(db: Session, payload: dict, step: JobStep, heartbeat):
+    """
+    4. Automatically disburse crypto assets, a batch of wallets per
+    transaction. Assets without pending allocations are skipped.
+    """
+    CryptoAsset = crypto_asset_model.CryptoAsset
+    CryptoAllocation = crypto_allocation_model.CryptoAllocation
+    crypto_asset_ids = [
+        row.crypto_asset_id
+        for row in db.query(CryptoAsset.crypto_asset_id).join(asset_model.Asset).filter(asset_model.Asset.user_id == payload["user_id"])
+    ]
+    pending_ids = {
+        row.crypto_asset_id
+        for row in db.query(CryptoAllocation.crypto_asset_id).filter(
+            CryptoAllocation.crypto_asset_id.in_(crypto_asset_ids),
+            or_(CryptoAllocation.disbursement_status != "disbursed", CryptoAllocation.disbursement_status.is_(None)),
+        ).distinct()
+    } if crypto_asset_ids else set()
+    step.total = len(crypto_asset_ids)
+    step.completed = step.total - len(pending_ids)
+    db.commit()
+
+    pending = [crypto_asset_id for crypto_asset_id in crypto_asset_ids if crypto_asset_id in pending_ids]
+    for start in range(0, len(pending), crypto_service.DISBURSEMENT_BATCH_SIZE):
+        batch = pending[start:start + crypto_service.DISBURSEMENT_BATCH_SIZE]
+        heartbeat()
+        logger.debug(f"Distributing {len(batch)} crypto asset(s) of user {payload['user_id']}")
+        crypto_service.disburse_crypto_assets(db, batch, commit=False)
+        step.completed += len(batch)
+        db.commit()
+
+
+INHERITANCE_STEPS = [
+    ("mark_deceased", mark_deceased),
+    ("notify_beneficiaries", notify_beneficiaries),
+    ("disburse_crypto", disburse_crypto),
+]
+
+job_queue.register_job_type(INHERITANCE_JOB_TYPE, INHERITANCE_STEPS)
+
+
+def _payload(user_id: str, request_id: str = None, requested_by: str = None) -> dict:
+    return {"user_id": user_id, "request_id": request_id, "requested_by": requested_by}
+
+
+def enqueue_inheritance(db: Session, user_id: str, request_id: str = None, requested_by: str = None, commit: bool = True):
+    """Queues the inheritance process for a user; at most one runs per user at a time."""
+    return job_queue.enqueue_job(db, INHERITANCE_JOB_TYPE, _payload(user_id, request_id, requested_by), dedupe_key=user_id, commit=commit)
+
+
+async def enqueue_inheritance_async(db: AsyncSession, user_id: str, request_id: str = None, requested_by: str = None, commit: bool = True):
+    return await job_queue.enqueue_job_async(db, INHERITANCE_JOB_TYPE, _payload(user_id, request_id, requested_by), dedupe_key=user_id, commit=commit)
+
+
+def run_inheritance(db: Session, user_id: str):
+    """Runs every inheritance step inline in the caller's session, without the queue."""
+    payload = _payload(user_id)
+    for name, handler in INHERITANCE_STEPS:
+        handler(db, payload, JobStep(name=name, completed=0), lambda: None)
@@ -1,11 +1,31 @@
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import Session
-from ..database.models import user_message as message_model
+from ..database.models import user_message as message_model, beneficiary as beneficiary_model, user as user_model
 from ..schemas import user_message as message_schema
+from ..utils.pagination import Page, keyset_paginate, page_from_rows
+from . import notification_service, vault_service
 import uuid
 
+# Messages delivered per transaction by the scheduler
+MESSAGE_DELIVERY_BATCH_SIZE = int(os.getenv("MESSAGE_DELIVERY_BATCH_SIZE", "200"))
+PORTAL_URL = os.getenv("BENEFICIARY_PORTAL_URL", "http://localhost:3000/dashboard/beneficiary-access")
+# Set on a session that released messages; the scheduler wakes after commit
+RELEASED_KEY = "messages_released"
+
 def create_message(db: Session, message: message_schema.UserMessageCreate, user_id: str):
+    data = message.dict()
+    deliver_at = data.get("deliver_at")
+    if data["delivery_condition"] != "scheduled_date":
+        # Set when the condition is met (release_messages)
+        data["deliver_at"] = None
+    elif deliver_at.tzinfo:
+        data["deliver_at"] = deliver_at.astimezone(timezone.utc).replace(tzinfo=None)
+    vault_service.bump(db, user_id)
     db_message = message_model.UserMessage(
-        **message.dict(),
+        **data,
         user_id=user_id
     )
     db.add(db_message)
@@ -13,8 +33,11 @@ def create_message(db: Session, message: message_schema.UserMessageCreate, user_
     db.refresh(db_message)
     return db_message
 
-def get_user_messages(db: Session, user_id: str, skip: int = 0, limit: int = 100):
-    return db.query(message_model.UserMessage).filter(message_model.UserMessage.user_id == user_id).offset(skip).limit(limit).all()
+def get_user_messages(db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    UserMessage = message_model.UserMessage
+    query = db.query(UserMessage).filter(UserMessage.user_id == user_id)
+    rows = keyset_paginate(query, UserMessage.created_at, UserMessage.message_id, limit, cursor=cursor, skip=skip).all()
+    return page_from_rows(rows, UserMessage.created_at, UserMessage.message_id, limit)
 
 def get_message(db: Session, message_id: str, user_id: str):
     return db.query(message_model.UserMessage).filter(message_model.UserMessage.message_id == message_id, message_model.UserMessage.user_id == user_id).first()
@@ -23,5 +46,130 @@ def delete_message(db: Session, message_id: str, user_id: str):
     db_message = get_message(db, message_id, user_id)
     if db_message:
         db.delete(db_message)
+        # Message row first, then the users row: the order the scheduler locks them in
+        db.flush()
+        vault_service.bump(db, user_id)
         db.commit()
     return db_message
+
+def _due(now: datetime):
+    # Matches ix_user_messages_due: equality on delivered, the conditions, then a deliver_at range
+    UserMessage = message_model.UserMessage
+    return (
+        UserMessage.delivered == False,  # noqa: E712 (= false is an index lookup, IS FALSE is not)
+        UserMessage.delivery_condition.in_(("scheduled_date", "upon_death", "after_verification")),
+        UserMessage.deliver_at <= now,
+    )
+
+def _release_stmt(user_id: str, condition: str, now: datetime, beneficiary_id: Optional[str] = None):
+    UserMessage = message_model.UserMessage
+    stmt = update(UserMessage).where(
+        UserMessage.user_id == user_id,
+        UserMessage.delivery_condition == condition,
+        UserMessage.delivered == False,  # noqa: E712
+        UserMessage.deliver_at.is_(None),
+    )
+    if beneficiary_id:
+        # Messages for this beneficiary and those addressed to every beneficiary
+        stmt = stmt.where(or_(UserMessage.beneficiary_id == beneficiary_id, UserMessage.beneficiary_id.is_(None)))
+    return stmt.values(deliver_at=now).execution_options(synchronize_session=False)
+
+def release_messages(db: Session, user_id: str, condition: str, beneficiary_id: Optional[str] = None) -> int:
+    """
+    Makes a user's held messages for a condition due now with one UPDATE,
+    in the caller's transaction. The scheduler delivers them after commit.
+    """
+    result = db.execute(_release_stmt(user_id, condition, datetime.utcnow(), beneficiary_id))
+    if result.rowcount:
+        vault_service.bump(db, user_id)
+    db.info[RELEASED_KEY] = True
+    return result.rowcount
+
+async def release_messages_async(db, user_id: str, condition: str, beneficiary_id: Optional[str] = None) -> int:
+    result = await db.execute(_release_stmt(user_id, condition, datetime.utcnow(), beneficiary_id))
+    if result.rowcount:
+        await vault_service.bump_async(db, user_id)
+    db.info[RELEASED_KEY] = True
+    return result.rowcount
+
+def deliver_due_messages(db: Session, batch_size: int = MESSAGE_DELIVERY_BATCH_SIZE, now: Optional[datetime] = None) -> int:
+    """
+    Claims up to batch_size due messages with FOR UPDATE SKIP LOCKED, so
+    concurrent schedulers take disjoint batches, queues a notification to
+    each recipient in the outbox and marks the messages delivered, all in
+    one transaction. A message without a beneficiary goes to every active
+    beneficiary of its owner. Returns the number of messages delivered.
+    """
+    UserMessage = message_model.UserMessage
+    Beneficiary = beneficiary_model.Beneficiary
+    User = user_model.User
+    now = now or datetime.utcnow()
+    due = db.execute(
+        select(UserMessage.message_id, UserMessage.user_id, UserMessage.beneficiary_id, UserMessage.message_title)
+        .where(*_due(now))
+        # No ORDER BY: the index yields each condition's range oldest first, and
+        # sorting the whole due set would cost O(backlog) per batch
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not due:
+        db.rollback()
+        return 0
+
+    owner_ids = {m.user_id for m in due}
+    direct_ids = {m.beneficiary_id for m in due if m.beneficiary_id}
+    broadcast_owner_ids = {m.user_id for m in due if not m.beneficiary_id}
+    recipients = db.execute(
+        select(Beneficiary.beneficiary_id, Beneficiary.user_id, Beneficiary.email, Beneficiary.first_name)
+        .where(
+            Beneficiary.status == "active",
+            or_(Beneficiary.beneficiary_id.in_(direct_ids), Beneficiary.user_id.in_(broadcast_owner_ids)),
+        )
+    ).all()
+    by_id = {r.beneficiary_id: r for r in recipients}
+    by_owner = {}
+    for r in recipients:
+        if r.user_id in broadcast_owner_ids:
+            by_owner.setdefault(r.user_id, []).append(r)
+    owners = {
+        row.user_id: " ".join(filter(None, (row.first_name, row.last_name))) or "Someone"
+        for row in db.execute(select(User.user_id, User.first_name, User.last_name).where(User.user_id.in_(owner_ids)))
+    }
+
+    for message in due:
+        if message.beneficiary_id:
+            # A direct message whose beneficiary is no longer active goes to nobody
+            targets = [by_id[message.beneficiary_id]] if message.beneficiary_id in by_id else []
+        else:
+            targets = by_owner.get(message.user_id, [])
+        for beneficiary in targets:
+            notification_service.queue_notification(
+                db,
+                recipient_email=beneficiary.email,
+                subject=f"A message from {owners[message.user_id]}",
+                message=(
+                    f"Dear {beneficiary.first_name or beneficiary.email}, {owners[message.user_id]} left you a message: "
+                    f"\"{message.message_title}\". Read it here: {PORTAL_URL}"
+                ),
+                notification_type="access_granted",
+                beneficiary_id=beneficiary.beneficiary_id,
+            )
+    db.execute(
+        update(UserMessage)
+        .where(UserMessage.message_id.in_([m.message_id for m in due]))
+        .values(delivered=True, delivered_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    vault_service.bump(db, *owner_ids)
+    db.commit()
+    return len(due)
+
+def get_delivered_messages_for_beneficiary(db: Session, beneficiary_id: str) -> List[message_model.UserMessage]:
+    """Delivered messages addressed to the beneficiary or to all of its owner's beneficiaries."""
+    UserMessage = message_model.UserMessage
+    Beneficiary = beneficiary_model.Beneficiary
+    return db.query(UserMessage).join(Beneficiary, Beneficiary.user_id == UserMessage.user_id).filter(
+        Beneficiary.beneficiary_id == beneficiary_id,
+        UserMessage.delivered == True,  # noqa: E712
+        or_(UserMessage.beneficiary_id == beneficiary_id, UserMessage.beneficiary_id.is_(None)),
+    ).order_by(UserMessage.delivered_at, UserMessage.message_id).all()
@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from ..database.models.notification import Notification
+from ..utils.notification_dispatcher import QUEUED_KEY
+
+def queue_notification(
+    db: Session,
+    recipient_email: str,
+    subject: str,
+    message: str,
+    notification_type: str = "system_alert",
+    user_id: str = None,
+    beneficiary_id: str = None,
+) -> Notification:
+    """
+    Adds a pending Notification to the caller's transaction (outbox). Nothing
+    is sent here; the dispatcher delivers it once the transaction commits, and
+    a rollback discards it together with the change it describes. Works with
+    both Session and AsyncSession.
+    """
+    notification = Notification(
+        user_id=user_id,
+        beneficiary_id=beneficiary_id,
+        notification_type=notification_type,
+        recipient_email=recipient_email,
+        subject=subject,
+        message=message,
+        delivery_status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(notification)
+    # Wakes the dispatcher once the transaction commits
+    db.info[QUEUED_KEY] = True
+    return notification
@@ -1,14 +1,16 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..database.models import user as user_model
 from ..schemas import user as user_schema
-from ..utils.security import get_password_hash
+from ..utils.security import get_password_hash, get_password_hash_async
 
 def get_user_by_email(db: Session, email: str):
     return db.query(user_model.User).filter(user_model.User.email == email).first()
 
 def create_user(db: Session, user: user_schema.UserCreate):
     hashed_password = get_password_hash(user.password)
-    
+
     db_user = user_model.User(
         email=user.email,
         password_hash=hashed_password,
@@ -19,3 +21,23 @@ def create_user(db: Session, user: user_schema.UserCreate):
     db.commit()
     db.refresh(db_user)
     return db_user
+
+# Async variants for use with connection.get_async_db
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(user_model.User).where(user_model.User.email == email))
+    return result.scalars().first()
+
+async def create_user_async(db: AsyncSession, user: user_schema.UserCreate):
+    hashed_password = await get_password_hash_async(user.password)
+
+    db_user = user_model.User(
+        email=user.email,
+        password_hash=hashed_password,
+        first_name=user.first_name,
+        last_name=user.last_name,
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
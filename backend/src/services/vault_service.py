@@ -0,0 +1,62 @@
+from typing import Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from ..database.models.asset import Asset
+from ..database.models.user import User
+
+# Every write to a user's vault (assets, files, beneficiaries, crypto,
+# messages) bumps users.vault_version in the same transaction, so list
+# endpoints can tag responses with it and answer revalidation without
+# touching the vault tables.
+
+
+def _bump_stmt(condition):
+    # updated_at is kept as is: its onupdate default would otherwise mark the profile as edited
+    return (
+        update(User)
+        .where(condition)
+        .values(vault_version=User.vault_version + 1, updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _owner_condition(user_ids: Iterable[str]):
+    user_ids = sorted(set(filter(None, user_ids)))
+    if not user_ids:
+        return None
+    # Sorted, so concurrent multi-user bumps lock rows in the same order
+    return User.user_id == user_ids[0] if len(user_ids) == 1 else User.user_id.in_(user_ids)
+
+
+def _asset_owner_condition(asset_id: str):
+    return User.user_id == select(Asset.user_id).where(Asset.asset_id == asset_id).scalar_subquery()
+
+
+def bump(db: Session, *user_ids: str):
+    """
+    Increments the vault version of the given users in the caller's
+    transaction. Call it before inserting rows that reference the user, so
+    the users row is locked exclusively up front rather than upgraded from
+    the shared lock a foreign key check takes.
+    """
+    condition = _owner_condition(user_ids)
+    if condition is not None:
+        db.execute(_bump_stmt(condition))
+
+
+def bump_asset_owner(db: Session, asset_id: str):
+    db.execute(_bump_stmt(_asset_owner_condition(asset_id)))
+
+
+def get_version(db: Session, user_id: str) -> Optional[int]:
+    return db.execute(select(User.vault_version).where(User.user_id == user_id)).scalar()
+
+
+async def bump_async(db, *user_ids: str):
+    condition = _owner_condition(user_ids)
+    if condition is not None:
+        await db.execute(_bump_stmt(condition))
+
+
+async def bump_asset_owner_async(db, asset_id: str):
+    await db.execute(_bump_stmt(_asset_owner_condition(asset_id)))
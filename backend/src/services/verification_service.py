@@ -1,7 +1,10 @@
-from sqlalchemy.orm import Session
-from ..database.models import verification_request as verification_request_model, verification_document as verification_document_model, user as user_model, access_rule as access_rule_model, beneficiary as beneficiary_model, asset as asset_model, crypto_asset as crypto_asset_model
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from ..database.models import verification_request as verification_request_model, verification_document as verification_document_model
 from ..schemas import verification as verification_schema
-from ..services import beneficiary_service, crypto_service
+from ..utils.pagination import Page, keyset_paginate, page_from_rows
+from ..services import inheritance_service, message_service
 
 def create_verification_request(db: Session, request: verification_schema.VerificationRequestCreate, beneficiary_id: str):
     db_request = verification_request_model.VerificationRequest(
@@ -14,64 +17,31 @@ def create_verification_request(db: Session, request: verification_schema.Verifi
     db.refresh(db_request)
     return db_request
 
-def get_verification_requests(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(verification_request_model.VerificationRequest).offset(skip).limit(limit).all()
+def get_verification_requests(db: Session, skip: int = 0, limit: int = 100, cursor: str = None) -> Page:
+    VerificationRequest = verification_request_model.VerificationRequest
+    query = db.query(VerificationRequest)
+    rows = keyset_paginate(query, VerificationRequest.request_date, VerificationRequest.request_id, limit, cursor=cursor, skip=skip).all()
+    return page_from_rows(rows, VerificationRequest.request_date, VerificationRequest.request_id, limit)
 
 def get_verification_request(db: Session, request_id: str):
     return db.query(verification_request_model.VerificationRequest).filter(verification_request_model.VerificationRequest.request_id == request_id).first()
 
 def trigger_inheritance_process(db: Session, user_id: str):
     """
-    Triggered when a death certificate is verified.
-    1. Set User account_status to 'deceased'.
+    Triggered when a death certificate is verified. Runs the inheritance
+    steps (see inheritance_service.INHERITANCE_STEPS) inline:
+    1. Set User account_status to 'deceased' and release upon_death messages.
     2. Generate secure access tokens for all beneficiaries.
     3. Send notifications (emails) with the access link.
     4. Automatically disburse crypto assets.
-    Returns: Dict[str, str] map of beneficiary_id -> raw_token
+    Request handlers should queue the process with
+    inheritance_service.enqueue_inheritance instead.
     """
-    generated_tokens = {}
-    # 1. Update User Status
-    user = db.query(user_model.User).filter(user_model.User.user_id == user_id).first()
-    if user:
-        user.account_status = "deceased"
-        db.add(user)
-        
-        print(f"Inheritance process triggered for User {user_id}")
-        
-        # 2. Generate Tokens for Beneficiaries
-        beneficiaries = db.query(beneficiary_model.Beneficiary).filter(
-            beneficiary_model.Beneficiary.user_id == user_id,
-            beneficiary_model.Beneficiary.status == "active"
-        ).all()
-        
-        for beneficiary in beneficiaries:
-            raw_token = beneficiary_service.generate_access_token(db, beneficiary.beneficiary_id)
-            generated_tokens[beneficiary.beneficiary_id] = raw_token
-            
-            # 3. Mock Send Email
-            # In a real app, use an email service
-            access_link = f"http://localhost:3000/dashboard/beneficiary-access?token={raw_token}"
-            print(f"---------------------------------------------------")
-            print(f"EMAIL TO: {beneficiary.email}")
-            print(f"SUBJECT: Inheritance Access Granted")
-            print(f"BODY: Dear {beneficiary.first_name}, access has been granted. Click here: {access_link}")
-            print(f"---------------------------------------------------")
-            
-            beneficiary.notification_sent = True
-            db.add(beneficiary)
-        
-        # 4. Auto-Distribute Crypto Assets
-        crypto_assets = db.query(crypto_asset_model.CryptoAsset).join(asset_model.Asset).filter(asset_model.Asset.user_id == user_id).all()
-        for crypto_asset in crypto_assets:
-            print(f"Distributing Crypto Asset: {crypto_asset.crypto_asset_id}")
-            crypto_service.calculate_crypto_distribution(db, crypto_asset.crypto_asset_id)
-            
-        db.commit()
-    return generated_tokens
+    inheritance_service.run_inheritance(db, user_id)
 
 def approve_verification_request(db: Session, request_id: str, admin_id: str):
     db_request = get_verification_request(db, request_id)
-    tokens = {}
+    job = None
     if db_request:
         db_request.status = "approved"
         # Only assign reviewed_by if it's a real admin ID (UUID format usually), 
@@ -88,10 +58,17 @@ def approve_verification_request(db: Session, request_id: str, admin_id: str):
                 break
         
         if is_death_certificate:
-            tokens = trigger_inheritance_process(db, db_request.user_id)
+            # Queued in the same transaction as the approval; a worker runs it
+            job = inheritance_service.enqueue_inheritance(
+                db, db_request.user_id, request_id=db_request.request_id, commit=False
+            )
 
+        # Messages held until this beneficiary's claim is verified
+        message_service.release_messages(
+            db, db_request.user_id, "after_verification", beneficiary_id=db_request.beneficiary_id
+        )
         db.commit()
-    return {"request": db_request, "tokens": tokens}
+    return {"request": db_request, "job": job}
 
 def reject_verification_request(db: Session, request_id: str, admin_id: str, reason: str):
     db_request = get_verification_request(db, request_id)
@@ -115,3 +92,69 @@ def add_document_to_request(db: Session, request_id: str, document: verification
     db.commit()
     db.refresh(db_document)
     return db_document
+
+# Async variants for use with connection.get_async_db
+
+async def create_verification_request_async(db: AsyncSession, request: verification_schema.VerificationRequestCreate, beneficiary_id: str):
+    db_request = verification_request_model.VerificationRequest(
+        requester_email=request.requester_email,
+        user_id=request.user_id,
+        beneficiary_id=beneficiary_id,
+    )
+    db.add(db_request)
+    await db.commit()
+    await db.refresh(db_request)
+    return db_request
+
+async def get_verification_request_async(db: AsyncSession, request_id: str):
+    result = await db.execute(
+        select(verification_request_model.VerificationRequest)
+        .where(verification_request_model.VerificationRequest.request_id == request_id)
+        .options(selectinload(verification_request_model.VerificationRequest.documents))
+    )
+    return result.scalars().first()
+
+async def get_approved_claim_async(db: AsyncSession, user_id: str, beneficiary_id: str):
+    result = await db.execute(
+        select(verification_request_model.VerificationRequest).where(
+            verification_request_model.VerificationRequest.user_id == user_id,
+            verification_request_model.VerificationRequest.beneficiary_id == beneficiary_id,
+            verification_request_model.VerificationRequest.status == "approved"
+        )
+    )
+    return result.scalars().first()
+
+async def approve_verification_request_async(db: AsyncSession, request_id: str, admin_id: str, requested_by: str = None):
+    db_request = await get_verification_request_async(db, request_id)
+    job = None
+    if db_request:
+        db_request.status = "approved"
+        if admin_id and admin_id != "auto-system-approval":
+            db_request.reviewed_by = admin_id
+
+        is_death_certificate = any(
+            doc.document_type == "death_certificate" for doc in db_request.documents
+        )
+
+        if is_death_certificate:
+            job = await inheritance_service.enqueue_inheritance_async(
+                db, db_request.user_id, request_id=db_request.request_id, requested_by=requested_by, commit=False
+            )
+
+        await message_service.release_messages_async(
+            db, db_request.user_id, "after_verification", beneficiary_id=db_request.beneficiary_id
+        )
+        await db.commit()
+    return {"request": db_request, "job": job}
+
+async def add_document_to_request_async(db: AsyncSession, request_id: str, document: verification_schema.VerificationDocumentCreate):
+    db_document = verification_document_model.VerificationDocument(
+        request_id=request_id,
+        document_type=document.document_type,
+        file_name=document.file_name,
+        encrypted_file_path=f"uploads/{document.file_name}"
+    )
+    db.add(db_document)
+    await db.commit()
+    await db.refresh(db_document)
+    return db_document
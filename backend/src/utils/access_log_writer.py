@@ -0,0 +1,419 @@
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import anyio
+from sqlalchemy import insert, select, text
+from dotenv import load_dotenv
+from ..database import connection
+from ..database.models.access_log import AccessLog
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+# A flush happens when this many events are buffered or the interval elapses
+ACCESS_LOG_BATCH_SIZE = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "500"))
+ACCESS_LOG_FLUSH_INTERVAL = float(os.getenv("ACCESS_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+# What record() does when the queue is full: "block", "drop" or "spill"
+ACCESS_LOG_OVERFLOW = os.getenv("ACCESS_LOG_OVERFLOW", "spill").lower()
+# How long "block" waits for room before the event is dropped
+ACCESS_LOG_BLOCK_TIMEOUT = float(os.getenv("ACCESS_LOG_BLOCK_TIMEOUT_SECONDS", "0.25"))
+# Overflow and failed flushes go here (JSON lines) and are replayed when the
+# database is reachable. Each process writes its own file, named with its pid
+# (logs/access_log_spill.<pid>.jsonl), so server workers never share one
+ACCESS_LOG_SPILL_PATH = os.getenv("ACCESS_LOG_SPILL_PATH", "logs/access_log_spill.jsonl")
+ACCESS_LOG_RETRY_SECONDS = float(os.getenv("ACCESS_LOG_RETRY_SECONDS", "5"))
+ACCESS_LOG_SHUTDOWN_TIMEOUT = float(os.getenv("ACCESS_LOG_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+EVENT_FIELDS = (
+    "log_id", "user_id", "beneficiary_id", "asset_id", "action_type",
+    "ip_address", "user_agent", "timestamp", "status", "details",
+)
+
+
+def _process_alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AccessLogWriter:
+    """
+    Buffers access log events in a bounded in-process queue and writes them
+    from one background thread as multi-row INSERTs, so request handlers
+    never wait on the audit table. Events that cannot be buffered or written
+    are appended to this process's spill file and inserted later, and stop()
+    flushes whatever is still queued. Spill and replay files left by exited
+    processes are taken over on start. Replay skips events that are already
+    in the table and moves events the database rejects to a .rejected file.
+    """
+
+    def __init__(self, queue_size: int = ACCESS_LOG_QUEUE_SIZE, batch_size: int = ACCESS_LOG_BATCH_SIZE,
+                 flush_interval: float = ACCESS_LOG_FLUSH_INTERVAL, overflow: str = ACCESS_LOG_OVERFLOW,
+                 spill_path: str = ACCESS_LOG_SPILL_PATH, enabled: bool = ACCESS_LOG_ENABLED):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"ACCESS_LOG_OVERFLOW must be one of {', '.join(OVERFLOW_POLICIES)}")
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._replay_after = 0.0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.max_depth = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._total_flush_seconds = 0.0
+
+    def record(self, action_type: str, status: str = "success", request=None, user_id: Optional[str] = None,
+               beneficiary_id: Optional[str] = None, asset_id: Optional[str] = None,
+               details: Optional[Dict[str, Any]] = None):
+        """
+        Queues one event. The client address and user agent are taken from
+        the request when one is given. Never raises: auditing must not fail
+        the request it describes. A full queue makes the caller wait (block)
+        or write the spill file, so async code uses record_async instead.
+        """
+        if not self.enabled:
+            return
+        event = self._event(action_type, status, request, user_id, beneficiary_id, asset_id, details)
+        if not self._offer(event):
+            self._overflowed(event)
+
+    async def record_async(self, action_type: str, status: str = "success", request=None, user_id: Optional[str] = None,
+                           beneficiary_id: Optional[str] = None, asset_id: Optional[str] = None,
+                           details: Optional[Dict[str, Any]] = None):
+        """record for the event loop: a full queue is handled in a worker thread, so the loop never waits."""
+        if not self.enabled:
+            return
+        event = self._event(action_type, status, request, user_id, beneficiary_id, asset_id, details)
+        if not self._offer(event):
+            await anyio.to_thread.run_sync(self._overflowed, event)
+
+    @staticmethod
+    def _event(action_type, status, request, user_id, beneficiary_id, asset_id, details) -> dict:
+        return {
+            "log_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "beneficiary_id": beneficiary_id,
+            "asset_id": asset_id,
+            "action_type": action_type,
+            "ip_address": request.client.host if request is not None and request.client else None,
+            "user_agent": request.headers.get("user-agent") if request is not None else None,
+            "timestamp": datetime.utcnow(),
+            "status": status,
+            "details": details,
+        }
+
+    def _offer(self, event: dict) -> bool:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            return False
+        self._count_enqueued()
+        return True
+
+    def _overflowed(self, event: dict):
+        # The queue was full: apply the overflow policy (may wait or do file I/O)
+        if self.overflow == "block":
+            try:
+                self._queue.put(event, timeout=ACCESS_LOG_BLOCK_TIMEOUT)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return
+            self._count_enqueued()
+        elif self.overflow == "spill":
+            self._spill([event])
+        else:
+            with self._lock:
+                self.dropped += 1
+
+    def _count_enqueued(self):
+        with self._lock:
+            self.enqueued += 1
+            depth = self._queue.qsize()
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._replay_after = 0.0
+        self._claim_orphaned_replays()
+        self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = ACCESS_LOG_SHUTDOWN_TIMEOUT):
+        """Flushes the queue and stops the writer. Anything it could not write is spilled."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        leftover = self._drain()
+        if leftover:
+            self._spill(leftover)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+            else:
+                self._replay_spill()
+
+    def _collect(self) -> List[dict]:
+        # Waits up to flush_interval for the first event, then fills the batch until the deadline
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if self._stopping.is_set():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> List[dict]:
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _insert(self, rows: List[dict]):
+        # executemany: cached statement; pymysql sends it as multi-row INSERTs
+        with connection.engine.begin() as conn:
+            conn.execute(insert(AccessLog), rows)
+
+    def _insert_missing(self, rows: List[dict]) -> int:
+        # Replay is at-least-once: a crash or a lost commit acknowledgement
+        # can leave rows of a batch already written, so those are skipped
+        with connection.engine.begin() as conn:
+            existing = set(conn.execute(
+                select(AccessLog.log_id).where(AccessLog.log_id.in_([row["log_id"] for row in rows]))
+            ).scalars())
+            missing = [row for row in rows if row["log_id"] not in existing]
+            if missing:
+                conn.execute(insert(AccessLog), missing)
+        return len(missing)
+
+    def _database_reachable(self) -> bool:
+        try:
+            with connection.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            return False
+        return True
+
+    def _replay_batch(self, lines: List[str]) -> int:
+        """
+        Writes one batch of spilled lines and returns how many rows were
+        inserted. If the batch fails while the database is reachable, rows
+        are retried one by one and those that still fail are moved to the
+        rejected file, so one bad event cannot hold up the rest. Raises
+        when the database is unreachable; the batch is retried later.
+        """
+        try:
+            return self._insert_missing([self._row(line) for line in lines])
+        except Exception:
+            if not self._database_reachable():
+                raise
+            logger.exception(f"Access log replay batch of {len(lines)} failed; retrying its events one by one")
+        inserted = 0
+        for line in lines:
+            try:
+                inserted += self._insert_missing([self._row(line)])
+            except Exception:
+                if not self._database_reachable():
+                    raise
+                logger.exception(f"Rejected spilled access log event; moved to {self._rejected_path()}")
+                self._reject(line)
+        return inserted
+
+    @staticmethod
+    def _row(line: str) -> dict:
+        event = json.loads(line)
+        event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+        return {field: event.get(field) for field in EVENT_FIELDS}
+
+    def _rejected_path(self) -> str:
+        return f"{self.spill_path}.rejected"
+
+    def _reject(self, line: str):
+        with self._spill_lock:
+            with open(self._rejected_path(), "a", encoding="utf-8") as f:
+                f.write(line if line.endswith("\n") else line + "\n")
+        with self._lock:
+            self.rejected += 1
+
+    def _flush(self, batch: List[dict]):
+        start = time.perf_counter()
+        try:
+            self._insert(batch)
+        except Exception:
+            logger.exception(f"Could not write {len(batch)} access log events; spilling them")
+            with self._lock:
+                self.flush_failures += 1
+            self._replay_after = time.monotonic() + ACCESS_LOG_RETRY_SECONDS
+            self._spill(batch)
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.written += len(batch)
+            self.flushes += 1
+            self.last_flush_seconds = elapsed
+            self._total_flush_seconds += elapsed
+            if elapsed > self.max_flush_seconds:
+                self.max_flush_seconds = elapsed
+
+    def _spill(self, events: List[dict]):
+        lines = []
+        for event in events:
+            lines.append(json.dumps({**event, "timestamp": event["timestamp"].isoformat()}, default=str))
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+                with open(self._spill_name(), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        except OSError:
+            logger.exception(f"Could not spill {len(events)} access log events; they are lost")
+            with self._lock:
+                self.dropped += len(events)
+            return
+        with self._lock:
+            self.spilled += len(events)
+
+    def _spill_name(self, pid: Optional[int] = None) -> str:
+        root, ext = os.path.splitext(self.spill_path)
+        return f"{root}.{pid or os.getpid()}{ext}"
+
+    def _replay_name(self) -> str:
+        return f"{self.spill_path}.{os.getpid()}.replaying"
+
+    def _orphaned_files(self) -> List[str]:
+        # Spill and replay files of processes that are gone; files of sibling
+        # server workers that are still running are theirs. A spill file from
+        # before spill files were per process has no pid and is always taken
+        root, ext = os.path.splitext(self.spill_path)
+        paths = [self.spill_path] if os.path.exists(self.spill_path) else []
+        candidates = [(path, path[len(root) + 1:len(path) - len(ext)]) for path in glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}")]
+        for suffix in (".replaying", ".replaying.claiming"):
+            candidates += [(path, path[len(self.spill_path) + 1:-len(suffix)])
+                           for path in glob.glob(f"{glob.escape(self.spill_path)}.*{suffix}")]
+        for path, pid in candidates:
+            if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(pid):
+                paths.append(path)
+        return paths
+
+    def _claim_orphaned_replays(self):
+        claiming = f"{self._replay_name()}.claiming"
+        for path in self._orphaned_files():
+            try:
+                # The rename is atomic: of several workers starting together only one gets each file
+                os.replace(path, claiming)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.exception(f"Could not claim access log file {path}")
+                continue
+            try:
+                with open(self._replay_name(), "a", encoding="utf-8") as target, open(claiming, encoding="utf-8") as source:
+                    target.write(source.read())
+                os.remove(claiming)
+            except OSError:
+                logger.exception(f"Could not claim access log file {path}")
+
+    def _replay_spill(self):
+        if time.monotonic() < self._replay_after:
+            return
+        replay_path = self._replay_name()
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                try:
+                    os.replace(self._spill_name(), replay_path)
+                except FileNotFoundError:
+                    return
+        try:
+            with open(replay_path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+            # Written in order, so a failure part-way leaves only the unwritten tail
+            for i in range(0, len(lines), self.batch_size):
+                try:
+                    inserted = self._replay_batch(lines[i:i + self.batch_size])
+                except Exception:
+                    with open(replay_path, "w", encoding="utf-8") as f:
+                        f.writelines(lines[i:])
+                    raise
+                with self._lock:
+                    self.replayed += inserted
+                    self.written += inserted
+                if self._stopping.is_set() or not self._queue.empty():
+                    # Live events first; the rest is picked up on the next idle pass
+                    with open(replay_path, "w", encoding="utf-8") as f:
+                        f.writelines(lines[i + self.batch_size:])
+                    return
+            os.remove(replay_path)
+        except Exception:
+            logger.exception("Could not replay spilled access log events")
+            self._replay_after = time.monotonic() + ACCESS_LOG_RETRY_SECONDS
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "overflow": self.overflow,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "replayed": self.replayed,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flush_failures": self.flush_failures,
+                "last_flush_seconds": round(self.last_flush_seconds, 4),
+                "avg_flush_seconds": round(self._total_flush_seconds / self.flushes, 4) if self.flushes else 0.0,
+                "max_flush_seconds": round(self.max_flush_seconds, 4),
+                "spill_pending": os.path.exists(self._spill_name()) or os.path.exists(self._replay_name()),
+            }
+
+
+access_log_writer = AccessLogWriter()
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Content-addressed store: <BLOB_ROOT>/<sha[0:2]>/<sha[2:4]>/<sha>
+BLOB_ROOT = os.getenv("ASSET_BLOB_DIR", os.path.join("uploads", "blobs"))
+# Blobs touched more recently than this are never removed, so an upload that
+# deduplicated against a blob cannot lose it to a concurrent delete.
+ORPHAN_GRACE_SECONDS = int(os.getenv("BLOB_ORPHAN_GRACE_SECONDS", "300"))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(digest: str) -> str:
+    return os.path.join(BLOB_ROOT, digest[:2], digest[2:4], digest)
+
+
+def is_blob_path(path: Optional[str]) -> bool:
+    if not path:
+        return False
+    root = os.path.abspath(BLOB_ROOT)
+    return os.path.commonpath([root, os.path.abspath(path)]) == root
+
+
+def new_temp_path() -> str:
+    """Staging path on the same filesystem as the store, so commit is a rename."""
+    temp_dir = os.path.join(BLOB_ROOT, "tmp")
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, uuid.uuid4().hex)
+
+
+def commit_blob(temp_path: str, digest: str) -> Tuple[str, bool]:
+    """
+    Moves a staged file into the store under its digest. If the blob already
+    exists the staged copy is dropped. Returns (blob path, created).
+    """
+    final_path = blob_path(digest)
+    if os.path.exists(final_path):
+        os.utime(final_path)
+        os.remove(temp_path)
+        return final_path, False
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+    return final_path, True
+
+
+def hash_file(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as source:
+        while True:
+            chunk = source.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _remove(path: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def release_files(files: Iterable[Tuple[str, Optional[str]]], reference_counts: Dict[str, int]) -> int:
+    """
+    Removes stored files whose last AssetFile reference is gone.
+    files is (path, digest) for the deleted rows; reference_counts maps each
+    digest to the number of AssetFile rows still pointing at it. Files that
+    predate the blob store are only referenced by their own row and are
+    removed directly. Returns the number of bytes freed.
+    """
+    freed = 0
+    now = time.time()
+    for path, digest in set(files):
+        if not is_blob_path(path):
+            if path:
+                freed += _remove(path)
+            continue
+        if reference_counts.get(digest, 0) > 0:
+            continue
+        try:
+            if now - os.path.getmtime(path) < ORPHAN_GRACE_SECONDS:
+                continue
+        except FileNotFoundError:
+            continue
+        freed += _remove(path)
+    return freed
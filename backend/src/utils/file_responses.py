@@ -0,0 +1,91 @@
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Vault files are private and must be revalidated, but 304s make that cheap.
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+
+class AssetFileResponse(FileResponse):
+    """
+    FileResponse with larger read chunks. Starlette handles Range/If-Range
+    (single and multipart/byteranges) and hands the path to the server for
+    zero-copy sendfile when it supports the http.response.pathsend extension.
+    """
+    chunk_size = DOWNLOAD_CHUNK_SIZE
+
+
+def strong_etag(content_sha256: str) -> str:
+    return f'"{content_sha256}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_file_response(
+    request: Request,
+    path: str,
+    filename: str,
+    media_type: Optional[str],
+    content_sha256: Optional[str] = None,
+    modified_at: Optional[datetime] = None,
+) -> Response:
+    """
+    Serves a stored file, answering If-None-Match / If-Modified-Since with a
+    304 before the file is opened. Files with a recorded digest get a strong
+    ETag; older files fall back to Starlette's mtime/size-based ETag.
+    """
+    headers = {"cache-control": DOWNLOAD_CACHE_CONTROL}
+    etag = strong_etag(content_sha256) if content_sha256 else None
+    if etag:
+        headers["etag"] = etag
+    if modified_at is not None:
+        if modified_at.tzinfo is None:
+            modified_at = modified_at.replace(tzinfo=timezone.utc)
+        headers["last-modified"] = format_datetime(modified_at, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif modified_at is not None:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _not_modified_since(if_modified_since, modified_at):
+            return Response(status_code=304, headers=headers)
+
+    return AssetFileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+    )
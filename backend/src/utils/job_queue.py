@@ -0,0 +1,352 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from dotenv import load_dotenv
+from ..database import connection
+from ..database.models.job import Job, JobStep
+from .metrics import registry
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process; 0 disables in-process workers
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+# A running job whose lease lapses (crashed worker) is picked up again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", "30"))
+JOB_CLAIM_CANDIDATES = 10
+
+# A step handler receives the session, the job payload, its JobStep row (for
+# progress) and a heartbeat callable to invoke between batches. Handlers must
+# be idempotent: a step is re-run from the start after a failure.
+StepHandler = Callable[[Session, Dict[str, Any], JobStep, Callable[[], None]], None]
+
+_job_types: Dict[str, List[Tuple[str, StepHandler]]] = {}
+
+job_runs = registry.counter("everaccess_job_runs_total", "Job runs by job type and outcome.", ("job_type", "outcome"))
+job_step_duration = registry.histogram(
+    "everaccess_job_step_duration_seconds", "Job step attempts by job type, step and status.", ("job_type", "step", "status"),
+    (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+
+class JobInterrupted(Exception):
+    """Raised by heartbeat when the worker is stopping or lost its lease."""
+
+
+def register_job_type(job_type: str, steps: List[Tuple[str, StepHandler]]):
+    _job_types[job_type] = steps
+
+
+def _new_job(job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str]) -> Job:
+    steps = _job_types[job_type]
+    return Job(
+        job_type=job_type,
+        dedupe_key=dedupe_key,
+        active_dedupe_key=dedupe_key,
+        payload=payload,
+        status="queued",
+        attempts=0,
+        max_attempts=JOB_MAX_ATTEMPTS,
+        available_at=datetime.utcnow(),
+        steps=[JobStep(name=name, position=i, status="pending", completed=0, attempts=0) for i, (name, _) in enumerate(steps)],
+    )
+
+
+def _active_job_stmt(job_type: str, dedupe_key: str):
+    return select(Job).where(Job.job_type == job_type, Job.active_dedupe_key == dedupe_key)
+
+
+def enqueue_job(db: Session, job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None, commit: bool = True) -> Job:
+    """
+    Adds a job with one pending row per registered step. If an unfinished job
+    with the same dedupe_key exists it is returned instead. The unique
+    (job_type, active_dedupe_key) constraint settles concurrent enqueues: the
+    losing insert is rolled back to a savepoint and the winner's job returned.
+    """
+    if dedupe_key:
+        existing = db.execute(_active_job_stmt(job_type, dedupe_key)).scalars().first()
+        if existing:
+            return existing
+    job = _new_job(job_type, payload, dedupe_key)
+    try:
+        with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        if not dedupe_key:
+            raise
+        # Locking read: sees the row committed by the other transaction even under REPEATABLE READ
+        existing = db.execute(_active_job_stmt(job_type, dedupe_key).with_for_update()).scalars().first()
+        if existing is None:
+            raise
+        job = existing
+    if commit:
+        db.commit()
+    return job
+
+
+async def enqueue_job_async(db: AsyncSession, job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None, commit: bool = True) -> Job:
+    if dedupe_key:
+        existing = (await db.execute(_active_job_stmt(job_type, dedupe_key))).scalars().first()
+        if existing:
+            return existing
+    job = _new_job(job_type, payload, dedupe_key)
+    try:
+        async with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        if not dedupe_key:
+            raise
+        existing = (await db.execute(_active_job_stmt(job_type, dedupe_key).with_for_update())).scalars().first()
+        if existing is None:
+            raise
+        job = existing
+    if commit:
+        await db.commit()
+    return job
+
+
+def get_job(db: Session, job_id: str):
+    return db.execute(select(Job).where(Job.job_id == job_id).options(selectinload(Job.steps))).scalars().first()
+
+
+async def get_job_async(db: AsyncSession, job_id: str, populate_existing: bool = False):
+    stmt = select(Job).where(Job.job_id == job_id).options(selectinload(Job.steps))
+    if populate_existing:
+        stmt = stmt.execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == "queued", Job.available_at <= now),
+        and_(Job.status == "running", Job.locked_until < now),
+    )
+
+
+def claim_job(db: Session, worker_id: str) -> Optional[str]:
+    """
+    Takes the oldest available job by compare-and-set on its status/lease, so
+    any number of workers across processes can poll the same table.
+    """
+    now = datetime.utcnow()
+    candidates = db.execute(
+        select(Job.job_id).where(_claimable(now)).order_by(Job.available_at).limit(JOB_CLAIM_CANDIDATES)
+    ).scalars().all()
+    for job_id in candidates:
+        claimed = db.query(Job).filter(Job.job_id == job_id, _claimable(now)).update(
+            {
+                Job.status: "running",
+                Job.locked_by: worker_id,
+                Job.locked_until: now + timedelta(seconds=JOB_LEASE_SECONDS),
+                Job.attempts: Job.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def run_job(db: Session, job_id: str, worker_id: str, stopping: Optional[threading.Event] = None) -> str:
+    """
+    Runs the remaining steps of a claimed job. Finished steps are skipped, so
+    a retried or resumed job continues where it stopped. Returns the job status.
+    """
+    job = get_job(db, job_id)
+    if job is None or job.locked_by != worker_id:
+        return "lost"
+    job_type = job.job_type
+    outcome = _run_steps(db, job, worker_id, stopping)
+    job_runs.inc(job_type, outcome)
+    return outcome
+
+
+def _renew_lease(db: Session, job_id: str, worker_id: str) -> bool:
+    # Conditional on the lease owner: a worker whose lease lapsed and was
+    # claimed by another must not write to the job any more
+    return bool(db.query(Job).filter(Job.job_id == job_id, Job.locked_by == worker_id).update(
+        {Job.locked_until: datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)},
+        synchronize_session=False,
+    ))
+
+
+def _finish(db: Session, job_id: str, worker_id: str, values: Dict[Any, Any]) -> bool:
+    """Writes the job's outcome and releases the lease, only while this worker still holds it."""
+    values = {**values, Job.locked_by: None, Job.locked_until: None}
+    return bool(db.query(Job).filter(Job.job_id == job_id, Job.locked_by == worker_id).update(values, synchronize_session=False))
+
+
+def _lost(db: Session, job_id: str, step_name: str) -> str:
+    db.rollback()
+    logger.warning(f"Job {job_id} lost its lease during {step_name}; leaving it to the new owner")
+    return "lost"
+
+
+def _run_steps(db: Session, job: Job, worker_id: str, stopping: Optional[threading.Event]) -> str:
+    job_id, job_type = job.job_id, job.job_type
+    handlers = dict(_job_types.get(job_type, []))
+
+    def heartbeat():
+        if stopping is not None and stopping.is_set():
+            raise JobInterrupted("worker is shutting down")
+        if not _renew_lease(db, job_id, worker_id):
+            raise JobInterrupted("job lease was taken over")
+
+    now = datetime.utcnow()
+    job.started_at = job.started_at or now
+    db.commit()
+
+    for step in job.steps:
+        if step.status == "succeeded":
+            continue
+        handler = handlers.get(step.name)
+        step_name, started = step.name, time.perf_counter()
+        # Renewed between steps too, so handlers that never call heartbeat
+        # get a full lease per step; the step row is written in the same transaction
+        if not _renew_lease(db, job_id, worker_id):
+            return _lost(db, job_id, step_name)
+        step.status = "running"
+        step.attempts = (step.attempts or 0) + 1
+        step.started_at = step.started_at or datetime.utcnow()
+        step.error = None
+        db.commit()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for step {job.job_type}.{step.name}")
+            handler(db, job.payload or {}, step, heartbeat)
+            if not _renew_lease(db, job_id, worker_id):
+                job_step_duration.observe(time.perf_counter() - started, job_type, step_name, "lost")
+                return _lost(db, job_id, step_name)
+            step.status = "succeeded"
+            step.finished_at = datetime.utcnow()
+            db.commit()
+            job_step_duration.observe(time.perf_counter() - started, job_type, step_name, "succeeded")
+        except JobInterrupted as e:
+            db.rollback()
+            job_step_duration.observe(time.perf_counter() - started, job_type, step_name, "interrupted")
+            logger.info(f"Job {job_id} interrupted during {step_name}: {e}")
+            # Hand the job back without using up an attempt
+            if not _finish(db, job_id, worker_id, {Job.status: "queued", Job.available_at: datetime.utcnow(),
+                                                   Job.attempts: Job.attempts - 1}):
+                return _lost(db, job_id, step_name)
+            step.status = "pending"
+            db.commit()
+            return "interrupted"
+        except Exception as e:
+            db.rollback()
+            job_step_duration.observe(time.perf_counter() - started, job_type, step_name, "failed")
+            logger.exception(f"Job {job_id} failed in step {step_name}")
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            if job.attempts >= job.max_attempts:
+                outcome = {Job.status: "failed", Job.finished_at: datetime.utcnow(), Job.active_dedupe_key: None}
+            else:
+                outcome = {Job.status: "queued", Job.available_at: datetime.utcnow() + _retry_delay(job.attempts)}
+            if not _finish(db, job_id, worker_id, {**outcome, Job.last_error: f"{step_name}: {error}"}):
+                return _lost(db, job_id, step_name)
+            step.status = "failed"
+            step.error = error
+            db.commit()
+            return outcome[Job.status]
+
+    if not _finish(db, job_id, worker_id, {Job.status: "succeeded", Job.finished_at: datetime.utcnow(),
+                                           Job.active_dedupe_key: None, Job.last_error: None}):
+        return _lost(db, job_id, "completion")
+    db.commit()
+    return "succeeded"
+
+
+class JobWorkerPool:
+    """
+    Threads that poll the jobs table and run claimed jobs in their own
+    sessions. Jobs survive restarts: an interrupted job is re-queued, and one
+    left by a crashed process is reclaimed once its lease expires.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._outcomes: Dict[str, int] = {}
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        # Taken at start, not import, so forked server workers get distinct lease owners
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"{prefix}:{i}",), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        """Lets idle workers poll immediately instead of waiting out the interval."""
+        self._wake.set()
+
+    def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT):
+        # One deadline for all workers, so shutdown takes at most timeout in total
+        self._stopping.set()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _run(self, worker_id: str):
+        while not self._stopping.is_set():
+            job_id = None
+            db = connection.SessionLocal()
+            try:
+                job_id = claim_job(db, worker_id)
+                if job_id:
+                    with self._lock:
+                        self._running += 1
+                    try:
+                        outcome = run_job(db, job_id, worker_id, self._stopping)
+                    finally:
+                        with self._lock:
+                            self._running -= 1
+                    with self._lock:
+                        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            except Exception:
+                logger.exception("Job worker error")
+            finally:
+                db.close()
+            if job_id is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "running": self._running,
+                "outcomes": dict(self._outcomes),
+            }
+
+
+job_worker_pool = JobWorkerPool(JOB_WORKERS, JOB_POLL_INTERVAL)
@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import smtplib
+import ssl
+import threading
+from email.message import EmailMessage
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Without SMTP_HOST messages are only logged (local development)
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes", "on")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+SMTP_FROM = os.getenv("SMTP_FROM", "EverAccess <no-reply@everaccess.com>")
+# Open SMTP connections kept by the pool; also the dispatcher's send concurrency
+SMTP_MAX_CONNECTIONS = int(os.getenv("SMTP_MAX_CONNECTIONS", "4"))
+
+
+def build_message(recipient: str, subject: str, body: str, sender: str = SMTP_FROM) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+class SMTPConnectionPool:
+    """
+    Reuses authenticated SMTP connections across sends. send() blocks, so
+    callers run it in a worker thread; they also bound concurrency, so at
+    most that many connections are ever open.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, timeout: float = SMTP_TIMEOUT, max_idle: int = SMTP_MAX_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.sent = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls(context=ssl.create_default_context())
+        if self.username:
+            connection.login(self.username, self.password or "")
+        with self._lock:
+            self.opened += 1
+        return connection
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, connection: smtplib.SMTP):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            self._quit(connection)
+
+    @staticmethod
+    def _quit(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def send(self, message: EmailMessage):
+        connection = self._acquire()
+        try:
+            connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle connection dropped by the server; retry once on a fresh one
+            connection.close()
+            connection = self._connect()
+            try:
+                connection.send_message(message)
+            except BaseException:
+                connection.close()
+                raise
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server answered; the connection itself is still usable
+            self._release(connection)
+            raise
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection)
+        with self._lock:
+            self.sent += 1
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def snapshot(self) -> dict:
+        return {"host": self.host, "port": self.port, "idle": self._idle.qsize(), "opened": self.opened, "sent": self.sent}
+
+
+class ConsoleMailer:
+    """Stand-in used when no SMTP server is configured."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, message: EmailMessage):
+        logger.info(f"EMAIL TO: {message['To']} SUBJECT: {message['Subject']}\n{message.get_content()}")
+        self.sent += 1
+
+    def close(self):
+        pass
+
+    def snapshot(self) -> dict:
+        return {"host": None, "sent": self.sent}
+
+
+def create_mailer():
+    if not SMTP_HOST:
+        return ConsoleMailer()
+    return SMTPConnectionPool(SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS)
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from ..database import connection
+from ..services import message_service
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_SCHEDULER_ENABLED = os.getenv("MESSAGE_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+MESSAGE_SCHEDULER_POLL_INTERVAL = float(os.getenv("MESSAGE_SCHEDULER_POLL_INTERVAL_SECONDS", "5"))
+
+
+class MessageScheduler:
+    """
+    Thread that delivers time-capsule messages as they fall due. Each round
+    is one message_service.deliver_due_messages transaction; rounds repeat
+    while full batches come back, then the thread sleeps until the next
+    poll or until a release wakes it. Any number of processes can run one.
+    """
+
+    def __init__(self, batch_size: int = message_service.MESSAGE_DELIVERY_BATCH_SIZE,
+                 poll_interval: float = MESSAGE_SCHEDULER_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.delivered = 0
+        self.rounds = 0
+        self.last_batch_seconds = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="message-scheduler", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 30):
+        # The batch in flight commits or rolls back as a whole
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def deliver_once(self) -> int:
+        start = time.perf_counter()
+        db = connection.SessionLocal()
+        try:
+            delivered = message_service.deliver_due_messages(db, self.batch_size)
+        finally:
+            db.close()
+        with self._lock:
+            self.delivered += delivered
+            self.rounds += 1
+            if delivered:
+                self.last_batch_seconds = time.perf_counter() - start
+        return delivered
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                delivered = self.deliver_once()
+            except Exception:
+                logger.exception("Message delivery failed")
+                delivered = 0
+            if delivered >= self.batch_size:
+                continue
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "delivered": self.delivered,
+                "rounds": self.rounds,
+                "last_batch_seconds": round(self.last_batch_seconds, 4),
+            }
+
+
+message_scheduler = MessageScheduler()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_release(session):
+    if session.info.pop(message_service.RELEASED_KEY, False):
+        message_scheduler.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_released(session):
+    session.info.pop(message_service.RELEASED_KEY, None)
@@ -0,0 +1,286 @@
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from .request_context import begin_request, end_request, route_template
+from .sql_profiler import SQL_DEBUG_HEADER_ENABLED, sql_profiler
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+_PENDING_KEY = "metrics_pending"
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    # Every sample carries the worker's pid: under serve.py --workers N each
+    # scrape is answered by one worker, so series must not mix processes
+    pairs = [f'pid="{os.getpid()}"'] + [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Fixed buckets; observations are counted per bucket and made cumulative when rendered."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            self._record(value, labels)
+
+    def _record(self, value: float, labels: tuple):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class LoopGauge(Gauge):
+    """Updated and rendered only on the event loop thread, so updates skip the lock."""
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class LoopHistogram(Histogram):
+    """Observed and rendered only on the event loop thread, so observations skip the lock."""
+
+    def observe(self, value: float, *labels):
+        self._record(value, labels)
+
+
+# A collector returns (name, type, help, [(labels dict, value)]) families read at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format. Metrics are
+    created once at import time; updating one is a dict lookup under a lock.
+    Collectors turn existing snapshot() dicts into samples when scraped.
+    Values are per process and labelled with its pid; sum over pid to get
+    totals across server workers.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), loop_only: bool = False) -> Gauge:
+        return self._register((LoopGauge if loop_only else Gauge)(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS, loop_only: bool = False) -> Histogram:
+        return self._register((LoopHistogram if loop_only else Histogram)(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        # Samples of one family must be contiguous even when several collectors report it
+        families: Dict[str, tuple] = {}
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                families.setdefault(name, (kind, documentation, []))[2].extend(samples)
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _metric_name(*parts: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", "_".join(parts)).lower()
+
+
+def snapshot_collector(component: str, snapshot: Callable[[], dict], labels: Optional[Dict[str, str]] = None) -> Collector:
+    """
+    Exposes the numeric leaves of a component's snapshot() as untyped
+    samples named everaccess_<component>_<key>; nested dicts extend the name.
+    """
+    def collect():
+        families = []
+
+        def walk(prefix, values):
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    walk(_metric_name(prefix, str(key)), value)
+                elif isinstance(value, (bool, int, float)):
+                    name = _metric_name(prefix, str(key))
+                    families.append((name, "untyped", f"{component} {key}", [(labels or {}, float(value))]))
+
+        walk(_metric_name("everaccess", component), snapshot())
+        return families
+    return collect
+
+
+# Per-request metrics. The middleware runs on the event loop and /metrics renders
+# there too, so these skip locking. The duration histogram's _count is the
+# request count by method, route and status.
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last body chunk.",
+    ("method", "route", "status"), loop_only=True)
+http_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled.", loop_only=True)
+http_db_queries = registry.histogram(
+    "http_request_db_queries", "Database statements executed per request.", ("route",), QUERY_COUNT_BUCKETS, loop_only=True)
+http_db_duration = registry.histogram(
+    "http_request_db_seconds", "Time spent executing database statements per request.", ("route",), DB_TIME_BUCKETS,
+    loop_only=True)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task or body wrapping):
+    tracks in-flight requests and observes latency and database work under
+    the route template Starlette stores in scope["route"].
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SQL_DEBUG_HEADER_ENABLED:
+                    message = {**message, "headers": [*message.get("headers", ()), sql_profiler.debug_header(stats)]}
+            await send(message)
+
+        stats, token = begin_request(scope)
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            end_request(token)
+            template = route_template(scope)
+            http_request_duration.observe(elapsed, scope["method"], template, status)
+            http_db_queries.observe(stats.queries, template)
+            http_db_duration.observe(stats.db_seconds, template)
+            if stats.repeated:
+                sql_profiler.report_repeated(stats, template, status)
+
+
+def count_after_commit(session: Session, counter: Counter, *labels, amount: float = 1):
+    """Increments counter once session commits; a rollback discards it."""
+    session.info.setdefault(_PENDING_KEY, []).append((counter, labels, amount))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_counts(session):
+    for counter, labels, amount in session.info.pop(_PENDING_KEY, ()):
+        counter.inc(*labels, amount=amount)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_counts(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+import anyio
+from sqlalchemy import and_, bindparam, event, or_, select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from ..database import connection
+from ..database.models.notification import Notification
+from .mailer import SMTP_MAX_CONNECTIONS, build_message, create_mailer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_DISPATCHER_ENABLED = os.getenv("NOTIFICATION_DISPATCHER_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "100"))
+NOTIFICATION_POLL_INTERVAL = float(os.getenv("NOTIFICATION_POLL_INTERVAL_SECONDS", "2"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "6"))
+NOTIFICATION_RETRY_BASE_SECONDS = float(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "30"))
+# A claimed batch not finished within this time is picked up again. The
+# dispatcher renews the lease while it is still sending, so this only bounds
+# how long a crashed dispatcher's rows wait, not how long a batch may take
+NOTIFICATION_CLAIM_SECONDS = int(os.getenv("NOTIFICATION_CLAIM_SECONDS", "300"))
+
+
+# Set on a session by notification_service.queue_notification
+QUEUED_KEY = "notifications_queued"
+
+
+def _claimable(now: datetime):
+    return and_(
+        Notification.delivery_status == "pending",
+        Notification.next_attempt_at <= now,
+        or_(Notification.claimed_until.is_(None), Notification.claimed_until < now),
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+class NotificationDispatcher:
+    """
+    Delivers the notification outbox. Each round claims a batch of pending
+    rows with a single UPDATE (a claim token plus lease, so several
+    processes can run dispatchers), sends them concurrently over the mailer's
+    pooled connections and writes the outcome back in bulk. The lease is
+    renewed while the batch is in flight, and every write is conditional on
+    the claim token, so rows re-claimed by another dispatcher are left alone.
+    """
+
+    def __init__(self, mailer=None, batch_size: int = NOTIFICATION_BATCH_SIZE, concurrency: int = SMTP_MAX_CONNECTIONS,
+                 poll_interval: float = NOTIFICATION_POLL_INTERVAL, max_attempts: int = NOTIFICATION_MAX_ATTEMPTS):
+        self.mailer = mailer or create_mailer()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_batch_seconds = 0.0
+
+    async def claim_batch(self) -> List[Notification]:
+        now = datetime.utcnow()
+        token = str(uuid.uuid4())
+        async with connection.AsyncSessionLocal() as db:
+            candidates = (await db.execute(
+                select(Notification.notification_id)
+                .where(_claimable(now))
+                .order_by(Notification.next_attempt_at)
+                .limit(self.batch_size)
+            )).scalars().all()
+            if not candidates:
+                return []
+            await db.execute(
+                update(Notification)
+                .where(Notification.notification_id.in_(candidates), _claimable(now))
+                .values(claim_token=token, claimed_until=now + timedelta(seconds=NOTIFICATION_CLAIM_SECONDS))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            result = await db.execute(select(Notification).where(Notification.claim_token == token))
+            return list(result.scalars().all())
+
+    async def _send(self, limiter: anyio.CapacityLimiter, notification: Notification) -> Optional[str]:
+        message = build_message(notification.recipient_email, notification.subject or "", notification.message or "")
+        try:
+            await anyio.to_thread.run_sync(self.mailer.send, message, limiter=limiter)
+            return None
+        except Exception as e:
+            logger.warning(f"Notification {notification.notification_id} to {notification.recipient_email} failed: {e}")
+            return f"{type(e).__name__}: {e}"
+
+    async def _renew_claim(self, token: str):
+        # Extends the lease at a third of its length until cancelled
+        while True:
+            await asyncio.sleep(NOTIFICATION_CLAIM_SECONDS / 3)
+            try:
+                async with connection.AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Notification)
+                        .where(Notification.claim_token == token)
+                        .values(claimed_until=datetime.utcnow() + timedelta(seconds=NOTIFICATION_CLAIM_SECONDS))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+            except Exception:
+                logger.exception("Notification claim renewal failed")
+
+    async def dispatch_once(self) -> int:
+        """Claims and delivers one batch. Returns the number of rows handled."""
+        batch = await self.claim_batch()
+        if not batch:
+            return 0
+        token = batch[0].claim_token
+        start = time.perf_counter()
+        limiter = anyio.CapacityLimiter(self.concurrency)
+        renewal = asyncio.create_task(self._renew_claim(token))
+        try:
+            errors = await asyncio.gather(*(self._send(limiter, n) for n in batch))
+        finally:
+            renewal.cancel()
+            try:
+                await renewal
+            except asyncio.CancelledError:
+                pass
+
+        now = datetime.utcnow()
+        sent_ids = [n.notification_id for n, error in zip(batch, errors) if error is None]
+        failures = []
+        for notification, error in zip(batch, errors):
+            if error is None:
+                continue
+            attempts = (notification.attempts or 0) + 1
+            exhausted = attempts >= self.max_attempts
+            failures.append({
+                "b_notification_id": notification.notification_id,
+                "b_claim_token": token,
+                "attempts": attempts,
+                "last_error": error[:2000],
+                "delivery_status": "failed" if exhausted else "pending",
+                "next_attempt_at": notification.next_attempt_at if exhausted else now + retry_delay(attempts),
+            })
+
+        async with connection.AsyncSessionLocal() as db:
+            if sent_ids:
+                await db.execute(
+                    update(Notification)
+                    .where(Notification.notification_id.in_(sent_ids), Notification.claim_token == token)
+                    .values(delivery_status="sent", sent_at=now, attempts=Notification.attempts + 1,
+                            last_error=None, claim_token=None, claimed_until=None)
+                    .execution_options(synchronize_session=False)
+                )
+            if failures:
+                # One executemany, each row guarded by its claim token
+                await db.execute(
+                    update(Notification.__table__)
+                    .where(Notification.notification_id == bindparam("b_notification_id"),
+                           Notification.claim_token == bindparam("b_claim_token"))
+                    .values(claim_token=None, claimed_until=None),
+                    failures,
+                )
+            await db.commit()
+
+        self.sent += len(sent_ids)
+        self.failed += sum(1 for f in failures if f["delivery_status"] == "failed")
+        self.retried += sum(1 for f in failures if f["delivery_status"] == "pending")
+        self.last_batch_seconds = time.perf_counter() - start
+        return len(batch)
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                handled = await self.dispatch_once()
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                handled = 0
+            if handled >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._stopping = asyncio.Event()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    def wake(self):
+        """
+        Delivers newly committed notifications without waiting for the next
+        poll. Safe to call from worker threads.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self):
+        # Lets the batch in flight finish; unsent claimed rows are re-claimed after their lease
+        if self._task is not None:
+            self._stopping.set()
+            self._wake.set()
+            await self._task
+            self._task = None
+            self._loop = None
+        await anyio.to_thread.run_sync(self.mailer.close)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_batch_seconds": round(self.last_batch_seconds, 4),
+            "mailer": self.mailer.snapshot(),
+        }
+
+
+notification_dispatcher = NotificationDispatcher()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session):
+    if session.info.pop(QUEUED_KEY, False):
+        notification_dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_queued(session):
+    session.info.pop(QUEUED_KEY, None)
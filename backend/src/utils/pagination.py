@@ -0,0 +1,74 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, literal, or_
+
+# Response header carrying the cursor for the next page of a list endpoint.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(sort_value: datetime, key: str) -> str:
+    payload = json.dumps([sort_value.isoformat(), key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(key)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def keyset_paginate(query, sort_column, key_column, limit: int, cursor: Optional[str] = None, skip: int = 0):
+    """
+    Orders a Query or Select by (sort_column, key_column) and positions it
+    after the cursor. Without a cursor the legacy offset is applied instead.
+    One extra row is fetched so page_from_rows can tell if more remain.
+    """
+    query = query.order_by(sort_column, key_column)
+    if cursor:
+        sort_value, key = decode_cursor(cursor)
+        # Bound as 'YYYY-MM-DD HH:MM:SS' text: MySQL casts it for the index
+        # range scan, and SQLite (which compares DATETIME as text) matches the
+        # server_default format instead of a microsecond-padded one.
+        boundary = literal(sort_value.isoformat(sep=" "))
+        query = query.filter(or_(
+            sort_column > boundary,
+            and_(sort_column == boundary, key_column > key),
+        ))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def page_items(response, page: Page) -> List[Any]:
+    """Sets the next-cursor header on the route's response and returns the items."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+def page_from_rows(rows, sort_column, key_column, limit: int) -> Page:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return Page(items=rows)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(getattr(last, sort_column.key), getattr(last, key_column.key)),
+    )
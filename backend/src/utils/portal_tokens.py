@@ -0,0 +1,102 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from jose import JWTError, jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from ..database.models.beneficiary import Beneficiary
+from ..services import beneficiary_service
+from .cache import TTLCache
+from .security import ALGORITHM, SECRET_KEY
+
+load_dotenv()
+
+PORTAL_TOKEN_CACHE_ENABLED = os.getenv("PORTAL_TOKEN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+PORTAL_TOKEN_CACHE_SIZE = int(os.getenv("PORTAL_TOKEN_CACHE_SIZE", "10000"))
+# Upper bound on how long another process can keep honouring a rotated token
+PORTAL_TOKEN_CACHE_TTL = float(os.getenv("PORTAL_TOKEN_CACHE_TTL", "60"))
+# Lifetime of the stateless session token issued by /beneficiary-portal/auth.
+# It is never checked against the database, so keep it short.
+PORTAL_SESSION_MINUTES = int(os.getenv("PORTAL_SESSION_MINUTES", "15"))
+PORTAL_SESSION_TYPE = "portal"
+
+
+@dataclass(frozen=True)
+class PortalGrant:
+    beneficiary_id: str
+    expires_at: datetime
+
+
+# Access token hash -> PortalGrant for tokens verified against the database
+portal_token_cache = TTLCache(PORTAL_TOKEN_CACHE_SIZE, PORTAL_TOKEN_CACHE_TTL, enabled=PORTAL_TOKEN_CACHE_ENABLED)
+
+_PENDING_KEY = "portal_token_cache_invalidate"
+
+
+def get_portal_grant(db: Session, raw_token: str) -> Optional[PortalGrant]:
+    """
+    Resolves a beneficiary access token, hitting the database only on a cache
+    miss. Entries never outlive the token's token_expires_at.
+    """
+    token_hash = beneficiary_service.hash_access_token(raw_token)
+    now = datetime.utcnow()
+    grant = portal_token_cache.get(token_hash)
+    if grant is None:
+        beneficiary = beneficiary_service.verify_access_token(db, raw_token)
+        if beneficiary is None:
+            return None
+        grant = PortalGrant(beneficiary.beneficiary_id, beneficiary.token_expires_at)
+        ttl = min(PORTAL_TOKEN_CACHE_TTL, (grant.expires_at - now).total_seconds())
+        portal_token_cache.set(token_hash, grant, ttl=ttl)
+    elif grant.expires_at <= now:
+        portal_token_cache.invalidate(token_hash)
+        return None
+    return grant
+
+
+def create_portal_session_token(grant: PortalGrant) -> str:
+    expire = min(datetime.utcnow() + timedelta(minutes=PORTAL_SESSION_MINUTES), grant.expires_at)
+    return jwt.encode({"sub": grant.beneficiary_id, "typ": PORTAL_SESSION_TYPE, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_portal_session_token(token: str) -> Optional[PortalGrant]:
+    """Checks a portal session token by signature and expiry alone."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("typ") != PORTAL_SESSION_TYPE or not payload.get("sub"):
+        return None
+    return PortalGrant(payload["sub"], datetime.utcfromtimestamp(payload["exp"]))
+
+
+def _token_hashes_for(target: Beneficiary):
+    # Include the previous hash when the token is being rotated in this flush
+    history = inspect(target).attrs.access_token_hash.history
+    return {token_hash for token_hash in (*history.added, *history.unchanged, *history.deleted) if token_hash}
+
+
+@event.listens_for(Beneficiary, "after_update")
+@event.listens_for(Beneficiary, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    # Covers token rotation, expiry changes and revocation (status updates)
+    session = inspect(target).session
+    for token_hash in _token_hashes_for(target):
+        portal_token_cache.invalidate(token_hash)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(token_hash)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Evict again once the change is visible, in case a concurrent request
+    # re-cached the old row between flush and commit.
+    for token_hash in session.info.pop(_PENDING_KEY, ()):
+        portal_token_cache.invalidate(token_hash)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
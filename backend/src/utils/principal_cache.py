@@ -0,0 +1,76 @@
+import os
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from dotenv import load_dotenv
+from ..database.models.user import User
+from ..services import user_service
+from .cache import TTLCache
+
+load_dotenv()
+
+PRINCIPAL_CACHE_ENABLED = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# Authenticated users keyed by token subject (email). Entries are detached
+# snapshots of the users row; each request merges one into its own session.
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, enabled=PRINCIPAL_CACHE_ENABLED)
+
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+def _snapshot(user: User) -> User:
+    columns = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    copy = User(**columns)
+    make_transient_to_detached(copy)
+    return copy
+
+
+def get_principal(db: Session, email: str):
+    cached = principal_cache.get(email)
+    if cached is not None:
+        return db.merge(cached, load=False)
+    user = user_service.get_user_by_email(db, email=email)
+    if user is not None:
+        principal_cache.set(email, _snapshot(user))
+    return user
+
+
+async def get_principal_async(db: AsyncSession, email: str):
+    cached = principal_cache.get(email)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    user = await user_service.get_user_by_email_async(db, email=email)
+    if user is not None:
+        principal_cache.set(email, _snapshot(user))
+    return user
+
+
+def _emails_for(target: User):
+    # Include the previous email when it is being changed in this flush
+    history = inspect(target).attrs.email.history
+    return {email for email in (*history.added, *history.unchanged, *history.deleted) if email}
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    session = inspect(target).session
+    for email in _emails_for(target):
+        principal_cache.invalidate(email)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(email)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Evict again once the change is visible, in case a concurrent request
+    # re-cached the old row between flush and commit.
+    for email in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+import anyio
+from sqlalchemy import text
+from dotenv import load_dotenv
+from ..database import connection, schema
+from ..database.pool import warm_async_pool, warm_pool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "check": serve once the stored revision equals the shipped head (migrations run by start.sh or a deploy job)
+# "upgrade": apply pending migrations at startup first (single instance, local development)
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "check").lower()
+DB_CONNECT_RETRY_BASE_SECONDS = float(os.getenv("DB_CONNECT_RETRY_BASE_SECONDS", "0.5"))
+DB_CONNECT_RETRY_MAX_SECONDS = float(os.getenv("DB_CONNECT_RETRY_MAX_SECONDS", "15"))
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process was started (Linux); None where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return round(age, 3)
+
+
+class Readiness:
+    """
+    Brings the process to ready in the background so startup never blocks
+    the event loop: waits for the database with exponential backoff, checks
+    (or upgrades) the schema revision, warms both pools, then runs the
+    on_ready callback. Each step is retried until it succeeds or the app
+    shuts down; /ready reports 503 until then.
+    """
+
+    def __init__(self, schema_mode: str, retry_base: float, retry_max: float):
+        self.schema_mode = schema_mode
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+        self.database = False
+        self.schema: Optional[dict] = None
+        self.pools_warm = False
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        # Cold start: process age when the app module was imported, startup began and readiness was reached
+        self.timings = {"imported_at_process_age": process_age()}
+
+    def start(self, on_ready: Callable[[], None]):
+        if self._task is None:
+            self._started = time.perf_counter()
+            self.timings["startup_began_at_process_age"] = process_age()
+            self._task = asyncio.create_task(self._run(on_ready))
+
+    async def stop(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _mark(self, step: str):
+        self.timings[f"{step}_seconds"] = round(time.perf_counter() - self._started, 3)
+
+    async def _retry(self, step: str, attempt: Callable):
+        # Runs attempt until it returns a truthy value, backing off between tries
+        delay = self.retry_base
+        while True:
+            self.attempts += 1
+            try:
+                result = await attempt()
+                if result:
+                    self.last_error = None
+                    self._mark(step)
+                    return result
+            except Exception as e:
+                self.last_error = f"{step}: {type(e).__name__}: {e}"
+                logger.warning(f"Startup step {step} failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+
+    async def _ping(self):
+        async with connection.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        self.database = True
+        return True
+
+    async def _check_schema(self):
+        if self.schema_mode == "upgrade":
+            await anyio.to_thread.run_sync(schema.upgrade_to_head)
+        self.schema = await anyio.to_thread.run_sync(schema.schema_status, connection.engine)
+        if not self.schema["up_to_date"]:
+            error = (
+                f"schema: database is at {self.schema['current'] or 'no revision'}, "
+                f"this build expects {self.schema['expected']}; run `alembic upgrade head`"
+            )
+            if error != self.last_error:
+                logger.error(error)
+            self.last_error = error
+        return self.schema["up_to_date"]
+
+    async def _warm(self):
+        warmed = await anyio.to_thread.run_sync(warm_pool, connection.engine)
+        warmed_async = await warm_async_pool(connection.async_engine)
+        logger.info(f"Connection pools warmed: sync={warmed} async={warmed_async}")
+        self.pools_warm = True
+        return True
+
+    async def _run(self, on_ready: Callable[[], None]):
+        await self._retry("database", self._ping)
+        await self._retry("schema", self._check_schema)
+        await self._retry("warmup", self._warm)
+        try:
+            on_ready()
+        except Exception:
+            logger.exception("Could not start background workers")
+        self.ready = True
+        self._mark("ready")
+        self.timings["ready_at_process_age"] = process_age()
+        logger.info(f"Ready: {self.timings}")
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "database": self.database,
+            "schema_mode": self.schema_mode,
+            "schema": self.schema,
+            "pools_warm": self.pools_warm,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "timings": dict(self.timings),
+        }
+
+
+readiness = Readiness(DB_SCHEMA_MODE, DB_CONNECT_RETRY_BASE_SECONDS, DB_CONNECT_RETRY_MAX_SECONDS)
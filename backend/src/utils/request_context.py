@@ -0,0 +1,67 @@
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional, Tuple
+
+# Route label for requests that matched no route (404s, scanners); keeps label values bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """
+    Database work of the current request. Shared by reference with the
+    threadpool workers and async greenlets that run the request's queries.
+    statements maps normalized SQL to [executions, seconds, origin]; repeated
+    lists the shapes that reached the N+1 threshold.
+    """
+
+    __slots__ = ("scope", "queries", "db_seconds", "statements", "repeated")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Dict[str, list] = {}
+        self.repeated: List[str] = []
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+# id(route) -> (prefix, full template); routes live as long as the app
+_route_templates: Dict[int, Tuple[str, str]] = {}
+
+
+def begin_request(scope) -> Tuple[RequestStats, Token]:
+    stats = RequestStats(scope)
+    return stats, _request_stats.set(stats)
+
+
+def end_request(token: Token):
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route, e.g. /assets/{asset_id}/files/.
+    Routes of a router included with a prefix only carry their own path, so
+    the prefix is recovered once per route from the request path minus the
+    filled-in route path.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    cached = _route_templates.get(id(route))
+    if cached is not None and path.startswith(cached[0]):
+        return cached[1]
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    try:
+        filled = template.format_map(scope.get("path_params", {}))
+    except (KeyError, ValueError, IndexError):
+        return template
+    prefix = path[:-len(filled)] if filled and path.endswith(filled) else ""
+    _route_templates[id(route)] = (prefix, prefix + template)
+    return prefix + template
@@ -1,4 +1,8 @@
+import asyncio
 import bcrypt
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
@@ -12,6 +16,14 @@ SECRET_KEY = os.getenv("SECRET_KEY", "a_super_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt releases the GIL while hashing, so a dedicated thread pool gives
+# real parallelism without tying up the request threadpool. The cores are
+# shared by all server workers (WEB_CONCURRENCY).
+_WEB_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // _WEB_WORKERS))))
+# Operations allowed to wait for a worker before new ones are rejected.
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "64"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -26,6 +38,82 @@ def get_password_hash(password: str) -> str:
     hashed_password = bcrypt.hashpw(pwd_bytes, salt)
     return hashed_password.decode('utf-8')
 
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashPool:
+    """Bounded executor for bcrypt with admission control and timing metrics."""
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._stats = {}
+
+    def _record(self, operation: str, queue_wait: float, latency: float):
+        with self._lock:
+            stats = self._stats.setdefault(operation, {
+                "count": 0,
+                "latency_seconds_total": 0.0,
+                "latency_seconds_max": 0.0,
+                "queue_wait_seconds_total": 0.0,
+                "queue_wait_seconds_max": 0.0,
+            })
+            stats["count"] += 1
+            stats["latency_seconds_total"] += latency
+            stats["latency_seconds_max"] = max(stats["latency_seconds_max"], latency)
+            stats["queue_wait_seconds_total"] += queue_wait
+            stats["queue_wait_seconds_max"] = max(stats["queue_wait_seconds_max"], queue_wait)
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, operation: str, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy(f"Password hashing queue is full ({self.queue_depth})")
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(operation, started - submitted, time.perf_counter() - started)
+
+        future = self._executor.submit(task)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+                "operations": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_DEPTH)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run("hash", get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
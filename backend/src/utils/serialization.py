@@ -0,0 +1,109 @@
+import os
+import typing
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, List, Optional, Protocol, Type
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Naive datetimes are stored as UTC; aware ones render with Z like Pydantic
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+# Validate read-only list responses against their schema instead of mapping rows directly (development aid)
+VALIDATE_LIST_RESPONSES = os.getenv("VALIDATE_LIST_RESPONSES", "false").lower() in ("1", "true", "yes", "on")
+
+
+def _default(value: Any):
+    # Types orjson leaves out, rendered the way Pydantic's JSON mode does
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Installed as the app's default
+    response class through fastapi.datastructures.Default, which keeps
+    FastAPI's own Pydantic dump_json path for routes with a response_model
+    and uses this for routes returning plain dicts and lists.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ListSerializer(Protocol):
+    def dump_json(self, rows: Iterable[Any]) -> bytes: ...
+
+
+class ModelListAdapter:
+    """Precompiled TypeAdapter for a list response: validates ORM rows, then dumps them in Rust."""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.adapter = TypeAdapter(List[model])
+
+    def dump_json(self, rows: Iterable[Any]) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(list(rows), from_attributes=True))
+
+
+def _nested_model(annotation) -> tuple:
+    # (model, is_list) for BaseModel, List[BaseModel] and their Optional forms
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, List):
+        model, _ = _nested_model(typing.get_args(annotation)[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+class RowSerializer:
+    """
+    Maps ORM rows straight to plain dicts with the keys of a response
+    schema and renders them with orjson, skipping Pydantic validation.
+    Only for read-only endpoints whose schema fields are plain attributes
+    of the row: values are emitted as loaded, without coercion or checks.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields = []
+        for name, field in model.model_fields.items():
+            nested, is_list = _nested_model(field.annotation)
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            self.fields.append((name, field.serialization_alias or field.alias or name, default,
+                                RowSerializer(nested) if nested else None, is_list))
+
+    def to_dict(self, row: Any) -> Optional[dict]:
+        if row is None:
+            return None
+        data = {}
+        for name, key, default, nested, is_list in self.fields:
+            value = getattr(row, name, default)
+            if nested is not None and value is not None:
+                value = [nested.to_dict(item) for item in value] if is_list else nested.to_dict(value)
+            data[key] = value
+        return data
+
+    def dump_json(self, rows: Iterable[Any]) -> bytes:
+        return dumps([self.to_dict(row) for row in rows])
+
+
+def list_serializer(model: Type[BaseModel]) -> ListSerializer:
+    return ModelListAdapter(model) if VALIDATE_LIST_RESPONSES else RowSerializer(model)
@@ -0,0 +1,204 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+import greenlet
+from dotenv import load_dotenv
+from .request_context import RequestStats, current_request_stats, route_template
+from .serialization import dumps
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Group each request's statements by normalized SQL and flag repeated shapes
+SQL_PROFILING_ENABLED = os.getenv("SQL_PROFILING_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+# Statements slower than this are logged with their route and caller; 0 disables
+SQL_SLOW_QUERY_SECONDS = float(os.getenv("SQL_SLOW_QUERY_SECONDS", "0.5"))
+# Executions of one statement shape in one request reported as a probable N+1; 0 disables
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+# Adds X-SQL-Stats to every response (development aid; reveals query counts)
+SQL_DEBUG_HEADER_ENABLED = os.getenv("SQL_DEBUG_HEADER_ENABLED", "false").lower() in ("1", "true", "yes", "on")
+SQL_STATS_HEADER = "X-SQL-Stats"
+SQL_SHAPE_CACHE_SIZE = 4096
+# Longest statement text written to the slow query log
+SQL_LOG_STATEMENT_CHARS = 2000
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_DATABASE_DIR = os.path.join(_SRC_DIR, "database") + os.sep
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<!:):\w+")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUE_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+# Statement text -> shape; compiled statements are cached by SQLAlchemy, so few distinct strings arrive
+_shapes: Dict[str, str] = {}
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: literals and placeholders become ?, IN lists and VALUES rows collapse to (?)."""
+    shape = _shapes.get(statement)
+    if shape is None:
+        shape = _STRING.sub("?", statement)
+        shape = _NUMBER.sub("?", shape)
+        shape = _PLACEHOLDER.sub("?", shape)
+        shape = _VALUE_LIST.sub("(?)", shape)
+        shape = _VALUE_ROWS.sub("(?)", shape)
+        shape = _SPACE.sub(" ", shape).strip()
+        if len(_shapes) >= SQL_SHAPE_CACHE_SIZE:
+            _shapes.clear()
+        _shapes[statement] = shape
+    return shape
+
+
+def _app_frame(frame) -> Optional[str]:
+    # Innermost application frame outside the database package: the service
+    # function (or route) that issued the statement
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SRC_DIR) and not filename.startswith(_DATABASE_DIR) and filename != __file__:
+            return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_qualname}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def _origin() -> Optional[str]:
+    origin = _app_frame(sys._getframe(2))
+    if origin is None:
+        # Async sessions run statements in a child greenlet; the awaiting caller is on its parent's stack
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            origin = _app_frame(parent.gr_frame)
+    return origin
+
+
+def _endpoint(scope) -> Optional[str]:
+    endpoint = scope.get("endpoint")
+    return f"{endpoint.__module__}.{endpoint.__qualname__}" if endpoint is not None else None
+
+
+class SQLProfiler:
+    """
+    Times every statement run on an instrumented engine and attributes it to
+    the current request (opened by metrics.MetricsMiddleware). Statements are
+    grouped by shape per request; a shape executed n_plus_one_threshold times
+    is reported once the request ends, and slow statements are logged as
+    they finish, from requests and background workers alike. Log lines are
+    JSON objects; statement parameters are never logged.
+    """
+
+    def __init__(self, enabled: bool, slow_query_seconds: float, n_plus_one_threshold: int):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+        self.slowest_seconds = 0.0
+        self.repeated_statements = 0
+        self.flagged_requests = 0
+
+    def instrument_engine(self, engine):
+        """
+        Hooks engine (sync, or an async engine's sync_engine). Wraps the
+        dialect's execute methods instead of listening for cursor events:
+        any engine listener moves every statement onto SQLAlchemy's event
+        dispatch path, which costs about 10us per statement against 1us
+        for the wrapper.
+        """
+        dialect = engine.dialect
+        if getattr(dialect, "_sql_profiler_instrumented", False):
+            return
+        for name in ("do_execute", "do_executemany", "do_execute_no_params"):
+            setattr(dialect, name, self._timed(getattr(dialect, name)))
+        dialect._sql_profiler_instrumented = True
+
+    def _timed(self, execute):
+        def timed_execute(cursor, statement, *args):
+            start = time.perf_counter()
+            try:
+                return execute(cursor, statement, *args)
+            finally:
+                self._record(statement, time.perf_counter() - start)
+        return timed_execute
+
+    def _record(self, statement: str, elapsed: float):
+        stats = current_request_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if self.enabled:
+                shape = normalize(statement)
+                entry = stats.statements.get(shape)
+                if entry is None:
+                    entry = stats.statements[shape] = [0, 0.0, None]
+                entry[0] += 1
+                entry[1] += elapsed
+                if entry[0] == self.n_plus_one_threshold:
+                    entry[2] = _origin() or _endpoint(stats.scope)
+                    stats.repeated.append(shape)
+        if self.slow_query_seconds and elapsed >= self.slow_query_seconds:
+            self._log_slow(statement, elapsed, stats)
+
+    def _log_slow(self, statement: str, elapsed: float, stats: Optional[RequestStats]):
+        with self._lock:
+            self.slow_queries += 1
+            self.slowest_seconds = max(self.slowest_seconds, elapsed)
+        record = {
+            "event": "slow_query",
+            "seconds": round(elapsed, 4),
+            "statement": statement[:SQL_LOG_STATEMENT_CHARS],
+            "origin": _origin() or (_endpoint(stats.scope) if stats is not None else None),
+        }
+        if stats is not None:
+            record.update(method=stats.scope["method"], route=route_template(stats.scope), request_queries=stats.queries)
+        else:
+            record["thread"] = threading.current_thread().name
+        logger.warning(dumps(record).decode())
+
+    def report_repeated(self, stats: RequestStats, route: str, status: int):
+        """Logs each statement shape the finished request repeated past the threshold."""
+        with self._lock:
+            self.flagged_requests += 1
+            self.repeated_statements += len(stats.repeated)
+        for shape in stats.repeated:
+            executions, seconds, origin = stats.statements[shape]
+            logger.warning(dumps({
+                "event": "probable_n_plus_one",
+                "method": stats.scope["method"],
+                "route": route,
+                "status": status,
+                "statement": shape[:SQL_LOG_STATEMENT_CHARS],
+                "executions": executions,
+                "seconds": round(seconds, 4),
+                "origin": origin,
+                "request_queries": stats.queries,
+            }).decode())
+
+    def debug_header(self, stats: RequestStats) -> tuple:
+        value = f"queries={stats.queries}; db_ms={stats.db_seconds * 1000:.1f}"
+        if self.enabled:
+            value += f"; distinct={len(stats.statements)}; repeated={len(stats.repeated)}"
+        return (SQL_STATS_HEADER.lower().encode("latin-1"), value.encode("latin-1"))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slow_query_seconds": self.slow_query_seconds,
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "debug_header": SQL_DEBUG_HEADER_ENABLED,
+                "slow_queries": self.slow_queries,
+                "slowest_seconds": round(self.slowest_seconds, 4),
+                "flagged_requests": self.flagged_requests,
+                "repeated_statements": self.repeated_statements,
+                "shape_cache_size": len(_shapes),
+            }
+
+
+sql_profiler = SQLProfiler(SQL_PROFILING_ENABLED, SQL_SLOW_QUERY_SECONDS, SQL_N_PLUS_ONE_THRESHOLD)
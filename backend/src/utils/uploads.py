@@ -0,0 +1,164 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+import anyio
+from fastapi import Request
+from python_multipart.multipart import MultipartParseError, MultipartParser, MultipartState, parse_options_header
+from dotenv import load_dotenv
+
+load_dotenv()
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("ASSET_UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+# Room for boundaries, part headers and small form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class InvalidUpload(Exception):
+    """The request body is not a multipart form carrying the expected file field."""
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class _FilePart:
+    """multipart parser callbacks that keep the data of one file field and discard everything else."""
+
+    def __init__(self, field: str, max_bytes: int):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.found = False
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self.pending: List[bytes] = []
+        self.pending_bytes = 0
+        self._in_file = False
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # First part of the expected field that is a file; later ones are ignored
+        self._in_file = not self.found and name == self.field and b"filename" in options
+        if self._in_file:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = self._headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.size += end - start
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(self.max_bytes)
+            self.pending.append(data[start:end])
+            self.pending_bytes += end - start
+
+    def on_part_end(self):
+        self._in_file = False
+
+    def take(self) -> bytes:
+        chunk = b"".join(self.pending)
+        self.pending = []
+        self.pending_bytes = 0
+        return chunk
+
+
+async def stream_upload_to_disk(request: Request, path: str, field: str = "file",
+                                max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """
+    Streams the file field of a multipart/form-data request body straight
+    to disk, computing the size and SHA-256 digest as it goes. The body is
+    parsed as it arrives, so nothing is spooled to a temporary file first
+    and memory use is bounded by the chunk size; file writes and hashing
+    run in worker threads. Raises UploadTooLarge before reading anything
+    when Content-Length already exceeds the limit, or as soon as the file
+    passes max_bytes, and InvalidUpload for anything but a multipart body
+    with that field. The partial file is removed on any error.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLarge(max_bytes)
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+        raise InvalidUpload("Expected a multipart/form-data body")
+
+    part = _FilePart(field, max_bytes)
+    parser = MultipartParser(options[b"boundary"], part.callbacks())
+    digest = hashlib.sha256()
+
+    def write_chunk(out, chunk: bytes):
+        out.write(chunk)
+        digest.update(chunk)
+
+    out = await anyio.to_thread.run_sync(open, path, "wb")
+    try:
+        async for data in request.stream():
+            try:
+                parser.write(data)
+            except MultipartParseError as e:
+                raise InvalidUpload(f"Malformed multipart body: {e}")
+            if part.pending_bytes >= UPLOAD_CHUNK_SIZE:
+                await anyio.to_thread.run_sync(write_chunk, out, part.take())
+        parser.finalize()
+        if parser.state != MultipartState.END:
+            raise InvalidUpload("Incomplete multipart body")
+        if not part.found:
+            raise InvalidUpload(f"Missing file field '{field}'")
+        if part.pending:
+            await anyio.to_thread.run_sync(write_chunk, out, part.take())
+    except BaseException:
+        await anyio.to_thread.run_sync(out.close)
+        await anyio.to_thread.run_sync(_remove_quietly, path)
+        raise
+    await anyio.to_thread.run_sync(out.close)
+    return StoredUpload(path=path, size=part.size, sha256=digest.hexdigest(),
+                        filename=part.filename, content_type=part.content_type)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
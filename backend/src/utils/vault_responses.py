@@ -0,0 +1,66 @@
+import hashlib
+import os
+from typing import Callable
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from ..services import vault_service
+from .cache import TTLCache
+from .file_responses import etag_matches
+from .pagination import NEXT_CURSOR_HEADER, Page
+from .serialization import ListSerializer
+
+load_dotenv()
+
+VAULT_RESPONSE_CACHE_ENABLED = os.getenv("VAULT_RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+VAULT_RESPONSE_CACHE_SIZE = int(os.getenv("VAULT_RESPONSE_CACHE_SIZE", "2000"))
+VAULT_RESPONSE_CACHE_TTL = float(os.getenv("VAULT_RESPONSE_CACHE_TTL", "300"))
+# Private to the user; clients keep the body and revalidate it with If-None-Match
+VAULT_LIST_CACHE_CONTROL = "private, no-cache"
+
+# Serialized list pages keyed by (user, vault version, path, query). A write
+# bumps the version, so entries are never stale, only unreachable; they age
+# out through the TTL and LRU eviction.
+vault_response_cache = TTLCache(VAULT_RESPONSE_CACHE_SIZE, VAULT_RESPONSE_CACHE_TTL, enabled=VAULT_RESPONSE_CACHE_ENABLED)
+
+
+def _query_key(request: Request) -> str:
+    return urlencode(sorted(request.query_params.multi_items()))
+
+
+def list_etag(user_id: str, version: int, request: Request) -> str:
+    # Weak: equal versions mean equal content, not byte-identical serialization
+    scope = f"{user_id}\n{request.url.path}\n{_query_key(request)}"
+    return f'W/"{version}-{hashlib.sha256(scope.encode()).hexdigest()[:16]}"'
+
+
+def versioned_list_response(request: Request, db: Session, user_id: str, serializer: ListSerializer,
+                            load_page: Callable[[], Page]) -> Response:
+    """
+    Serves one page of a user's vault list tagged with the user's vault
+    version. A matching If-None-Match is answered with 304 after reading
+    only the users row; otherwise the serialized page comes from the
+    response cache or from load_page.
+    """
+    # Read before the page: MySQL (REPEATABLE READ) and SQLite serve both
+    # from the same snapshot, so a page is never tagged with a newer version
+    version = vault_service.get_version(db, user_id) or 0
+    etag = list_etag(user_id, version, request)
+    headers = {"etag": etag, "cache-control": VAULT_LIST_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (user_id, version, request.url.path, _query_key(request))
+    cached = vault_response_cache.get(key)
+    if cached is None:
+        page = load_page()
+        body = serializer.dump_json(page.items)
+        cached = (body, page.next_cursor)
+        vault_response_cache.set(key, cached)
+    body, next_cursor = cached
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
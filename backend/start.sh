@@ -1,8 +1,18 @@
 #!/bin/bash
 set -e
 
-echo "Seeding database..."
-python seed.py
+# Set RUN_MIGRATIONS=false when a deploy job applies migrations before rollout
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    echo "Applying database migrations..."
+    alembic upgrade head
+fi
 
+# Demo data only on request; seeding is skipped when it is already present
+if [ "${SEED_DEMO_DATA:-false}" = "true" ]; then
+    echo "Seeding demo data..."
+    python seed.py
+fi
+
+# One worker process per available CPU unless WEB_CONCURRENCY is set
 echo "Starting server..."
-exec uvicorn src.main:app --host 0.0.0.0 --port 8000
+exec python serve.py --host 0.0.0.0 --port 8000
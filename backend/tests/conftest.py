@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Settings are read at import, so point the app at a throwaway SQLite database first
+_tmp = tempfile.mkdtemp(prefix="everaccess-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["DB_SCHEMA_MODE"] = "upgrade"
+os.environ["NOTIFICATION_DISPATCHER_ENABLED"] = "false"
+os.environ["MESSAGE_SCHEDULER_ENABLED"] = "false"
+os.environ["JOB_WORKERS"] = "0"
+os.environ["SQL_DEBUG_HEADER_ENABLED"] = "true"
+os.environ["ACCESS_LOG_SPILL_PATH"] = os.path.join(_tmp, "access_log_spill.jsonl")
+os.environ["ASSET_BLOB_DIR"] = os.path.join(_tmp, "blobs")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 60
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline, client.get("/ready").json()
+            time.sleep(0.05)
+        yield client
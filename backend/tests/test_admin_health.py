@@ -0,0 +1,36 @@
+import uuid
+
+from src.database import connection
+from src.database.models import AdminUser
+
+
+def register(client):
+    email = f"user-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post(
+        "/auth/register",
+        json={"email": email, "password": "password", "first_name": "Health", "last_name": "Check"},
+    )
+    assert response.status_code == 200, response.text
+    return email, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_component_health_requires_an_admin(client):
+    assert client.get("/admin/health").status_code == 401
+    _, headers = register(client)
+    assert client.get("/admin/health", headers=headers).status_code == 403
+    assert client.get("/health/db-pool").status_code == 404
+
+
+def test_component_health_for_admin(client):
+    email, headers = register(client)
+    db = connection.SessionLocal()
+    try:
+        db.add(AdminUser(email=email, password_hash="x", role="support", status="active"))
+        db.commit()
+    finally:
+        db.close()
+    response = client.get("/admin/health", headers=headers)
+    assert response.status_code == 200
+    status = response.json()
+    assert set(status["db_pool"]) == {"sync", "async"}
+    assert {"access_log", "jobs", "notifications", "principal_cache", "sql"} <= set(status)
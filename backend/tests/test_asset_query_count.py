@@ -0,0 +1,64 @@
+import uuid
+
+from src.database import connection
+from src.database.models import AccessRule, Asset, AssetFile, Beneficiary
+from src.utils.sql_profiler import SQL_STATS_HEADER
+
+ASSET_COUNTS = (1, 10, 100)
+
+
+def register(client):
+    email = f"owner-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post(
+        "/auth/register",
+        json={"email": email, "password": "password", "first_name": "Query", "last_name": "Count"},
+    )
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = client.get("/users/me", headers=headers).json()["user_id"]
+    return user_id, headers
+
+
+def seed_assets(user_id, count):
+    db = connection.SessionLocal()
+    try:
+        beneficiaries = [
+            Beneficiary(user_id=user_id, email=f"heir{i}@example.com", is_registered=False)
+            for i in range(2)
+        ]
+        db.add_all(beneficiaries)
+        db.flush()
+        for i in range(count):
+            asset = Asset(user_id=user_id, asset_type="document", asset_name=f"Asset {i}")
+            db.add(asset)
+            db.flush()
+            for beneficiary in beneficiaries:
+                db.add(AccessRule(
+                    user_id=user_id,
+                    beneficiary_id=beneficiary.beneficiary_id,
+                    asset_id=asset.asset_id,
+                    access_type="full",
+                ))
+            db.add(AssetFile(asset_id=asset.asset_id, file_name="will.pdf", file_size=1))
+        db.commit()
+    finally:
+        db.close()
+
+
+def list_queries(client, headers, expected):
+    client.get("/users/me", headers=headers)  # prime the principal cache
+    response = client.get("/assets/", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == expected
+    # queries=<n>; db_ms=...: statements issued on behalf of this request only
+    stats = dict(part.strip().split("=", 1) for part in response.headers[SQL_STATS_HEADER].split(";"))
+    return int(stats["queries"])
+
+
+def test_asset_list_query_count_is_constant(client):
+    counts = {}
+    for size in ASSET_COUNTS:
+        user_id, headers = register(client)
+        seed_assets(user_id, size)
+        counts[size] = list_queries(client, headers, size)
+    assert len(set(counts.values())) == 1, f"query count grows with the number of assets: {counts}"
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from src.database import connection
+from src.database.models import Beneficiary, Notification, User, UserMessage
+from src.services import message_service
+
+
+def test_direct_message_to_inactive_beneficiary_is_not_broadcast(client):
+    # client: the app has started and migrated the database
+    db = connection.SessionLocal()
+    try:
+        owner = User(email=f"owner-{uuid.uuid4().hex[:8]}@example.com", password_hash="x", first_name="Estate", last_name="Owner")
+        db.add(owner)
+        db.flush()
+        revoked = Beneficiary(user_id=owner.user_id, email=f"revoked-{uuid.uuid4().hex[:8]}@example.com", status="inactive")
+        other = Beneficiary(user_id=owner.user_id, email=f"other-{uuid.uuid4().hex[:8]}@example.com", status="active")
+        db.add_all([revoked, other])
+        db.flush()
+        due = datetime.utcnow() - timedelta(minutes=1)
+        db.add_all([
+            UserMessage(user_id=owner.user_id, beneficiary_id=revoked.beneficiary_id, message_title="Private to revoked",
+                        delivery_condition="scheduled_date", deliver_at=due, delivered=False),
+            UserMessage(user_id=owner.user_id, beneficiary_id=None, message_title="For everyone",
+                        delivery_condition="scheduled_date", deliver_at=due, delivered=False),
+        ])
+        db.commit()
+
+        assert message_service.deliver_due_messages(db) == 2
+
+        notified = db.execute(
+            select(Notification.recipient_email, Notification.message)
+            .where(Notification.beneficiary_id.in_([revoked.beneficiary_id, other.beneficiary_id]))
+        ).all()
+        assert [email for email, _ in notified] == [other.email]
+        assert "For everyone" in notified[0].message
+        assert all("Private to revoked" not in message for _, message in notified)
+    finally:
+        db.close()